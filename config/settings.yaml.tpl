@@ -57,6 +57,9 @@ default:
     https: http://tinyproxy-service.tiny-proxy.svc:8888
   reporting:
     print_app_logs: true # whether to print application logs during testing
+    tail_app_logs: true # stream logs of gateways in Openshift in background instead of fetching them after each test phase
+    app_logs_buffer_mb: 16 # upper bound of compressed logs kept in memory per gateway when tailing
+    app_logs_latency: false # add table of gateway-side latency percentiles parsed from access logs of each test
     title: Brief Description # custom title used for junit/polarion reporting
     testsuite_properties:
       polarion_project_id: PROJECTID
@@ -76,8 +79,10 @@ default:
         headless: #true/false  (runs UI tests in headless mode - faster than standard mode)
         source: "" #local ,remote or binary
         webdriver: "" #chrome , firefox or edge(edge with remote drivers)
-        remote_url: "" #URL and port to remote selenium instance e.g. http://127.0.0.1:4444
+        remote_url: "" #URL and port to remote selenium instance e.g. http://127.0.0.1:4444, list of them (or comma separated) to spread parallel workers over more instances
         disable_http2: false
+        reuse_sessions: false # keep browser sessions alive between test modules of a worker and restore logins from snapshots
+        auth_snapshot_max_age: 1800 # seconds after which captured login state is not restored anymore
     tools:
       # tools is a fixture to provide testenv services like echo_api, jaeger
       # and services that are needed for testing each service is identified by
@@ -101,6 +106,14 @@ default:
       token: # token for openshift where the testenv tools are deployed (unnecessary for for default openshift)
     private_base_url:
       default: echo_api # tool name to be used by default for backend
+    requestbin:
+      local:
+        # in-process webhook receiver used instead of mockserver by webhook tests,
+        # 3scale has to be able to reach the machine running the tests
+        enabled: false
+        host: 0.0.0.0 # address to listen at
+        port: 0 # 0 is random port; fixed port is shifted by xdist worker number
+        public_url: "" # url of the receiver as seen by 3scale, default is http://<fqdn>:<port>
   warn_and_skip:
     # section to control how warn_and_skip should behave for particular tests
     # works just for tests and fixture that use warn_and_skip
@@ -176,7 +189,9 @@ development:
     machine_ip: "" # where the container is
     ssh_user: "" # user at the machine where the container is
     ssh_passwd: "" # password for above user
+    ssh_max_channels: 8 # max of toolbox commands run concurrently over one ssh connection (see sshd MaxSessions)
     podman_image: "" # container image ID
+    container_mode: run # podman/docker only; run = new container per command, exec = one long-lived container per worker
   hyperfoil:
     url: "" # URL for hyperfoil controller
     shared_template:  # optional setting - overrides default agent definition
@@ -187,6 +202,13 @@ development:
           stop: true
   cfssl:
     binary: "cfssl" # Path to the cfssl binary
+    provider: "cli" # 'cli' generates certificates by cfssl binary, 'local' generates them in-process by cryptography library
+    key_algorithm: "ecdsa" # Key algorithm of 'local' provider, 'ecdsa' or 'rsa'
+    cache_dir: "" # Directory with certificates reused by next runs and parallel workers, no cache if empty
+    rest: # Remote cfssl instance, used only by benchmarks
+      host: ""
+      port: 8888
+      ssl: false
   images:
     apicast:
       manifest_digest: # Multi-arch manifest digest
@@ -0,0 +1,251 @@
+"""
+Parser of APIcast access and error logs
+
+Turns raw gateway logs (as returned by `get_logs`) into typed records kept in
+columnar buffers, so gateway-side latency can be aggregated per service and
+status quickly and reported next to client-side numbers.
+
+Recognized lines:
+ * default APIcast access log
+   `[12/Jan/2024:10:00:00 +0000] host:8080 10.0.0.1:5678 "GET /get HTTP/1.1" 200 312 (0.004) 0`
+ * json access log of logging policy, e.g. configured by `timing_logging_policy`
+ * nginx error log `2024/01/12 10:00:00 [error] 23#23: *5 [lua] policy.lua:42: message, client: ...`
+"""
+
+import json
+import math
+import re
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from testsuite import rawobj
+
+ACCESS_LOG = re.compile(
+    r"\[(?P<time>[^\]]+)\] (?P<host>\S+) (?P<remote>\S+) "
+    r'"(?P<method>[A-Z]+) (?P<path>\S*)[^"]*" (?P<status>\d{3}) (?P<bytes>\d+) \((?P<request_time>[\d.]+)\)'
+)
+ERROR_LOG = re.compile(
+    r"(?P<time>\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) \[(?P<level>\w+)\] \d+#\d+: (?:\*\d+ )?"
+    r"(?:\[lua\] (?P<source>[\w./-]+):\d+: )?(?P<message>.*)"
+)
+
+# Keys of json access log, see timing_logging_policy
+TIMING_LOG_FIELDS = {
+    "time": "{{time_local}}",
+    "service_id": "{{service.id}}",
+    "method": "{{request_method}}",
+    "path": "{{uri}}",
+    "status": "{{status}}",
+    "request_time": "{{request_time}}",
+    "upstream_response_time": "{{upstream_response_time}}",
+}
+
+
+def timing_logging_policy() -> dict:
+    """Logging policy making APIcast write json access logs with all the fields known by this parser"""
+    config = [{"key": key, "value": value, "value_type": "liquid"} for key, value in TIMING_LOG_FIELDS.items()]
+    return rawobj.PolicyConfig(
+        "logging", {"enable_access_logs": False, "enable_json_logs": True, "json_object_config": config}
+    )
+
+
+class AccessRecord(NamedTuple):
+    """Single request processed by the gateway, times are in seconds, NaN/0 if unknown"""
+
+    time: float
+    method: str
+    path: str
+    status: int
+    request_time: float
+    upstream_response_time: float
+    service_id: int
+
+
+class ErrorRecord(NamedTuple):
+    """Line of nginx error log, source is lua file which logged it (e.g. policy)"""
+
+    time: float
+    level: str
+    source: str
+    message: str
+
+
+def _access_time(value: str) -> float:
+    try:
+        return datetime.strptime(value, "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    except ValueError:
+        return math.nan
+
+
+def _float(value) -> float:
+    """Float from nginx variable, upstream times can be lists like '0.001, 0.002' for retries"""
+    if value in (None, "", "-"):
+        return math.nan
+    try:
+        return sum(float(i) for i in str(value).replace(":", ",").split(","))
+    except ValueError:
+        return math.nan
+
+
+def _int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentile of sorted values with linear interpolation, q is in [0, 100]"""
+    if not values:
+        return math.nan
+    position = (len(values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class AccessLogs:
+    """Columnar buffer of access records"""
+
+    COLUMNS = ("time", "method", "path", "status", "request_time", "upstream_response_time", "service_id")
+
+    def __init__(self):
+        self.time = array("d")
+        self.method: List[str] = []
+        self.path: List[str] = []
+        self.status = array("H")
+        self.request_time = array("d")
+        self.upstream_response_time = array("d")
+        self.service_id = array("q")
+
+    def __len__(self):
+        return len(self.status)
+
+    def __getitem__(self, index: int) -> AccessRecord:
+        return AccessRecord(*(getattr(self, i)[index] for i in self.COLUMNS))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def append(self, record: AccessRecord):
+        """Add a record"""
+        for column, value in zip(self.COLUMNS, record):
+            getattr(self, column).append(value)
+
+    def group(self, by: Sequence[str] = ("service_id", "status")) -> Dict[Tuple, List[int]]:
+        """Indexes of records grouped by values of the columns"""
+        columns = [getattr(self, i) for i in by]
+        groups: Dict[Tuple, List[int]] = {}
+        for index in range(len(self)):
+            groups.setdefault(tuple(i[index] for i in columns), []).append(index)
+        return groups
+
+    def percentiles(
+        self,
+        column: str = "request_time",
+        by: Sequence[str] = ("service_id", "status"),
+        quantiles: Iterable[float] = (50, 90, 99),
+    ) -> Dict[Tuple, Dict[float, float]]:
+        """Percentiles of the column per group, unknown (NaN) values are left out"""
+        values = getattr(self, column)
+        quantiles = list(quantiles)
+        result = {}
+        for key, indexes in sorted(self.group(by).items()):
+            data = sorted(v for v in (values[i] for i in indexes) if not math.isnan(v))
+            result[key] = {q: percentile(data, q) for q in quantiles}
+        return result
+
+    def summary(self, by: Sequence[str] = ("service_id", "status"), quantiles: Sequence[float] = (50, 90, 99)) -> str:
+        """Table of request count and request_time/upstream_response_time percentiles in ms per group"""
+        request = self.percentiles("request_time", by, quantiles)
+        upstream = self.percentiles("upstream_response_time", by, quantiles)
+        counts = {k: len(v) for k, v in self.group(by).items()}
+        header = (
+            " ".join(f"{i:>10}" for i in by)
+            + f" {'count':>7} "
+            + " ".join(f"{prefix + 'p' + format(q, 'g'):>8}" for prefix in ("req ", "ups ") for q in quantiles)
+        )
+        lines = [header]
+        for key, values in request.items():
+            cells = [values[q] for q in quantiles] + [upstream[key][q] for q in quantiles]
+            lines.append(
+                " ".join(f"{i!s:>10}" for i in key)
+                + f" {counts[key]:>7} "
+                + " ".join("       -" if math.isnan(i) else f"{i * 1000:8.1f}" for i in cells)
+            )
+        return "\n".join(lines)
+
+
+class ParsedLogs(NamedTuple):
+    """Access and error records of the parsed logs"""
+
+    access: AccessLogs
+    errors: List[ErrorRecord]
+
+    def policy_errors(self, level: str = "error") -> List[ErrorRecord]:
+        """Errors logged by lua code (policies) of at least given severity"""
+        levels = ["debug", "info", "notice", "warn", "error", "crit", "alert", "emerg"]
+        minimal = levels.index(level)
+        return [i for i in self.errors if i.source and i.level in levels and levels.index(i.level) >= minimal]
+
+
+def _parse_json(line: str) -> Optional[AccessRecord]:
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or "status" not in data:
+        return None
+    return AccessRecord(
+        time=_access_time(data.get("time", "")),
+        method=data.get("method", ""),
+        path=data.get("path", ""),
+        status=_int(data["status"]),
+        request_time=_float(data.get("request_time")),
+        upstream_response_time=_float(data.get("upstream_response_time")),
+        service_id=_int(data.get("service_id")),
+    )
+
+
+def parse(logs: str) -> ParsedLogs:
+    """Parse gateway logs, unrecognized lines are skipped"""
+    access = AccessLogs()
+    errors = []
+    for line in logs.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        first = line[0]
+        if first == "[":
+            match = ACCESS_LOG.match(line)
+            if match:
+                access.append(
+                    AccessRecord(
+                        time=_access_time(match["time"]),
+                        method=match["method"],
+                        path=match["path"],
+                        status=int(match["status"]),
+                        request_time=float(match["request_time"]),
+                        upstream_response_time=math.nan,
+                        service_id=0,
+                    )
+                )
+        elif first == "{":
+            record = _parse_json(line)
+            if record is not None:
+                access.append(record)
+        elif first.isdigit():
+            match = ERROR_LOG.match(line)
+            if match:
+                errors.append(
+                    ErrorRecord(
+                        time=datetime.strptime(match["time"], "%Y/%m/%d %H:%M:%S")
+                        .replace(tzinfo=timezone.utc)
+                        .timestamp(),
+                        level=match["level"],
+                        source=match["source"] or "",
+                        message=match["message"],
+                    )
+                )
+    return ParsedLogs(access, errors)
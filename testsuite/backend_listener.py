@@ -0,0 +1,169 @@
+"""
+Direct access to 3scale backend-listener service management API
+
+This allows to put applications into desired state (e.g. close to the limit)
+by reporting usage straight to backend instead of sending hundreds of real
+requests through the gateway.
+"""
+
+import logging
+import xml.etree.ElementTree as Et
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import backoff
+import requests
+from threescale_api.resources import Application
+
+from testsuite import proxy_configs
+
+log = logging.getLogger(__name__)
+
+Usage = Dict[str, int]
+
+
+def _credentials(application: Application) -> Dict[str, str]:
+    """Identification of the application as expected in transactions"""
+    if application.entity.get("user_key"):
+        return {"user_key": application["user_key"]}
+    return {"app_id": application["application_id"]}
+
+
+class BackendListener:
+    """Client of backend-listener /transactions endpoints
+
+    Args:
+        :param url: Url of backend-listener, e.g. route of backend-listener
+        :param verify: Verify ssl certificate
+        :param batch_size: Maximum number of transactions in one report request
+        :param max_workers: Maximum of concurrently running report requests
+    """
+
+    def __init__(self, url: str, verify: bool = True, batch_size: int = 100, max_workers: int = 4):
+        self.url = url.rstrip("/")
+        self.verify = verify
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._session = requests.Session()
+        self._service_tokens: Dict[int, str] = {}
+
+    def service_token(self, service) -> str:
+        """Service token used by the gateway to talk to backend, cached per service"""
+        if service.entity_id not in self._service_tokens:
+            config = proxy_configs.latest(service)
+            self._service_tokens[service.entity_id] = config["content"]["backend_authentication_value"]
+        return self._service_tokens[service.entity_id]
+
+    def usage(self, application: Application) -> Dict[Tuple[str, str], int]:
+        """Current usage of the application as {(metric, period): value} for all its limits"""
+        service = application.service
+        response = self._session.get(
+            f"{self.url}/transactions/authorize.xml",
+            params={
+                "service_token": self.service_token(service),
+                "service_id": service.entity_id,
+                **_credentials(application),
+            },
+            verify=self.verify,
+        )
+        if response.status_code not in (200, 409):
+            response.raise_for_status()
+        usage = {}
+        for report in Et.fromstring(response.text).iterfind(".//usage_report"):
+            usage[(report.get("metric", ""), report.get("period", ""))] = int(report.findtext("current_value", "0"))
+        return usage
+
+    # pylint: disable=too-many-locals
+    def report(
+        self, reports: Iterable[Tuple[Application, Usage]], wait: bool = True, max_time: Optional[float] = None
+    ) -> bool:
+        """
+        Report usage of applications in bulk
+
+        Usage of the same application is summed up into single transaction,
+        transactions are split into batches per service and the batches are
+        reported concurrently.
+
+        Args:
+            :param reports: Pairs of application and usage like {"hits": 100}
+            :param wait: Wait until backend workers process the reports, this
+                is reflected just for metrics with limits
+            :param max_time: Maximum number of seconds to wait for each application
+        :return: False if the wait ended before all the reports were processed
+        """
+        transactions: Dict[int, Dict[int, Tuple[Application, Usage]]] = {}
+        for application, usage in reports:
+            apps = transactions.setdefault(application.service.entity_id, {})
+            _, total = apps.setdefault(application.entity_id, (application, {}))
+            for metric, value in usage.items():
+                total[metric] = total.get(metric, 0) + value
+
+        before = {}
+        if wait:
+            for apps in transactions.values():
+                for application, _ in apps.values():
+                    before[application.entity_id] = self.usage(application)
+
+        batches = []
+        for apps in transactions.values():
+            items = list(apps.values())
+            for i in range(0, len(items), self.batch_size):
+                batches.append(items[i : i + self.batch_size])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for _ in pool.map(self._report_batch, batches):
+                pass
+        log.info(
+            "Reported usage of %d application(s) in %d request(s)",
+            sum(len(i) for i in transactions.values()),
+            len(batches),
+        )
+
+        if not wait:
+            return True
+        # every application is waited for even if some of them time out
+        processed = [
+            self._wait_for_usage(application, before[application.entity_id], usage, max_time)
+            for apps in transactions.values()
+            for application, usage in apps.values()
+        ]
+        return all(processed)
+
+    def _report_batch(self, batch: List[Tuple[Application, Usage]]):
+        """Send single /transactions.xml request, all the applications belong to the same service"""
+        service = batch[0][0].service
+        data: Dict[str, str] = {"service_token": self.service_token(service), "service_id": service.entity_id}
+        for i, (application, usage) in enumerate(batch):
+            for key, value in _credentials(application).items():
+                data[f"transactions[{i}][{key}]"] = value
+            for metric, hits in usage.items():
+                data[f"transactions[{i}][usage][{metric}]"] = str(hits)
+        response = self._session.post(f"{self.url}/transactions.xml", data=data, verify=self.verify)
+        response.raise_for_status()
+        return response
+
+    def _wait_for_usage(
+        self,
+        application: Application,
+        before: Dict[Tuple[str, str], int],
+        usage: Usage,
+        max_time: Optional[float] = None,
+    ) -> bool:
+        """Wait until the reported usage is visible on limited metrics, returns whether it is"""
+
+        def _processed(current):
+            return all(current.get(key, 0) >= value + usage[key[0]] for key, value in before.items() if key[0] in usage)
+
+        current = backoff.on_predicate(
+            backoff.fibo, lambda x: not _processed(x), max_tries=8, max_time=max_time, jitter=None
+        )(self.usage)(application)
+        if not _processed(current):
+            log.warning("Reported usage of application %s not processed by backend yet", application.entity_id)
+            return False
+        return True
+
+    def report_one(
+        self, application: Application, usage: Usage, wait: bool = True, max_time: Optional[float] = None
+    ) -> bool:
+        """Report usage of single application"""
+        return self.report([(application, usage)], wait=wait, max_time=max_time)
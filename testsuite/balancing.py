@@ -0,0 +1,62 @@
+"""
+Balancing of parallel runs by historical duration of test modules
+
+Duration of every module (setup, call and teardown of all its tests) is
+recorded to pytest cache at the end of the run. With `--balance` the modules
+are ordered longest first, so xdist (`--dist loadfile`) hands out the long
+modules at the beginning and short ones fill the gaps at the end instead of
+one long module holding the whole run.
+"""
+
+from typing import Dict, List
+
+import pytest
+
+CACHE_KEY = "testsuite/module_durations"
+
+
+def module_of(nodeid: str) -> str:
+    """Module (file) part of test node id"""
+    return nodeid.split("::", 1)[0]
+
+
+def order(items: List[pytest.Item], durations: Dict[str, float]) -> None:
+    """Reorder items in place by duration of their modules, longest first
+
+    Tests of one module stay together and in their original order. Modules
+    without history are expected to take an average time.
+    """
+    if not durations:
+        return
+    default = sum(durations.values()) / len(durations)
+    position = {item: i for i, item in enumerate(items)}
+    items.sort(key=lambda i: (-durations.get(module_of(i.nodeid), default), module_of(i.nodeid), position[i]))
+
+
+class DurationRecorder:
+    """Plugin collecting durations of modules and merging them into the history in pytest cache
+
+    Args:
+        :param cache: pytest cache (config.cache)
+        :param weight: Weight of this run in the history, the rest is weight of previous runs
+    """
+
+    def __init__(self, cache, weight: float = 0.5):
+        self.cache = cache
+        self.weight = weight
+        self.durations: Dict[str, float] = {}
+
+    def pytest_runtest_logreport(self, report):
+        """Add duration of the test phase to its module"""
+        module = module_of(report.nodeid)
+        self.durations[module] = self.durations.get(module, 0.0) + report.duration
+
+    def pytest_sessionfinish(self):
+        """Store exponential moving average of durations"""
+        if not self.durations:
+            return
+        history = self.cache.get(CACHE_KEY, {})
+        for module, duration in self.durations.items():
+            previous = history.get(module)
+            history[module] = duration if previous is None else self.weight * duration + (1 - self.weight) * previous
+        self.cache.set(CACHE_KEY, history)
@@ -0,0 +1,105 @@
+"""
+Micro-benchmarks of testsuite's own hot paths
+
+These measure the overhead the testsuite adds around 3scale calls. They run
+offline with local stand-ins (recorded responses etc.) and don't need any
+3scale deployment. Run them with `python -m testsuite.benchmarks [name ...]`.
+
+Every benchmark is a function decorated by `benchmark` that prepares the data
+and returns a callable to be measured. Benchmarks of optional tools raise
+`Unavailable` from the preparation when the tool is missing.
+
+Results can be stored as a baseline (`--save`) and later runs compared to it
+(`--compare`), medians slower than the baseline by more than the threshold are
+reported as regressions.
+"""
+
+import json
+import platform
+import statistics
+import timeit
+from typing import Callable, Dict, Iterable, List, NamedTuple
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+class Unavailable(Exception):
+    """Benchmark can't be run in current environment"""
+
+
+class Result(NamedTuple):
+    """Timing of single benchmark, all in seconds per call"""
+
+    name: str
+    calls: int
+    best: float
+    median: float
+
+
+def benchmark(name: str):
+    """Register benchmark under given name"""
+
+    def _register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return _register
+
+
+def measure(name: str, func: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> Result:
+    """Measure callable, number of calls per round is estimated to take at least min_time"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    rounds = [i / number for i in timer.repeat(repeat=repeat, number=number)]
+    return Result(name, number, min(rounds), statistics.median(rounds))
+
+
+def run(name: str, **kwargs) -> Result:
+    """Prepare and measure registered benchmark"""
+    return measure(name, BENCHMARKS[name](), **kwargs)
+
+
+class Comparison(NamedTuple):
+    """Median of benchmark against its baseline, ratio > 1 means slower"""
+
+    name: str
+    baseline: float
+    current: float
+    ratio: float
+    regression: bool
+
+
+def save(results: Iterable[Result], path: str):
+    """Store results as a baseline"""
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {i.name: {"calls": i.calls, "best": i.best, "median": i.median} for i in results},
+    }
+    with open(path, "w", encoding="utf8") as file:
+        json.dump(data, file, indent=1, sort_keys=True)
+
+
+def load(path: str) -> Dict[str, Result]:
+    """Results stored by `save`"""
+    with open(path, encoding="utf8") as file:
+        data = json.load(file)
+    return {name: Result(name, **values) for name, values in data["results"].items()}
+
+
+def compare(results: Iterable[Result], baseline: Dict[str, Result], threshold: float = 0.2) -> List[Comparison]:
+    """Compare medians of results with the baseline, benchmarks missing in the baseline are left out
+
+    Args:
+        :param results: Current results
+        :param baseline: Results loaded from the baseline
+        :param threshold: Relative slowdown which is a regression, 0.2 is 20 % slower
+    """
+    comparisons = []
+    for result in results:
+        if result.name in baseline:
+            previous = baseline[result.name].median
+            ratio = result.median / previous if previous else float("inf")
+            comparisons.append(Comparison(result.name, previous, result.median, ratio, ratio > 1 + threshold))
+    return comparisons
@@ -0,0 +1,65 @@
+"""Run benchmarks: python -m testsuite.benchmarks [name-prefix ...] [--save FILE] [--compare FILE]"""
+
+import argparse
+import importlib
+import pkgutil
+import sys
+
+import testsuite.benchmarks
+from testsuite.benchmarks import BENCHMARKS, Unavailable, compare, load, run, save
+
+
+def main():
+    """Load all benchmark modules, run the selected ones, print results and compare them with baseline"""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of testsuite hot paths")
+    parser.add_argument("names", nargs="*", help="Run only benchmarks starting with one of the names")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measured rounds (default: 5)")
+    parser.add_argument("--save", metavar="FILE", help="Store results as baseline into the file")
+    parser.add_argument("--compare", metavar="FILE", help="Compare results with baseline stored in the file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown of median reported as regression (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    for module in pkgutil.iter_modules(testsuite.benchmarks.__path__):
+        if not module.name.startswith("_"):
+            importlib.import_module(f"testsuite.benchmarks.{module.name}")
+
+    selected = [i for i in sorted(BENCHMARKS) if not args.names or any(i.startswith(n) for n in args.names)]
+    width = max((len(i) for i in selected), default=0)
+    results = []
+    for name in selected:
+        try:
+            result = run(name, repeat=args.repeat)
+        except Unavailable as reason:
+            print(f"{name:<{width}}  skipped: {reason}")
+            continue
+        results.append(result)
+        print(f"{name:<{width}}  best {result.best * 1e6:10.2f} us  median {result.median * 1e6:10.2f} us")
+
+    if args.save:
+        save(results, args.save)
+        print(f"\nBaseline of {len(results)} benchmarks stored in {args.save}")
+
+    if args.compare:
+        comparisons = compare(results, load(args.compare), args.threshold)
+        print(f"\nComparison with {args.compare} (median, regression is over {args.threshold:.0%} slower)")
+        for item in comparisons:
+            print(
+                f"{item.name:<{width}}  {item.baseline * 1e6:10.2f} us -> {item.current * 1e6:10.2f} us"
+                f"  {item.ratio - 1:+8.1%}{'  REGRESSION' if item.regression else ''}"
+            )
+        missing = sorted({i.name for i in results} - {i.name for i in comparisons})
+        if missing:
+            print(f"Not in baseline: {', '.join(missing)}")
+        regressions = [i for i in comparisons if i.regression]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) of {len(comparisons)} compared benchmarks")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
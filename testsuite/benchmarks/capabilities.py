@@ -0,0 +1,38 @@
+"""Benchmarks of CapabilityRegistry lookups done for every test by required_capabilities marker"""
+
+from testsuite.benchmarks import benchmark
+from testsuite.capabilities import Capability, CapabilityRegistry
+
+# Stand-ins of the providers registered by testsuite.capabilities.providers and gateways
+PROVIDERS = [
+    ({Capability.APICAST, Capability.PRODUCTION_GATEWAY, Capability.STANDARD_GATEWAY, Capability.LOGS}, set),
+    ({Capability.CUSTOM_ENVIRONMENT, Capability.SAME_CLUSTER, Capability.JAEGER}, set),
+    ({Capability.OCP3, Capability.OCP4}, lambda: {Capability.OCP4}),
+    ({Capability.SCALING}, lambda: {Capability.SCALING}),
+    ({Capability.NOFIPS, Capability.FIPS}, lambda: {Capability.NOFIPS}),
+]
+
+
+def _registry() -> CapabilityRegistry:
+    """New registry with stand-in providers, the global one is left intact"""
+    registry = CapabilityRegistry.__new__(CapabilityRegistry)
+    CapabilityRegistry.__init__(registry)
+    for provides, provider in PROVIDERS:
+        registry.register_provider(provider, provides)
+    return registry
+
+
+@benchmark("capabilities.required")
+def _required():
+    registry = _registry()
+    required = (Capability.STANDARD_GATEWAY, Capability.CUSTOM_ENVIRONMENT, Capability.OCP4, Capability.NOFIPS)
+    return lambda: all(i in registry for i in required)
+
+
+@benchmark("capabilities.discovery")
+def _discovery():
+    def _discover():
+        registry = _registry()
+        return [i in registry for i in Capability if any(i in provides for provides, _ in PROVIDERS)]
+
+    return _discover
@@ -0,0 +1,72 @@
+"""Benchmarks of certificate providers: in-process generation against cfssl binary and cfssl REST api
+
+cfssl benchmarks use `cfssl.binary` and `cfssl.rest` (host, port, ssl) from settings,
+they are skipped if the binary or REST configuration is missing.
+"""
+
+import shutil
+
+from weakget import weakget
+
+from testsuite.benchmarks import Unavailable, benchmark
+from testsuite.certificates import CertificateManager
+from testsuite.certificates.cfssl.cli import CFSSLProviderCLI
+from testsuite.certificates.cfssl.rest import CFSSLRESTProvider
+from testsuite.certificates.local import LocalProvider
+from testsuite.config import settings
+
+HOSTS = ["*.benchmark.example.com"]
+
+
+def _cli_provider():
+    binary = shutil.which(weakget(settings)["cfssl"]["binary"] % "cfssl")
+    if not binary:
+        raise Unavailable("cfssl binary not found")
+    return CFSSLProviderCLI(binary=binary)
+
+
+def _rest_provider():
+    rest = weakget(settings)["cfssl"]["rest"] % {}
+    if not rest.get("host"):
+        raise Unavailable("cfssl.rest.host not configured")
+    return CFSSLRESTProvider(rest["host"], rest.get("port", 8888), ssl=rest.get("ssl", False))
+
+
+PROVIDERS = {
+    "local-ecdsa": lambda: LocalProvider("ecdsa"),
+    "local-rsa": lambda: LocalProvider("rsa"),
+    "cfssl-cli": _cli_provider,
+}
+
+
+def _issue(provider_name):
+    """Generate key and sign it by CA, what CertificateManager.create does"""
+
+    def _prepare():
+        provider = PROVIDERS[provider_name]()
+        authority, _ = provider.generate_ca("benchmark-ca", CertificateManager.DEFAULT_NAMES, HOSTS)
+        return lambda: provider.sign(
+            provider.generate_key("api.benchmark.example.com", CertificateManager.DEFAULT_NAMES, HOSTS),
+            certificate_authority=authority,
+        )
+
+    return _prepare
+
+
+def _sign(provider_name):
+    """Sign already generated key, REST provider is able to sign only"""
+
+    def _prepare():
+        signer = _rest_provider() if provider_name == "cfssl-rest" else PROVIDERS[provider_name]()
+        generator = LocalProvider()
+        authority, _ = generator.generate_ca("benchmark-ca", CertificateManager.DEFAULT_NAMES, HOSTS)
+        key = generator.generate_key("api.benchmark.example.com", CertificateManager.DEFAULT_NAMES, HOSTS)
+        return lambda: signer.sign(key, certificate_authority=authority)
+
+    return _prepare
+
+
+for _name in PROVIDERS:
+    benchmark(f"certificates.issue[{_name}]")(_issue(_name))
+for _name in ("local-ecdsa", "cfssl-cli", "cfssl-rest"):
+    benchmark(f"certificates.sign[{_name}]")(_sign(_name))
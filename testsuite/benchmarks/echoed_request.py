@@ -0,0 +1,36 @@
+"""Benchmarks of EchoedRequest over recorded responses of all supported backends"""
+
+import json
+
+import importlib_resources as resources
+import requests
+
+from testsuite.benchmarks import benchmark
+from testsuite.echoed_request import EchoedRequest
+
+
+def recorded_responses():
+    """requests.Response objects with recorded content of httpbin, go-httpbin, echo-api and mockserver"""
+    recorded = resources.files("testsuite.resources").joinpath("benchmarks/echoed_requests.json").read_text()
+    responses = {}
+    for backend, record in json.loads(recorded).items():
+        response = requests.Response()
+        response.status_code = 200
+        response.url = record["url"]
+        response.headers["Content-Type"] = "application/json"
+        # pylint: disable=protected-access
+        response._content = json.dumps(record["json"]).encode()
+        responses[backend] = response
+    return responses
+
+
+def _echoed_request_create(backend):
+    def _prepare():
+        response = recorded_responses()[backend]
+        return lambda: EchoedRequest.create(response)
+
+    return _prepare
+
+
+for _backend in ("httpbin", "go-httpbin", "echo-api", "mockserver"):
+    benchmark(f"echoed_request.create[{_backend}]")(_echoed_request_create(_backend))
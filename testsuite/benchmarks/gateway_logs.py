@@ -0,0 +1,46 @@
+"""Benchmarks of the buffer of streamed gateway logs"""
+
+from datetime import datetime, timedelta, timezone
+
+from testsuite.benchmarks import benchmark
+from testsuite.gateway_logs import LogBuffer
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _filled(count: int, chunk_size: int):
+    """Buffer with one line per millisecond, some lines contain control characters printed by gateway"""
+    buffer = LogBuffer(chunk_size=chunk_size)
+    lines = [
+        f"line {i} {'a' * 80}{chr(13) if i % 7 == 0 else ''}{chr(12) if i % 11 == 0 else ''}\n" for i in range(count)
+    ]
+    for i, line in enumerate(lines):
+        buffer.append(START + timedelta(milliseconds=i), line)
+    return buffer, lines
+
+
+def _window(buffer, lines, first: int, last: int):
+    """Slice of lines [first, last), checked so that the benchmark doesn't measure wrong results"""
+    result = buffer.slice(START + timedelta(milliseconds=first), START + timedelta(milliseconds=last))
+    assert result == "".join(lines[first:last]), f"Wrong gateway log lines in window [{first}, {last})"
+    return result
+
+
+@benchmark("gateway_logs.slice[compressed]")
+def _slice_compressed():
+    buffer, lines = _filled(20000, 64 * 1024)
+    for first, last in ((0, 1), (3, 5), (6, 8), (700, 2900), (19990, 20000)):
+        _window(buffer, lines, first, last)
+    return lambda: buffer.slice(START + timedelta(milliseconds=9000), START + timedelta(milliseconds=9500))
+
+
+@benchmark("gateway_logs.append")
+def _append():
+    line = f"{'a' * 100}\n"
+
+    def _run():
+        buffer = LogBuffer(chunk_size=64 * 1024)
+        for i in range(1000):
+            buffer.append(START + timedelta(milliseconds=i), line)
+
+    return _run
@@ -0,0 +1,44 @@
+"""Benchmarks of HttpxClient requests including its logging hooks, responses are served by local transport"""
+
+import json
+from types import SimpleNamespace
+
+import httpx
+import importlib_resources as resources
+
+from testsuite.benchmarks import benchmark
+from testsuite.httpx import HttpxClient
+
+
+# pylint: disable=too-few-public-methods
+class _Application:
+    """Stand-in of Application, the client needs just the endpoint and credentials"""
+
+    service = SimpleNamespace(proxy=SimpleNamespace(fetch=lambda: {"sandbox_endpoint": "https://staging.example.com"}))
+
+    @staticmethod
+    def authobj():
+        """No credentials"""
+        return None
+
+
+def _client() -> HttpxClient:
+    recorded = resources.files("testsuite.resources").joinpath("benchmarks/echoed_requests.json").read_text()
+    body = json.loads(recorded)["httpbin"]["json"]
+    client = HttpxClient(False, _Application())
+    # pylint: disable=protected-access
+    client._client._transport = httpx.MockTransport(lambda request: httpx.Response(200, json=body))
+    return client
+
+
+@benchmark("httpx_client.request[get]")
+def _get():
+    client = _client()
+    return lambda: client.get("/anything/benchmark", params={"user_key": "secret"})
+
+
+@benchmark("httpx_client.request[post-json]")
+def _post():
+    client = _client()
+    payload = {"name": "benchmark", "values": list(range(50))}
+    return lambda: client.post("/anything/benchmark", json=payload, headers={"X-Benchmark": "1"})
@@ -0,0 +1,17 @@
+"""Benchmarks of generating names of 3scale objects"""
+
+from types import SimpleNamespace
+
+from testsuite.benchmarks import benchmark
+from testsuite.utils import blame, randomize
+
+
+@benchmark("names.randomize")
+def _randomize():
+    return lambda: randomize("svc")
+
+
+@benchmark("names.blame")
+def _blame():
+    request = SimpleNamespace(node=SimpleNamespace(name="test_mapping_rules_are_created[backend-staging]"))
+    return lambda: blame(request, "backend")
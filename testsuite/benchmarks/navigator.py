@@ -0,0 +1,95 @@
+"""Benchmarks of Navigator.navigate over stand-in Views and browser, no selenium is needed"""
+
+from testsuite.benchmarks import benchmark
+from testsuite.ui.navigation import Navigable, Navigator, step
+
+
+class _Browser:
+    """Stand-in of browser, page is identified by its path"""
+
+    def __init__(self):
+        self.path = "/"
+
+    def set_path(self, path):
+        """Open the path"""
+        self.path = path
+
+    def refresh(self):
+        """Nothing to refresh"""
+
+
+class _View(Navigable):
+    path_pattern = "/"
+
+    # pylint: disable=unused-argument
+    def __init__(self, parent, logger=None, **kwargs):
+        self.browser = parent
+        self.path = self.path_pattern.format_map(kwargs)
+
+    @property
+    def is_displayed(self):
+        """Displayed when the browser is at its path"""
+        return self.browser.path == self.path
+
+    def wait_displayed(self):
+        """Displayed immediately"""
+
+
+class _Dashboard(_View):
+    @step("_Products")
+    def products(self):
+        """Go to products"""
+        self.browser.set_path("/products")
+
+
+class _Products(_View):
+    path_pattern = "/products"
+
+    def prerequisite(self):
+        return _Dashboard
+
+    @step("_Product")
+    def product(self, product_id):
+        """Go to the product"""
+        self.browser.set_path(f"/products/{product_id}")
+
+
+class _Product(_View):
+    path_pattern = "/products/{product_id}"
+
+    def __init__(self, parent, product_id, **kwargs):
+        super().__init__(parent, product_id=product_id, **kwargs)
+
+    def prerequisite(self):
+        return _Products
+
+    @step("_Policies")
+    def policies(self):
+        """Go to the policies of the product"""
+        self.browser.set_path(f"{self.path}/policies")
+
+
+class _Policies(_Product):
+    path_pattern = "/products/{product_id}/policies"
+
+    def prerequisite(self):
+        return _Product
+
+
+def _navigate(direct: bool):
+    def _prepare():
+        browser = _Browser()
+        navigator = Navigator(browser)
+
+        def _run():
+            browser.path = "/"
+            navigator.timings.clear()
+            return navigator.navigate(_Policies, direct=direct, product_id=1)
+
+        return _run
+
+    return _prepare
+
+
+benchmark("navigator.navigate[steps]")(_navigate(False))
+benchmark("navigator.navigate[direct]")(_navigate(True))
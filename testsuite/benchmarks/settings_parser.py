@@ -0,0 +1,27 @@
+"""Benchmarks of SettingsParser constructing gateways from settings"""
+
+import testsuite.gateways
+from testsuite.benchmarks import benchmark
+from testsuite.configuration import SettingsParser
+from testsuite.gateways.apicast.system import SystemApicast
+from testsuite.gateways.gateways import new_gateway
+
+# Stand-in of threescale.gateway settings, OpenShiftClient is only configured, no cluster is needed
+GATEWAY_SETTINGS = {
+    "default": {"kind": "SystemApicast", "openshift": {"kind": "OpenShiftClient", "project_name": "threescale"}},
+    "TemplateApicast": {"template": "apicast.yml"},
+    "SelfManagedApicast": {"force": "OperatorApicast"},
+}
+
+
+@benchmark("settings_parser.gateway[SystemApicast]")
+def _gateway():
+    kinds = vars(testsuite.gateways)
+    return lambda: new_gateway(kinds, GATEWAY_SETTINGS, "SystemApicast", staging=True)
+
+
+@benchmark("settings_parser.process[SystemApicast]")
+def _process():
+    parser = SettingsParser()
+    openshift = GATEWAY_SETTINGS["default"]["openshift"]
+    return lambda: parser.process(SystemApicast, global_kwargs={"staging": True}, openshift=openshift)
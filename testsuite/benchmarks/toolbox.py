@@ -0,0 +1,34 @@
+"""Benchmarks of toolbox comparison of copied 3scale objects"""
+
+from testsuite.benchmarks import benchmark
+from testsuite.toolbox.toolbox import cmp_ents, find_and_cmp
+
+ATTRIBUTES = ["friendly_name", "unit", "description"]
+
+
+class _Entity(dict):
+    """Stand-in of DefaultResource, attributes are both items and entity"""
+
+    @property
+    def entity(self):
+        """Attributes of the resource"""
+        return self
+
+
+def _entities(count: int, offset: int):
+    return [
+        _Entity(
+            id=offset + i,
+            system_name=f"metric_{i}",
+            friendly_name=f"Metric {i}",
+            unit="hit",
+            description=f"Metric number {i}",
+        )
+        for i in range(count)
+    ]
+
+
+@benchmark("toolbox.find_and_cmp[500]")
+def _find_and_cmp():
+    source, copy = _entities(500, 0), list(reversed(_entities(500, 1000)))
+    return lambda: find_and_cmp(source, copy, lambda a, b: cmp_ents(a, b, ATTRIBUTES))
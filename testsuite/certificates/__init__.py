@@ -1,7 +1,9 @@
 """Collection of classes for working with different ssl certificate tools."""
 
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple, Dict
+from typing import Callable, List, Optional, Tuple, Dict
 
 from testsuite.certificates.persist import TmpFilePersist
 
@@ -22,11 +24,10 @@ class Certificate(TmpFilePersist):
 
     def __setstate__(self, state):
         """
-        Custom deserializer for pickle module
+        Custom deserializer for pickle module, files are written once they are needed (see `files`)
         more info here: https://docs.python.org/3/library/pickle.html#object.__setstate__
         """
         self.__init__(state["key"], state["certificate"])
-        self.persist()
 
 
 class UnsignedKey(TmpFilePersist):
@@ -66,6 +67,19 @@ class CertificateStore(ABC):
             :param key: label of certificate.
         """
 
+    # pylint: disable=unused-argument
+    def get_or_create(self, key: str, digest: str, factory: Callable[[], Certificate]) -> Certificate:
+        """Get certificate with given content digest or create it by factory, stored under the label.
+        Stores without content addressing always create new one.
+        Args:
+            :param key: label of the certificate.
+            :param digest: hash of everything the certificate is generated from
+            :param factory: creates the certificate
+        """
+        certificate = factory()
+        self[key] = certificate
+        return certificate
+
 
 # pylint: disable=too-few-public-methods
 class SigningProvider(ABC):
@@ -91,6 +105,11 @@ class SigningProvider(ABC):
 class KeyProvider(ABC):
     """Class that can generate keys to be used in certificates"""
 
+    @property
+    def key_type(self) -> str:
+        """Identification of generated keys, keys of different types are never interchanged"""
+        return type(self).__name__
+
     @abstractmethod
     def generate_key(
         self, common_name: str, names: Optional[List[Dict[str, str]]] = None, hosts: Optional[List[str]] = None
@@ -166,11 +185,38 @@ class CertificateManager:
         self.store[label] = certificate
         return certificate
 
-    def get_or_create(self, label: str, *args, **kwargs) -> Certificate:
+    def _digest(self, kind: str, common_name: str, hosts, names, certificate_authority) -> str:
+        """Hash of everything the certificate is generated from"""
+        data = {
+            "kind": kind,
+            "common_name": common_name,
+            "hosts": hosts,
+            "names": names or self.DEFAULT_NAMES,
+            "key_type": self.key_provider.key_type,
+            "authority": certificate_authority.certificate if certificate_authority else None,
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    # pylint: disable=too-many-arguments
+    def get_or_create(
+        self,
+        label: str,
+        common_name: str,
+        hosts: List[str],
+        names: Optional[List[Dict[str, str]]] = None,
+        certificate_authority: Optional[Certificate] = None,
+    ) -> Certificate:
         """Creates new certificate, if it doesn't already exists"""
         if label in self.store:
             return self.store[label]
-        return self.create(label, *args, **kwargs)
+        names = names or self.DEFAULT_NAMES
+        return self.store.get_or_create(
+            label,
+            self._digest("certificate", common_name, hosts, names, certificate_authority),
+            lambda: self.sign_provider.sign(
+                self.key_provider.generate_key(common_name, names, hosts), certificate_authority=certificate_authority
+            ),
+        )
 
     def get(self, label: str) -> Certificate:
         """Returns already existing certificate from the store"""
@@ -197,9 +243,22 @@ class CertificateManager:
         self.store[label] = certificate
         return certificate, key
 
-    def get_or_create_ca(self, label: str, *args, **kwargs) -> Certificate:
+    def get_or_create_ca(
+        self,
+        label: str,
+        hosts: List[str],
+        names: Optional[List[Dict[str, str]]] = None,
+        certificate_authority: Optional[Certificate] = None,
+    ) -> Certificate:
         """Creates new certificate authority, if one doesn't already exists"""
         if label in self.store:
             return self.store[label]
-        certificate, _ = self.create_ca(label, *args, **kwargs)
-        return certificate
+        names = names or self.DEFAULT_NAMES
+
+        def _create():
+            certificate, key = self.key_provider.generate_ca(label, names, hosts)
+            if certificate_authority:
+                certificate = self.sign_provider.sign_intermediate_ca(key, certificate_authority)
+            return certificate
+
+        return self.store.get_or_create(label, self._digest("ca", label, hosts, names, certificate_authority), _create)
@@ -0,0 +1,206 @@
+"""In-process certificate generation using cryptography library"""
+
+import datetime
+import ipaddress
+import json
+from typing import Dict, List, Optional, Tuple
+
+import importlib_resources as resources
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+from testsuite.certificates import Certificate, KeyProvider, SigningProvider, UnsignedKey
+
+# Attributes of Names field in the same meaning as in cfssl csr json
+_NAME_OIDS = {
+    "C": NameOID.COUNTRY_NAME,
+    "ST": NameOID.STATE_OR_PROVINCE_NAME,
+    "L": NameOID.LOCALITY_NAME,
+    "O": NameOID.ORGANIZATION_NAME,
+    "OU": NameOID.ORGANIZATIONAL_UNIT_NAME,
+}
+
+_CURVES = {256: ec.SECP256R1, 384: ec.SECP384R1, 521: ec.SECP521R1}
+
+_KEY_USAGES = {
+    "signing": "digital_signature",
+    "digital signature": "digital_signature",
+    "content commitment": "content_commitment",
+    "key encipherment": "key_encipherment",
+    "data encipherment": "data_encipherment",
+    "key agreement": "key_agreement",
+    "cert sign": "key_cert_sign",
+    "crl sign": "crl_sign",
+}
+
+_EXTENDED_KEY_USAGES = {
+    "server auth": ExtendedKeyUsageOID.SERVER_AUTH,
+    "client auth": ExtendedKeyUsageOID.CLIENT_AUTH,
+}
+
+
+class Profile:
+    """Signing profile, subset of cfssl signing config"""
+
+    def __init__(self, expiry: datetime.timedelta, usages: List[str], is_ca: bool = False):
+        self.expiry = expiry
+        self.usages = usages
+        self.is_ca = is_ca
+
+    @classmethod
+    def from_cfssl_config(cls, config: dict) -> "Profile":
+        """Profile from cfssl config json, only the default profile is taken into account"""
+        default = config["signing"]["default"]
+        return cls(
+            expiry=datetime.timedelta(hours=int(default["expiry"].rstrip("h"))),
+            usages=default["usages"],
+            is_ca=default.get("ca_constraint", {}).get("is_ca", False),
+        )
+
+    def extensions(self) -> List[Tuple[x509.ExtensionType, bool]]:
+        """Extensions with their criticality as cfssl adds them"""
+        flags = dict.fromkeys(set(_KEY_USAGES.values()), False)
+        flags.update((_KEY_USAGES[i], True) for i in self.usages if i in _KEY_USAGES)
+        result: List[Tuple[x509.ExtensionType, bool]] = [
+            (x509.KeyUsage(encipher_only=False, decipher_only=False, **flags), True),
+            (x509.BasicConstraints(ca=self.is_ca, path_length=None), True),
+        ]
+        extended = [_EXTENDED_KEY_USAGES[i] for i in self.usages if i in _EXTENDED_KEY_USAGES]
+        if extended:
+            result.append((x509.ExtendedKeyUsage(extended), False))
+        return result
+
+
+# Defaults of cfssl
+CA_PROFILE = Profile(datetime.timedelta(hours=43800), ["cert sign", "crl sign"], is_ca=True)
+DEFAULT_PROFILE = Profile(datetime.timedelta(hours=8760), ["signing", "key encipherment", "server auth", "client auth"])
+INTERMEDIATE_PROFILE = Profile.from_cfssl_config(
+    json.loads(resources.files("testsuite.resources.tls").joinpath("intermediate_config.json").read_text())
+)
+
+
+def _subject(common_name: str, names: Optional[List[Dict[str, str]]]) -> x509.Name:
+    attributes = []
+    for name in names or []:
+        for key, oid in _NAME_OIDS.items():
+            if name.get(key):
+                attributes.append(x509.NameAttribute(oid, name[key]))
+    attributes.append(x509.NameAttribute(NameOID.COMMON_NAME, common_name))
+    return x509.Name(attributes)
+
+
+def _general_name(host: str) -> x509.GeneralName:
+    try:
+        return x509.IPAddress(ipaddress.ip_address(host))
+    except ValueError:
+        return x509.DNSName(host)
+
+
+def _load_key(pem: str):
+    return serialization.load_pem_private_key(pem.encode(), password=None)
+
+
+def _hash_for(key):
+    return (
+        hashes.SHA384() if isinstance(key, ec.EllipticCurvePrivateKey) and key.curve.key_size > 256 else hashes.SHA256()
+    )
+
+
+class LocalProvider(KeyProvider, SigningProvider):
+    """Generates keys and signs certificates in-process, drop-in replacement of CFSSLProviderCLI
+
+    Args:
+        :param key_algorithm: "ecdsa" (default of cfssl) or "rsa"
+        :param key_size: Curve size for ecdsa (256, 384, 521), modulus size for rsa
+    """
+
+    def __init__(self, key_algorithm: str = "ecdsa", key_size: Optional[int] = None) -> None:
+        super().__init__()
+        if key_algorithm not in ("ecdsa", "rsa"):
+            raise ValueError(f"Unsupported key algorithm {key_algorithm}")
+        self.key_algorithm = key_algorithm
+        self.key_size = key_size or (256 if key_algorithm == "ecdsa" else 2048)
+
+    @property
+    def key_type(self) -> str:
+        return f"{self.key_algorithm}-{self.key_size}"
+
+    def _private_key(self):
+        if self.key_algorithm == "rsa":
+            return rsa.generate_private_key(public_exponent=65537, key_size=self.key_size)
+        return ec.generate_private_key(_CURVES[self.key_size]())
+
+    @staticmethod
+    def _csr(private_key, common_name, names, hosts) -> x509.CertificateSigningRequest:
+        builder = x509.CertificateSigningRequestBuilder().subject_name(_subject(common_name, names))
+        if hosts:
+            builder = builder.add_extension(x509.SubjectAlternativeName([_general_name(i) for i in hosts]), False)
+        return builder.sign(private_key, _hash_for(private_key))
+
+    def generate_key(
+        self, common_name: str, names: Optional[List[Dict[str, str]]] = None, hosts: Optional[List[str]] = None
+    ) -> UnsignedKey:
+        private_key = self._private_key()
+        csr = self._csr(private_key, common_name, names, hosts)
+        return UnsignedKey(key=_pem_key(private_key), csr=csr.public_bytes(serialization.Encoding.PEM).decode())
+
+    def generate_ca(
+        self, common_name: str, names: List[Dict[str, str]], hosts: List[str]
+    ) -> Tuple[Certificate, UnsignedKey]:
+        key = self.generate_key(common_name, names, hosts)
+        private_key = _load_key(key.key)
+        csr = x509.load_pem_x509_csr(key.csr.encode())
+        certificate = _issue(csr, csr.subject, private_key, None, CA_PROFILE)
+        return Certificate(key=key.key, certificate=certificate), key
+
+    def sign(self, key: UnsignedKey, certificate_authority: Optional[Certificate] = None) -> Certificate:
+        return Certificate(key=key.key, certificate=self._sign(key, certificate_authority, DEFAULT_PROFILE))
+
+    def sign_intermediate_ca(self, key: UnsignedKey, certificate_authority: Certificate) -> Certificate:
+        return Certificate(key=key.key, certificate=self._sign(key, certificate_authority, INTERMEDIATE_PROFILE))
+
+    @staticmethod
+    def _sign(key: UnsignedKey, certificate_authority: Optional[Certificate], profile: Profile) -> str:
+        """Sign the csr by the authority, self-signed if there is no authority"""
+        csr = x509.load_pem_x509_csr(key.csr.encode())
+        if certificate_authority is None:
+            return _issue(csr, csr.subject, _load_key(key.key), None, profile)
+        issuer = x509.load_pem_x509_certificate(certificate_authority.certificate.encode())
+        return _issue(csr, issuer.subject, _load_key(certificate_authority.key), issuer, profile)
+
+
+def _pem_key(private_key) -> str:
+    """Key in the same format as cfssl outputs it (PKCS#1 / SEC1)"""
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()
+    ).decode()
+
+
+def _issue(csr, issuer_name: x509.Name, issuer_key, issuer: Optional[x509.Certificate], profile: Profile) -> str:
+    """Create certificate for the csr signed by the issuer key"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    public_key = csr.public_key()
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(csr.subject)
+        .issuer_name(issuer_name)
+        .public_key(public_key)
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + profile.expiry)
+        .add_extension(x509.SubjectKeyIdentifier.from_public_key(public_key), False)
+    )
+    for extension, critical in profile.extensions():
+        builder = builder.add_extension(extension, critical)
+    if issuer is not None:
+        builder = builder.add_extension(
+            x509.AuthorityKeyIdentifier.from_issuer_public_key(issuer.public_key()), False  # type: ignore[arg-type]
+        )
+    try:
+        san = csr.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+        builder = builder.add_extension(san.value, False)
+    except x509.ExtensionNotFound:
+        pass
+    return builder.sign(issuer_key, _hash_for(issuer_key)).public_bytes(serialization.Encoding.PEM).decode()
@@ -4,7 +4,7 @@ import os
 import shutil
 import tempfile
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Optional
 
 
 class TmpFilePersist(ABC):
@@ -12,7 +12,7 @@ class TmpFilePersist(ABC):
 
     def __init__(self) -> None:
         super().__init__()
-        self._files = None
+        self._files: Optional[Dict[str, str]] = None
         self._dir = None
 
     @property
@@ -41,9 +41,14 @@ class TmpFilePersist(ABC):
             self._files = self.persist()
         return self._files
 
+    def use_files(self, files: Dict[str, str]):
+        """Use already existing files instead of temporary ones, these are not removed by delete_files"""
+        self._files = files
+
     def delete_files(self):
         """Deletes temporary files"""
         if self._files:
-            shutil.rmtree(self._dir)
+            if self._dir:
+                shutil.rmtree(self._dir)
             self._files = None
             self._dir = None
@@ -1,12 +1,20 @@
 """CertificateStore concrete classes."""
 
+import datetime
+import fcntl
+import logging
 import os
+import shutil
 import tempfile
 from abc import ABC
-from typing import Dict
+from typing import Callable, Dict
+
+from cryptography import x509
 
 from testsuite.certificates import CertificateStore, Certificate
 
+log = logging.getLogger(__name__)
+
 
 def _persist(path, name: str, ext: str, content: str):
     with open(os.path.join(path, f"{name}.{ext}"), "w", encoding="utf8") as file:
@@ -62,3 +70,61 @@ class InMemoryCertificateStore(CertificateStore):
 
     def __getitem__(self, key: str):
         return self.data[key]
+
+
+# pylint: disable=too-few-public-methods
+class DiskCertificateStore(InMemoryCertificateStore):
+    """
+    Content addressed certificate cache on local disk shared by runs and xdist workers.
+
+    Certificates are stored under digest of everything they are generated from
+    (see CertificateManager), so identical certificates are reused instead of
+    regenerated. Labels are kept in memory only, as in InMemoryCertificateStore.
+    Creation of each certificate is guarded by file lock, so parallel workers
+    wait for the one generating it.
+
+    Args:
+        :param path: Directory of the cache
+        :param min_validity: Cached certificates expiring sooner are regenerated
+    """
+
+    def __init__(self, path: str, min_validity: datetime.timedelta = datetime.timedelta(days=7)) -> None:
+        super().__init__()
+        self.path = path
+        self.min_validity = min_validity
+        os.makedirs(path, exist_ok=True)
+
+    def _valid(self, path: str) -> bool:
+        try:
+            certificate = x509.load_pem_x509_certificate(_read(path, "certificate", "crt").encode())
+            _read(path, "key", "key")
+        except (OSError, ValueError):
+            return False
+        expires = certificate.not_valid_after_utc
+        return expires - datetime.datetime.now(datetime.timezone.utc) > self.min_validity
+
+    @staticmethod
+    def _load(path: str) -> Certificate:
+        certificate = Certificate(certificate=_read(path, "certificate", "crt"), key=_read(path, "key", "key"))
+        certificate.use_files(
+            {"certificate": os.path.join(path, "certificate.crt"), "key": os.path.join(path, "key.key")}
+        )
+        return certificate
+
+    def get_or_create(self, key: str, digest: str, factory: Callable[[], Certificate]) -> Certificate:
+        path = os.path.join(self.path, digest)
+        with open(os.path.join(self.path, f"{digest}.lock"), "w", encoding="utf8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if self._valid(path):
+                log.debug("Reusing cached certificate %s (%s)", key, digest)
+            else:
+                certificate = factory()
+                tmp_path = tempfile.mkdtemp(prefix=f"{digest}.", dir=self.path)
+                _persist(tmp_path, "certificate", "crt", certificate.certificate)
+                _persist(tmp_path, "key", "key", certificate.key)
+                os.chmod(os.path.join(tmp_path, "key.key"), 0o600)
+                shutil.rmtree(path, ignore_errors=True)
+                os.replace(tmp_path, path)
+                log.debug("Cached new certificate %s (%s)", key, digest)
+        self[key] = self._load(path)
+        return self[key]
@@ -6,18 +6,22 @@ e.g httpbin-go returns headers 'Host': ["httpbingo.org"], but httpbin returns 'H
 # pylint: disable=too-few-public-methods
 
 import urllib.parse
+from typing import Dict, Optional, Tuple
 
 import requests
 from requests.structures import CaseInsensitiveDict
 
+# backend flavor detected by response shape seen from particular host, see EchoedRequest.create
+_FLAVORS: Dict[Tuple, type] = {}
+
 
 class EchoedRequest:
     """Default wrapper over backend"""
 
-    def __init__(self, response: requests.Response) -> None:
+    def __init__(self, response: requests.Response, json: Optional[dict] = None) -> None:
         self.response = response
-        self.json = response.json()
-        self.headers: CaseInsensitiveDict = CaseInsensitiveDict(data=self.json.get("headers"))
+        self.json = response.json() if json is None else json
+        self.headers: CaseInsensitiveDict = CaseInsensitiveDict(data=self._raw_headers())
         self.params = self.json.get("args")
 
         # non-zero length string needs to be parsed and converted to dict
@@ -32,55 +36,71 @@ class EchoedRequest:
         self.body = self.json.get("body", self.json.get("data"))
         self.path = self.json.get("path")
 
+    def _raw_headers(self) -> dict:
+        """Headers as returned by the backend, subclasses normalize them"""
+        return self.json.get("headers") or {}
+
     @staticmethod
     def create(response: requests.Response):
-        """Factory method to create different backends"""
+        """Factory method to create different backends
+
+        Response is parsed just once and the detected backend is remembered
+        per host and shape of the response to avoid repeated detection"""
 
         data = response.json()
-        headers = data.get("headers", {})
+        headers = data.get("headers") or {}
+        first_header = next(iter(headers.values()), None)
+        key = (
+            urllib.parse.urlsplit(str(response.url)).netloc,
+            frozenset(data),
+            "HTTP_HOST" in headers,
+            isinstance(first_header, list),
+        )
+
+        flavor = _FLAVORS.get(key)
+        if flavor is None:
+            flavor = _FLAVORS[key] = EchoedRequest._detect(data, headers)
+        return flavor(response, data)
+
+    @staticmethod
+    def _detect(data: dict, headers: dict) -> type:
+        """Backend type based on the content of the response"""
 
         if "HTTP_HOST" in headers:
-            return _EchoApiRequest(response)
+            return _EchoApiRequest
 
         if "keepAlive" in data and "secure" in data:
-            return _MockServerRequest(response)
+            return _MockServerRequest
 
         if "queryStringParameters" in data:
-            return _MockServerRequest(response)
-
-        if list in [type(i) for i in headers.values()]:
-            return _HttpbinGoRequest(response)
+            return _MockServerRequest
 
-        if list in [type(i) for i in data.get("args", {}) if len(i) == 1]:
-            return _HttpbinGoRequest(response)
+        if any(isinstance(i, list) for i in headers.values()):
+            return _HttpbinGoRequest
 
-        return EchoedRequest(response)
+        return EchoedRequest
 
 
 class _EchoApiRequest(EchoedRequest):
     """Wrapper over Echo api backend"""
 
-    def __init__(self, response: requests.Response) -> None:
-        super().__init__(response)
-        self.headers = self.__process_headers()
+    def __init__(self, response: requests.Response, json: Optional[dict] = None) -> None:
+        super().__init__(response, json)
         if isinstance(self.params, str) and len(self.params) == 0:
             self.params = {}
 
-    def __process_headers(self) -> CaseInsensitiveDict:
-        headers = self.headers
-        http_header_keys = filter(lambda x: x.startswith("HTTP_"), list(self.headers.keys()))
-        for key in http_header_keys:
-            new_key = key.replace("HTTP_", "").replace("_", "-")
-            headers[new_key] = headers[key]
-        return CaseInsensitiveDict(headers)
+    def _raw_headers(self) -> dict:
+        """Besides original HTTP_* keys headers are available also under their real names"""
+        headers = dict(super()._raw_headers())
+        for key, value in list(headers.items()):
+            if key.startswith("HTTP_"):
+                headers[key[5:].replace("_", "-")] = value
+        return headers
 
 
 def _flatten(dict_):
     """Convert list values in dict to string values"""
-    for k, val in dict_.items():
-        if isinstance(val, list):
-            dict_[k] = ",".join(val)
-    return CaseInsensitiveDict(data=dict_)
+    return {k: ",".join(val) if isinstance(val, list) else val for k, val in dict_.items()}
 
 
 def _flatten_single_params(params):
@@ -97,9 +117,11 @@ def _flatten_single_params(params):
 class _HttpbinGoRequest(EchoedRequest):
     """Wrapper over Httpbin go backend"""
 
-    def __init__(self, response: requests.Response) -> None:
-        super().__init__(response)
-        self.headers = _flatten(self.headers)
+    def _raw_headers(self) -> dict:
+        return _flatten(super()._raw_headers())
+
+    def __init__(self, response: requests.Response, json: Optional[dict] = None) -> None:
+        super().__init__(response, json)
         self.params = _flatten_single_params(self.params)
         if "url" in self.json:
             self.path = urllib.parse.urlparse(self.json["url"]).path
@@ -110,7 +132,9 @@ class _HttpbinGoRequest(EchoedRequest):
 class _MockServerRequest(EchoedRequest):
     """Wrapper over MockServer backend"""
 
-    def __init__(self, response: requests.Response) -> None:
-        super().__init__(response)
-        self.headers = _flatten(self.headers)
+    def _raw_headers(self) -> dict:
+        return _flatten(super()._raw_headers())
+
+    def __init__(self, response: requests.Response, json: Optional[dict] = None) -> None:
+        super().__init__(response, json)
         self.params = _flatten_single_params(self.json.get("queryStringParameters", {}))
@@ -1,16 +1,249 @@
-"""Pytest plugin for collecting gateway logs"""
+"""Pytest plugin for collecting gateway logs
 
-from datetime import datetime, timezone
+Logs of gateways deployed in Openshift are streamed continuously by `LogTailer`
+in background into bounded `LogBuffer` and every test phase takes just its own
+time range from it. Other gateways are asked for logs after each phase.
+"""
+
+import atexit
+import bisect
 import logging
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
 import pytest
 from _pytest.outcomes import Skipped
+from weakget import weakget
 
+from testsuite import apicast_logs
+from testsuite.config import settings
 from testsuite.gateways.gateways import Capability
+from testsuite.openshift.deployments import Deployment
 
 log = logging.getLogger(__name__)
 
 
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse RFC3339 timestamp as printed by `oc logs --timestamps`, nanoseconds are truncated"""
+    try:
+        value = value.rstrip("Z")
+        if "." in value:
+            seconds, fraction = value.split(".", 1)
+            value = f"{seconds}.{fraction[:6]}"
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+class _Chunk:
+    """Lines with timestamps, compressed once the chunk is full
+
+    Lines are located by offsets of their ends in the joined text, lines may
+    contain any characters, e.g. carriage returns printed by the gateway.
+    """
+
+    def __init__(self):
+        self.times: List[datetime] = []
+        self.ends: List[int] = []
+        self.lines: Optional[List[str]] = []
+        self.compressed: Optional[bytes] = None
+        self.size = 0
+
+    def append(self, timestamp: datetime, line: str):
+        """Add a line, timestamps are expected in ascending order"""
+        self.times.append(timestamp)
+        self.ends.append((self.ends[-1] if self.ends else 0) + len(line))
+        self.lines.append(line)  # type: ignore[union-attr]
+        self.size += len(line)
+
+    def compress(self):
+        """Replace lines by their compressed form"""
+        self.compressed = zlib.compress("".join(self.lines).encode(), 1)  # type: ignore[arg-type]
+        self.lines = None
+        self.size = len(self.compressed)
+
+    def slice(self, start: datetime, end: datetime) -> str:
+        """Lines with timestamp in [start, end)"""
+        first = bisect.bisect_left(self.times, start)
+        last = bisect.bisect_left(self.times, end)
+        if self.lines is not None:
+            return "".join(self.lines[first:last])
+        text = zlib.decompress(self.compressed).decode()  # type: ignore[arg-type]
+        return text[self.ends[first - 1] if first else 0 : self.ends[last - 1] if last else 0]
+
+
+class LogBuffer:
+    """Timestamp indexed ring buffer of log lines
+
+    Lines are kept in chunks of `chunk_size` characters, full chunks are
+    compressed and the oldest ones are dropped once all the chunks take more
+    than `max_size` bytes.
+    """
+
+    def __init__(self, max_size: int = 16 * 1024 * 1024, chunk_size: int = 256 * 1024):
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.last_time: Optional[datetime] = None
+        self.dropped_until: Optional[datetime] = None
+        self._chunks: List[_Chunk] = [_Chunk()]
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp: datetime, line: str):
+        """Add a line, out of order timestamps are moved to the last seen time"""
+        with self._lock:
+            if self.last_time is not None and timestamp < self.last_time:
+                timestamp = self.last_time
+            self.last_time = timestamp
+            current = self._chunks[-1]
+            current.append(timestamp, line)
+            if current.size >= self.chunk_size:
+                current.compress()
+                self._size += current.size
+                self._chunks.append(_Chunk())
+                while self._size > self.max_size and len(self._chunks) > 2:
+                    dropped = self._chunks.pop(0)
+                    self._size -= dropped.size
+                    self.dropped_until = dropped.times[-1]
+
+    def slice(self, start: datetime, end: Optional[datetime] = None) -> str:
+        """Lines logged in [start, end)"""
+        end = end or datetime.max.replace(tzinfo=timezone.utc)
+        with self._lock:
+            chunks = [i for i in self._chunks if i.times and i.times[0] < end and i.times[-1] >= start]
+            if self.dropped_until is not None and start <= self.dropped_until:
+                log.warning("Gateway logs before %s were dropped from the buffer", self.dropped_until)
+            return "".join(chunk.slice(start, end) for chunk in chunks)
+
+    @property
+    def size(self) -> int:
+        """Approximate size of the buffer in bytes"""
+        with self._lock:
+            return self._size + self._chunks[-1].size
+
+
+# pylint: disable=too-many-instance-attributes
+class LogTailer:
+    """Streams logs of deployment into LogBuffer in background thread, the stream is restarted if it ends
+    (e.g. after rollout of new pod)
+
+    Args:
+        :param deployment: Deployment to follow
+        :param max_size: Upper bound of the buffer in bytes
+        :param settle: Maximum of seconds waited for logs of a time range to arrive
+    """
+
+    def __init__(self, deployment: Deployment, max_size: int = 16 * 1024 * 1024, settle: float = 1.0):
+        self.deployment = deployment
+        self.buffer = LogBuffer(max_size)
+        self.settle = settle
+        self.started = datetime.now(timezone.utc)
+        self._last_arrival = time.monotonic()
+        self._arrived = threading.Condition()
+        self._process = None
+        self._at_last: set = set()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"logs-{deployment.name}", daemon=True)
+
+    def start(self) -> "LogTailer":
+        """Start following the logs"""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop following the logs"""
+        self._stopped.set()
+        if self._process is not None:
+            self._process.kill()
+        self._thread.join(10)
+
+    def _run(self):
+        since: Optional[datetime] = self.started
+        delay = 1
+        while not self._stopped.is_set():
+            received = 0
+            try:
+                self._process = self.deployment.follow_logs(since_time=since)
+                received = self._follow(self._process)
+                self._process.wait()
+            except Exception as err:  # pylint: disable=broad-except
+                log.debug("Following logs of %s failed: %s", self.deployment, err)
+            # continue where the stream ended (e.g. pod was replaced), overlapping lines are skipped in _follow
+            since = self.buffer.last_time or since
+            # back off if the deployment is gone
+            delay = 1 if received else min(delay * 2, 30)
+            self._stopped.wait(delay)
+
+    def _follow(self, process) -> int:
+        """Read the stream into buffer, returns number of new lines"""
+        received = 0
+        for raw in process.stdout:
+            timestamp_str, _, line = raw.decode("utf-8", errors="replace").partition(" ")
+            timestamp = parse_timestamp(timestamp_str)
+            if timestamp is None:
+                continue
+            line = line if line.endswith("\n") else line + "\n"
+            last = self.buffer.last_time
+            if last is not None and (timestamp < last or (timestamp == last and line in self._at_last)):
+                continue
+            if timestamp != last:
+                self._at_last = set()
+            self._at_last.add(line)
+            self.buffer.append(timestamp, line)
+            received += 1
+            with self._arrived:
+                self._last_arrival = time.monotonic()
+                self._arrived.notify_all()
+        return received
+
+    def logs(self, start: datetime, end: datetime, quiet: float = 0.2) -> str:
+        """Logs in [start, end), waits shortly until the lines logged before the end arrive"""
+        deadline = time.monotonic() + max(0.0, self.settle - (datetime.now(timezone.utc) - end).total_seconds())
+        with self._arrived:
+            while (self.buffer.last_time is None or self.buffer.last_time < end) and time.monotonic() < deadline:
+                if time.monotonic() - self._last_arrival >= quiet:
+                    break
+                self._arrived.wait(quiet)
+        return self.buffer.slice(start, end)
+
+
+class _Tailers:
+    """Tailers shared by all the tests, one per deployment"""
+
+    def __init__(self):
+        self._tailers: Dict[Tuple, LogTailer] = {}
+        self._lock = threading.Lock()
+
+    def get(self, gateway) -> Optional[LogTailer]:
+        """Tailer of the gateway, None if the gateway logs can't be streamed"""
+        if not weakget(settings)["reporting"]["tail_app_logs"] % True:
+            return None
+        deployment = getattr(gateway, "deployment", None)
+        if not isinstance(deployment, Deployment):
+            return None
+        openshift = deployment.openshift
+        key = (openshift.server_url, openshift.project_name, deployment.resource)
+        with self._lock:
+            if key not in self._tailers:
+                max_size = weakget(settings)["reporting"]["app_logs_buffer_mb"] % 16
+                self._tailers[key] = LogTailer(deployment, max_size=max_size * 1024 * 1024).start()
+            return self._tailers[key]
+
+    def stop(self):
+        """Stop all the tailers"""
+        with self._lock:
+            for tailer in self._tailers.values():
+                tailer.stop()
+            self._tailers.clear()
+
+
+TAILERS = _Tailers()
+atexit.register(TAILERS.stop)
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_setup(item):
     """Figures out what gateways are in use and when did he test setup started"""
@@ -59,9 +292,13 @@ def _print_logs(item, start_time, phase, suffix):
         for gateway_name, gateway in item.gateways.items():
             name = f" {gateway_name} ({suffix}) "
             if Capability.LOGS in gateway.CAPABILITIES:
-                item.add_report_section(
-                    phase, "stdout", _generate_log_section(name, gateway.get_logs(since_time=start_time))
-                )
+                logs = _get_logs(gateway, start_time)
+                item.add_report_section(phase, "stdout", _generate_log_section(name, logs))
+                if phase == "call" and weakget(settings)["reporting"]["app_logs_latency"] % False:
+                    access = apicast_logs.parse(logs).access
+                    if len(access) > 0:
+                        name = f" {gateway_name} (latency [ms]) "
+                        item.add_report_section(phase, "stdout", _generate_log_section(name, access.summary()))
             else:
                 item.add_report_section(
                     phase, "stdout", _generate_log_section(name, "Gateway doesn't have LOGS capability")
@@ -73,6 +310,16 @@ def _print_logs(item, start_time, phase, suffix):
         )
 
 
+def _get_logs(gateway, start_time):
+    """Logs of the gateway since start_time, from the background tailer if possible"""
+    end_time = datetime.now(timezone.utc)
+    tailer = TAILERS.get(gateway)
+    # logs before the tailer started are not in its buffer
+    if tailer is None or start_time < tailer.started:
+        return gateway.get_logs(since_time=start_time)
+    return tailer.logs(start_time, end_time)
+
+
 def _generate_log_section(name, content):
     """Generates log section"""
     header = "{:~^80}".format(name)
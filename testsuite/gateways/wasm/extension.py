@@ -3,6 +3,7 @@
 import importlib_resources as resources
 from threescale_api.resources import Service
 
+from testsuite import proxy_configs
 from testsuite.openshift.client import OpenShiftClient
 
 
@@ -121,7 +122,7 @@ class WASMExtension:
         """Take all mapping rules from current production config and deploy in extension"""
         self.remove_all_mapping_rules()
         # warning: not using backoff that was before used on below function
-        config = self.service.proxy.list().configs.latest(env="production")
+        config = proxy_configs.latest(self.service, env="production")
         map_rules = config["content"]["proxy"]["proxy_rules"]
         self.add_mapping_rules(map_rules)
 
@@ -187,7 +188,7 @@ class WASMExtension:
         Returns True if credentials changed or were not synchronised before, otherwise false
         """
         # warning: not using backoff that was before used on below function
-        config = self.service.proxy.list().configs.latest(env="production")
+        config = proxy_configs.latest(self.service, env="production")
 
         auth_app_id = config["content"]["proxy"]["auth_app_id"]
         auth_app_key = config["content"]["proxy"]["auth_app_key"]
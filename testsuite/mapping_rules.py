@@ -0,0 +1,80 @@
+"""
+Bulk creation of mapping rules
+
+Mapping rules of products and backends are created concurrently (bounded
+number of requests in flight), every owner is verified by single list request
+and every affected product is deployed exactly once at the end.
+
+    mapping_rules.create(
+        [(backend, rawobj.Mapping(metric, f"/anything/{i}")) for i in range(10)],
+        products=[service],
+    )
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Tuple
+
+from threescale_api.resources import Proxy, Service
+
+log = logging.getLogger(__name__)
+
+
+class MappingRulesMissing(Exception):
+    """Created mapping rules are not listed by their owner"""
+
+
+def _key(owner) -> Tuple[str, Any]:
+    if isinstance(owner, Proxy):
+        return "Proxy", owner["service_id"]
+    return owner.__class__.__name__, owner.entity_id
+
+
+# pylint: disable=too-many-arguments
+def create(
+    rules: Iterable[Tuple[Any, dict]],
+    products: Iterable[Service] = (),
+    max_workers: int = 8,
+    deploy: bool = True,
+    verify: bool = True,
+) -> List:
+    """
+    Create mapping rules and deploy affected products once
+
+    @param [List] Pairs of owner (product, its proxy or backend) and rawobj.Mapping
+    @param [List] Products using the backends, products owning the rules are included automatically
+    @param [Int] Maximum of concurrent requests
+    @param [Bool] Deploy the affected products (to staging)
+    @param [Bool] Check that all the rules are listed by their owners
+    @return [List] Created mapping rules in the order of the specs
+    """
+    rules = list(rules)
+    owners: Dict[Tuple[str, Any], Any] = {}
+    affected: Dict[Any, Service] = {i.entity_id: i for i in products}
+    for owner, _ in rules:
+        owners.setdefault(_key(owner), owner)
+        if isinstance(owner, Service):
+            affected.setdefault(owner.entity_id, owner)
+        elif isinstance(owner, Proxy):
+            affected.setdefault(owner["service_id"], owner.service)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        created = list(pool.map(lambda rule: rule[0].mapping_rules.create(params=rule[1]), rules))
+        if verify:
+            listed = dict(zip(owners, pool.map(lambda owner: owner.mapping_rules.list(), owners.values())))
+            ids = {key: {i.entity_id for i in value} for key, value in listed.items()}
+            missing = [
+                (owner, rule) for (owner, _), rule in zip(rules, created) if rule.entity_id not in ids[_key(owner)]
+            ]
+            if missing:
+                raise MappingRulesMissing(
+                    "Mapping rules not listed after creation: "
+                    + ", ".join(f"{rule['http_method']} {rule['pattern']} of {_key(owner)}" for owner, rule in missing)
+                )
+        if deploy:
+            list(pool.map(lambda product: product.proxy.deploy(), affected.values()))
+
+    log.info(
+        "Created %d mapping rule(s) of %d owner(s), deployed %d product(s)", len(created), len(owners), len(affected)
+    )
+    return created
@@ -9,6 +9,7 @@ from typing import List, Dict, Union, Any, Optional, Callable, Sequence
 
 import openshift_client as oc
 import yaml
+from openshift_client.context import cur_context
 
 from testsuite.openshift.crd.apimanager import APIManager
 from testsuite.openshift.crd.operator import Operator
@@ -45,6 +46,23 @@ class OpenShiftClient:
             stack.enter_context(oc.token(self.token))
         stack.enter_context(oc.project(self.project_name))
 
+    def oc_command(self, verb: str, cmd_args: Sequence[str] = ()) -> List[str]:
+        """Complete oc command line with the context of this client, for commands which has to run
+        outside of openshift_client e.g. long-running `oc logs --follow`"""
+        with ExitStack() as stack:
+            self.prepare_context(stack)
+            context = cur_context()
+            command = [context.get_oc_path(), verb, *cmd_args, f"--namespace={context.get_project()}"]
+            if context.get_api_server():
+                command.append(f"--server={context.get_api_server()}")
+            if context.get_token():
+                command.append(f"--token={context.get_token()}")
+            if context.get_kubeconfig_path():
+                command.append(f"--kubeconfig={context.get_kubeconfig_path()}")
+            if context.get_skip_tls_verify():
+                command.append("--insecure-skip-tls-verify=true")
+        return command
+
     @cached_property
     def api_url(self):
         """Returns real API url"""
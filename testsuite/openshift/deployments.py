@@ -1,6 +1,7 @@
 """Module containing Deployment related classes"""
 
 import os
+import subprocess
 import typing
 from abc import ABC, abstractmethod
 from contextlib import ExitStack
@@ -148,6 +149,23 @@ class Deployment(ABC):
             logs = pod.logs(tail, cmd_args=cmd_args)
         return "".join(logs.values())
 
+    def follow_logs(self, since_time=None) -> subprocess.Popen:
+        """
+        Start `oc logs --follow` for the most recent deployment, every line is prefixed by RFC3339 timestamp
+
+        :param since_time starting time from logs
+        :return: running process with logs on stdout
+        """
+        cmd_args = ["--follow", "--timestamps", self.resource]
+        if since_time is not None:
+            cmd_args.append(f"--since-time={since_time.replace(tzinfo=timezone.utc).isoformat()}")
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            self.openshift.oc_command("logs", cmd_args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+        )
+
     def patch(self, patch, patch_type: str = None, timeout=90):
         """Patches the deployment and waits until it is applied"""
         self.openshift.patch(self.resource_type, self.name, patch, patch_type)
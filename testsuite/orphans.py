@@ -0,0 +1,263 @@
+"""
+Scanner and purger of 3scale objects leaked by crashed runs or runs with skip_cleanup
+
+Objects are matched by the way testsuite names them: `blame()` names
+(`<name>-<whoami>-<context>-<tail>`) of the tester and `blame_desc()`
+descriptions, and they have to be older than given age, so objects of running
+tests are left alone. All the kinds are paged through concurrently, matched
+objects are deleted in dependency order (applications before products and
+accounts, products before backends) with bounded parallelism. Applications
+of deleted products or accounts are deleted with them.
+
+    python -m testsuite.orphans                  # list orphans older than 2 hours
+    python -m testsuite.orphans --delete --older-than 24 --tenants
+"""
+
+import argparse
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from threescale_api import client
+from threescale_api.utils import extract_response
+
+from testsuite import pagination
+from testsuite.config import settings
+from testsuite.utils import _whoami
+
+log = logging.getLogger(__name__)
+
+
+class Kind(NamedTuple):
+    """Kind of 3scale objects, urls are relative to admin api url of the client"""
+
+    name: str
+    collection: str
+    entity: str
+    names: Tuple[str, ...]
+    delete_path: Callable[[dict], str]
+    paged: bool = True
+    master: bool = False
+
+
+# in the order of deletion
+KINDS = (
+    Kind(
+        "applications",
+        "applications",
+        "application",
+        ("name",),
+        lambda entity: f"accounts/{entity['user_account_id']}/applications/{entity['id']}",
+    ),
+    Kind("active_docs", "active_docs", "api_doc", ("name",), lambda entity: f"active_docs/{entity['id']}", False),
+    Kind("services", "services", "service", ("name",), lambda entity: f"services/{entity['id']}"),
+    Kind("backends", "backend_apis", "backend_api", ("name",), lambda entity: f"backend_apis/{entity['id']}"),
+    Kind("accounts", "accounts", "account", ("org_name",), lambda entity: f"accounts/{entity['id']}"),
+    Kind("tenants", "accounts", "account", ("org_name",), lambda entity: f"providers/{entity['id']}", master=True),
+)
+
+
+class ScanResult(NamedTuple):
+    """Objects of the kind and those matched as orphans"""
+
+    kind: Kind
+    scanned: int
+    matched: List[dict]
+    seconds: float
+
+
+class PurgeResult(NamedTuple):
+    """Outcome of deletion of orphans of the kind, implied are deleted together with their owners"""
+
+    kind: Kind
+    deleted: int
+    implied: int
+    failed: List[dict]
+    seconds: float
+
+
+def _created(entity: dict, description_time: Optional[str]) -> Optional[datetime]:
+    """Creation time of the object, from description of blame_desc if 3scale doesn't tell"""
+    if entity.get("created_at"):
+        return datetime.fromisoformat(entity["created_at"].replace("Z", "+00:00"))
+    if description_time:
+        return datetime.strptime(description_time, "%a %b %d %H:%M:%S %Y").astimezone(timezone.utc)
+    return None
+
+
+# pylint: disable=too-few-public-methods
+class BlameMatcher:
+    """
+    Matches objects named by blame() or described by blame_desc() of the tester
+
+    Args:
+        :param user: Tester as returned by whoami
+        :param older_than: Minimal age of matched object
+    """
+
+    def __init__(self, user: str, older_than: timedelta):
+        self.name = re.compile(rf"^\S+-{re.escape(user[:6])}-\S*-[a-z0-9]+$")
+        self.description = re.compile(
+            rf"Created for '.*' executed by '{re.escape(user)}' at (?P<time>\w{{3}} \w{{3}} [ \d]\d [\d:]{{8}} \d{{4}})"
+        )
+        self.older_than = older_than
+        self.now = datetime.now(timezone.utc)
+
+    def __call__(self, kind: Kind, entity: dict) -> bool:
+        description = self.description.search(entity.get("description") or "")
+        if not description and not any(self.name.match(entity.get(i) or "") for i in kind.names):
+            return False
+        created = _created(entity, description["time"] if description else None)
+        return created is not None and self.now - created >= self.older_than
+
+
+def _pages(rest, url: str, kind: Kind, per_page: int, workers: int) -> Iterator[dict]:
+    """All the objects of the kind, `workers` pages are requested concurrently ahead"""
+
+    def _page(page: int) -> List[dict]:
+        params = {"page": page, "per_page": per_page} if kind.paged else {}
+        return extract_response(rest.get(url=url, params=params), kind.entity, kind.collection)
+
+    if not kind.paged:
+        return iter(_page(1))
+    return pagination.prefetched(_page, per_page, workers)
+
+
+class OrphanPurger:
+    """
+    Scans and purges orphans of the 3scale tenant (and tenants of master)
+
+    Args:
+        :param admin: Client of the tenant
+        :param master: Client of master, needed for tenants only
+        :param matcher: Decides which objects are orphans
+        :param workers: Maximum of concurrent requests per kind
+        :param per_page: Size of the page of listed objects
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, admin, master, matcher: Callable[[Kind, dict], bool], workers: int = 8, per_page: int = 500):
+        self.admin = admin
+        self.master = master
+        self.matcher = matcher
+        self.workers = workers
+        self.per_page = per_page
+
+    def _client(self, kind: Kind):
+        return self.master if kind.master else self.admin
+
+    def scan(self, kind: Kind) -> ScanResult:
+        """Page through objects of the kind and match orphans"""
+        start = time.perf_counter()
+        threescale = self._client(kind)
+        url = f"{threescale.admin_api_url}/{kind.collection}"
+        scanned, matched = 0, []
+        for entity in _pages(threescale.rest, url, kind, self.per_page, self.workers):
+            scanned += 1
+            if self.matcher(kind, entity):
+                matched.append(entity)
+        return ScanResult(kind, scanned, matched, time.perf_counter() - start)
+
+    def scan_all(self, kinds: Sequence[Kind]) -> List[ScanResult]:
+        """Scan all the kinds concurrently"""
+        with ThreadPoolExecutor(max_workers=len(kinds) or 1) as pool:
+            return list(pool.map(self.scan, kinds))
+
+    def _delete(self, kind: Kind, entity: dict) -> bool:
+        threescale = self._client(kind)
+        base = threescale.master_api_url if kind.master else threescale.admin_api_url
+        response = threescale.rest.delete(url=f"{base}/{kind.delete_path(entity)}", throws=False)
+        if not response.ok and response.status_code != 404:
+            log.warning("Orphan %s was not deleted: %s %s", _label(kind, entity), response.status_code, response.text)
+            return False
+        return True
+
+    def purge(self, scans: Sequence[ScanResult]) -> List[PurgeResult]:
+        """Delete orphans kind by kind in the order of the scans (dependency order of KINDS)"""
+        owners: Dict[str, set] = {i.kind.name: {e["id"] for e in i.matched} for i in scans}
+        results = []
+        for scan in scans:
+            start = time.perf_counter()
+            entities = scan.matched
+            if scan.kind.name == "applications":
+                entities = [
+                    i
+                    for i in entities
+                    if i.get("service_id") not in owners.get("services", ())
+                    and i.get("user_account_id") not in owners.get("accounts", ())
+                ]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                done = list(pool.map(lambda entity, kind=scan.kind: self._delete(kind, entity), entities))
+            failed = [entity for entity, ok in zip(entities, done) if not ok]
+            results.append(
+                PurgeResult(
+                    scan.kind,
+                    len(entities) - len(failed),
+                    len(scan.matched) - len(entities),
+                    failed,
+                    time.perf_counter() - start,
+                )
+            )
+        return results
+
+
+def _label(kind: Kind, entity: dict) -> str:
+    return f"{kind.name} {entity['id']} {next((entity[i] for i in kind.names if entity.get(i)), '')}"
+
+
+def main():
+    """List (and delete) orphans of the configured tenant"""
+    parser = argparse.ArgumentParser(description="Find and purge 3scale objects leaked by testsuite")
+    parser.add_argument("--delete", action="store_true", help="Delete the orphans, otherwise they are only listed")
+    parser.add_argument("--older-than", type=float, default=2, help="Minimal age in hours (default: 2)")
+    parser.add_argument("--user", default=None, help="Tester whose objects are matched (default: whoami)")
+    parser.add_argument("--kinds", nargs="*", help="Kinds to scan (default: all but tenants)")
+    parser.add_argument("--tenants", action="store_true", help="Scan also tenants, needs master token")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests per kind (default: 8)")
+    args = parser.parse_args()
+
+    kinds = [i for i in KINDS if (i.name in args.kinds if args.kinds else not i.master) or (args.tenants and i.master)]
+    ssl_verify = settings["ssl_verify"]
+    admin = client.ThreeScaleClient(
+        settings["threescale"]["admin"]["url"], settings["threescale"]["admin"]["token"], ssl_verify=ssl_verify, wait=0
+    )
+    master = None
+    if any(i.master for i in kinds):
+        master = client.ThreeScaleClient(
+            settings["threescale"]["master"]["url"],
+            settings["threescale"]["master"]["token"],
+            ssl_verify=ssl_verify,
+            wait=0,
+        )
+    matcher = BlameMatcher(args.user or _whoami(), timedelta(hours=args.older_than))
+    purger = OrphanPurger(admin, master, matcher, workers=args.workers)
+
+    scans = purger.scan_all(kinds)
+    for scan in scans:
+        print(
+            f"{scan.kind.name:<13} scanned {scan.scanned:6}  orphans {len(scan.matched):5}"
+            f"  {scan.scanned / scan.seconds if scan.seconds else 0:8.1f} objects/s"
+        )
+        if not args.delete:
+            for entity in scan.matched:
+                print(f"    {_label(scan.kind, entity)}")
+    if not args.delete:
+        return
+
+    leftovers = []
+    for result in purger.purge(scans):
+        print(
+            f"{result.kind.name:<13} deleted {result.deleted:6}  implied {result.implied:5}"
+            f"  failed {len(result.failed):5}"
+            f"  {result.deleted / result.seconds if result.seconds else 0:8.1f} deletes/s"
+        )
+        leftovers.extend(_label(result.kind, i) for i in result.failed)
+    if leftovers:
+        print("Leftovers:\n    " + "\n    ".join(leftovers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Streaming iteration over paginated 3scale collections
+
+`read_by_name` of threescale_api lists the whole collection page by page
+before it looks for the name, which is slow on long-lived tenants with
+thousands of products or accounts. Iterators here request several pages
+concurrently ahead, yield entities page by page as soon as the page arrives
+and stop requesting when the consumer stops (e.g. on match):
+
+    product = pagination.find(threescale.services, lambda i: i["name"] == "api")
+    backend = pagination.read_by_name(threescale.backends, backend.entity_name)
+
+`read_by_name` remembers ids of the names it has seen. Cached id is verified
+by reading the entity, so objects deleted or renamed elsewhere are looked up
+again. Fixtures creating and deleting objects keep the index up to date.
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from threescale_api.defaults import DefaultClient, DefaultResource
+from threescale_api.errors import ApiClientError
+from threescale_api.resources import Accounts
+
+log = logging.getLogger(__name__)
+
+# Collections paged by 3scale API but listed at once by threescale_api clients
+PER_PAGE: Dict[type, int] = {Accounts: 500}
+
+
+def _per_page(collection: DefaultClient) -> Optional[int]:
+    per_page = getattr(collection, "per_page", None)
+    if per_page:
+        return per_page
+    return next((size for kind, size in PER_PAGE.items() if isinstance(collection, kind)), None)
+
+
+def prefetched(fetch: Callable[[int], List], per_page: int, prefetch: int = 4) -> Generator:
+    """
+    Items of pages returned by fetch(page number), `prefetch` pages are requested concurrently ahead
+
+    Iteration stops on first page that is not full. Pages requested ahead are
+    cancelled (or left to finish in background) when the generator is closed.
+    """
+    pool = ThreadPoolExecutor(max_workers=prefetch)
+    pending = deque(pool.submit(fetch, i) for i in range(1, prefetch + 1))
+    following = prefetch + 1
+    try:
+        while pending:
+            page = pending.popleft().result()
+            yield from page
+            # server not paging the collection returns everything at once
+            if len(page) != per_page:
+                return
+            pending.append(pool.submit(fetch, following))
+            following += 1
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iterate(collection: DefaultClient, prefetch: int = 4, per_page: Optional[int] = None, **params) -> Generator:
+    """
+    Resources of the collection (e.g. threescale.services), pages are requested concurrently ahead
+
+    @param [DefaultClient] Collection client
+    @param [Int] Number of pages requested concurrently
+    @param [Int] Size of the page, the default of the collection if not set
+    @return [Generator] Resources, collections without paging are listed at once
+    """
+    per_page = per_page or _per_page(collection)
+    if not per_page:
+        yield from collection.list(params=params)
+        return
+    yield from prefetched(
+        lambda page: collection.list(params={**params, "page": page, "per_page": per_page}), per_page, prefetch
+    )
+
+
+def find(collection: DefaultClient, predicate: Callable[[Any], bool], prefetch: int = 4, **params):
+    """First resource matching the predicate, None if there is none; no more pages are listed after match"""
+    resources = iterate(collection, prefetch, **params)
+    try:
+        return next((i for i in resources if predicate(i)), None)
+    finally:
+        resources.close()
+
+
+class NameIndex:
+    """Ids of resources by (collection url, name), names are `entity_name` as in read_by_name"""
+
+    def __init__(self):
+        self._ids: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def remember(self, resource: DefaultResource):
+        """Index the resource, e.g. right after it was created"""
+        if resource.entity_name:
+            with self._lock:
+                self._ids[(resource.client.url, resource.entity_name)] = resource.entity_id
+
+    def forget(self, resource: DefaultResource):
+        """Remove the resource from the index, e.g. before it is deleted"""
+        with self._lock:
+            self._ids.pop((resource.client.url, resource.entity_name), None)
+
+    def _cached(self, collection: DefaultClient, name: str) -> Optional[DefaultResource]:
+        entity_id = self._ids.get((collection.url, name))
+        if entity_id is None:
+            return None
+        try:
+            resource = collection.read(entity_id).read()
+        except ApiClientError as error:
+            if error.code != 404:
+                raise
+            resource = None
+        if resource is None or resource.entity_name != name:
+            log.debug("Cached %s of %s is no longer valid", name, collection.url)
+            with self._lock:
+                self._ids.pop((collection.url, name), None)
+            return None
+        return resource
+
+    def read_by_name(self, collection: DefaultClient, name: str, prefetch: int = 4) -> Optional[DefaultResource]:
+        """
+        Resource of the name, like collection.read_by_name
+
+        Cached id is used if it is still valid, otherwise the collection is
+        iterated (every resource on the way is indexed) until the name is found.
+        """
+        resource = self._cached(collection, name)
+        if resource is not None:
+            return resource
+
+        def _match(item):
+            self.remember(item)
+            return item.entity_name == name
+
+        return find(collection, _match, prefetch)
+
+
+NAMES = NameIndex()
+
+
+def read_by_name(collection: DefaultClient, name: str, cached: bool = True) -> Optional[DefaultResource]:
+    """Resource of the name in the collection, None if there is none, see NameIndex"""
+    if cached:
+        return NAMES.read_by_name(collection, name)
+    return find(collection, lambda i: i.entity_name == name)
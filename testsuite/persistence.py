@@ -0,0 +1,135 @@
+"""
+Persistence of fixture values between runs (make persistence-store/persistence-load)
+
+Values of fixtures are pickled when they are set up and stored per test module
+into separate gzip-compressed records, fixtures of session (and package) scope
+into one record per xdist worker. Every worker writes index of its records,
+so the store is written without any coordination of the workers:
+
+    <directory>/index-<worker>.json   {group: {"record": file, "fixtures": count}}
+    <directory>/<digest>.pickle.gz    {fixture key: pickled value}
+
+Loading reads just the indexes, a record is decompressed the first time any of
+its fixtures is requested and every value is unpickled only when it is used.
+Fixtures not found in the store (or whose value couldn't be pickled) are set up
+normally. Values are pickled separately, references shared between fixtures
+are not preserved.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+import pytest
+
+from testsuite.balancing import module_of
+from testsuite.utils import xdist_worker
+
+log = logging.getLogger(__name__)
+
+
+def _group(fixturedef, request) -> str:
+    """Record the fixture belongs to"""
+    if fixturedef.scope in ("session", "package"):
+        return f"{request.node.nodeid or 'session'}@{xdist_worker()}"
+    return module_of(request.node.nodeid)
+
+
+def _key(fixturedef, request) -> str:
+    """Identity of the fixture value within its record"""
+    return f"{request.node.nodeid}::{fixturedef.argname}[{getattr(request, 'param_index', 0)}]"
+
+
+def _record_file(group: str) -> str:
+    return hashlib.sha1(group.encode()).hexdigest()[:16] + ".pickle.gz"
+
+
+class PersistenceStore:
+    """Plugin storing values of the fixtures
+
+    Args:
+        :param directory: Directory of the store, created if missing
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.records: Dict[str, Dict[str, bytes]] = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        """Pickle value of successfully set up fixture"""
+        outcome = yield
+        if outcome.excinfo is not None:
+            return
+        try:
+            value = pickle.dumps(outcome.get_result())
+        except Exception as error:  # pylint: disable=broad-except
+            log.debug("Fixture %s is not stored: %s", fixturedef.argname, error)
+            return
+        self.records.setdefault(_group(fixturedef, request), {})[_key(fixturedef, request)] = value
+
+    def pytest_sessionfinish(self):
+        """Write records and index of this worker"""
+        if not self.records:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        index = {}
+        for group, record in self.records.items():
+            name = _record_file(group)
+            tmp = self.directory / f"{name}.tmp"
+            tmp.write_bytes(gzip.compress(pickle.dumps(record), compresslevel=6))
+            os.replace(tmp, self.directory / name)
+            index[group] = {"record": name, "fixtures": len(record)}
+        tmp = self.directory / f"index-{xdist_worker()}.json.tmp"
+        tmp.write_text(json.dumps(index, indent=1), encoding="utf8")
+        os.replace(tmp, self.directory / f"index-{xdist_worker()}.json")
+        log.info("Stored %d fixtures in %d records", sum(len(i) for i in self.records.values()), len(index))
+
+
+class PersistenceLoad:
+    """Plugin providing stored values of the fixtures instead of setting them up
+
+    Args:
+        :param directory: Directory written by PersistenceStore
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.index: Dict[str, str] = {}
+        for path in sorted(self.directory.glob("index-*.json")):
+            for group, entry in json.loads(path.read_text(encoding="utf8")).items():
+                self.index[group] = entry["record"]
+        self._records: Dict[str, Dict[str, bytes]] = {}
+        self.loaded = 0
+
+    def _record(self, group: str) -> Optional[Dict[str, bytes]]:
+        """Record of the group, decompressed on first access"""
+        if group not in self.index:
+            return None
+        if group not in self._records:
+            self._records[group] = pickle.loads(gzip.decompress((self.directory / self.index[group]).read_bytes()))
+        return self._records[group]
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        """Stored value of the fixture, None lets pytest set it up"""
+        record = self._record(_group(fixturedef, request))
+        key = _key(fixturedef, request)
+        if not record or key not in record:
+            return None
+        # fixtures it depends on may have side effects needed by the test, e.g. unstored ones
+        for argname in fixturedef.argnames:
+            request.getfixturevalue(argname)
+        value = pickle.loads(record[key])
+        fixturedef.cached_result = (value, fixturedef.cache_key(request), None)
+        self.loaded += 1
+        return value
+
+    def pytest_sessionfinish(self):
+        """Report how much of the store was used"""
+        log.info("Loaded %d fixtures from %d of %d records", self.loaded, len(self._records), len(self.index))
@@ -0,0 +1,147 @@
+"""
+Policy chain builder with local validation
+
+Schemas of all the policies (builtin and custom) are fetched from the policy
+registry once per tenant and compiled to JSON-schema validators on first use,
+so invalid configuration is reported before the chain is sent to 3scale and
+the gateway is reloaded.
+
+    chain = PolicyChainBuilder(policy_schemas(threescale))
+    chain.add("headers", {"response": [...]}).add("cors", {})
+    assert chain.size() < 65535
+    chain.apply(service.proxy.list())
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import jsonschema
+
+from testsuite import rawobj
+
+log = logging.getLogger(__name__)
+
+
+class PolicyChainError(ValueError):
+    """Policy chain doesn't conform to the schemas of its policies"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("Invalid policy chain:\n" + "\n".join(errors))
+        self.errors = errors
+
+
+class PolicySchemas:
+    """Configuration schemas of policies by (name, version)"""
+
+    def __init__(self, manifests: Dict[Tuple[str, str], dict]):
+        self.manifests = manifests
+        self._validators: Dict[Tuple[str, str], jsonschema.protocols.Validator] = {}
+
+    @classmethod
+    def from_registry(cls, registry: dict) -> "PolicySchemas":
+        """Parse response of /admin/api/policies.json, policies keyed by name with list of their versions"""
+        manifests = {}
+        for name, versions in registry.items():
+            for manifest in versions if isinstance(versions, list) else [versions]:
+                manifests[(name, manifest.get("version", "builtin"))] = manifest
+        return cls(manifests)
+
+    @classmethod
+    def fetch(cls, threescale) -> "PolicySchemas":
+        """Fetch manifests of builtin and custom policies of the tenant"""
+        response = threescale.rest.get(url=f"{threescale.admin_api_url}/policies")
+        return cls.from_registry(response.json())
+
+    def validator(self, name: str, version: str = "builtin"):
+        """Compiled validator of policy configuration, None for unknown policy"""
+        key = (name, version)
+        if key not in self._validators:
+            manifest = self.manifests.get(key)
+            if manifest is None:
+                return None
+            schema = manifest.get("configuration") or {}
+            validator_class = jsonschema.validators.validator_for(schema, default=jsonschema.Draft7Validator)
+            self._validators[key] = validator_class(schema)
+        return self._validators[key]
+
+    def errors(self, policy: dict) -> List[str]:
+        """Problems of single policy of the chain"""
+        name, version = policy.get("name", ""), policy.get("version", "builtin")
+        validator = self.validator(name, version)
+        if validator is None:
+            return [f"{name} ({version}): unknown policy"]
+        return [
+            f"{name} ({version}): {'/'.join(str(i) for i in error.absolute_path) or 'configuration'}: {error.message}"
+            for error in validator.iter_errors(policy.get("configuration", {}))
+        ]
+
+
+_SCHEMAS: Dict[str, PolicySchemas] = {}
+_SCHEMAS_LOCK = threading.Lock()
+
+
+def policy_schemas(threescale) -> PolicySchemas:
+    """Policy schemas of the tenant, fetched once per session"""
+    with _SCHEMAS_LOCK:
+        if threescale.url not in _SCHEMAS:
+            _SCHEMAS[threescale.url] = PolicySchemas.fetch(threescale)
+        return _SCHEMAS[threescale.url]
+
+
+class PolicyChainBuilder:
+    """
+    Builds policy chain of `rawobj.PolicyConfig` items
+
+    Args:
+        :param schemas: Schemas to validate the chain with, chain is not validated without them
+        :param chain: Initial chain, e.g. current chain of the proxy
+    """
+
+    def __init__(self, schemas: Optional[PolicySchemas] = None, chain: Optional[List[dict]] = None):
+        self.schemas = schemas
+        self.chain: List[dict] = list(chain or [])
+
+    def add(self, name: str, configuration: Optional[dict] = None, version: str = "builtin", enabled: bool = True):
+        """Append policy to the chain"""
+        self.chain.append(rawobj.PolicyConfig(name, configuration or {}, version, enabled))
+        return self
+
+    def append(self, *policies: dict):
+        """Append already built policies"""
+        self.chain.extend(policies)
+        return self
+
+    def insert(self, index: int, *policies: dict):
+        """Insert policies at the position"""
+        self.chain[index:index] = policies
+        return self
+
+    def errors(self) -> List[str]:
+        """All the problems of the chain, empty if valid or there are no schemas"""
+        if self.schemas is None:
+            return []
+        return [f"[{i}] {error}" for i, policy in enumerate(self.chain) for error in self.schemas.errors(policy)]
+
+    def validate(self):
+        """Raise PolicyChainError if the chain is not valid"""
+        errors = self.errors()
+        if errors:
+            raise PolicyChainError(errors)
+
+    def size(self) -> int:
+        """Size of serialized chain in bytes as it is stored in proxy configuration"""
+        return len(json.dumps(self.chain).encode())
+
+    def build(self, validate: bool = True) -> List[dict]:
+        """Policy chain ready to be sent"""
+        if validate:
+            self.validate()
+        return list(self.chain)
+
+    def apply(self, proxy, validate: bool = True):
+        """Replace policy chain of the proxy by this one in single request"""
+        chain = self.build(validate)
+        log.debug("Setting policy chain of %d policies (%d bytes)", len(chain), self.size())
+        return proxy.policies.update(params={"policies_config": chain, "service_id": proxy["service_id"]})
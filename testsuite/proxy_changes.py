@@ -0,0 +1,172 @@
+"""
+Change set of product proxy configuration applied at once
+
+Every proxy update or policy chain edit rewrites proxy configuration and is
+usually followed by deploy (and promote). Changes collected in `ProxyChangeSet`
+are applied in the minimal number of API calls and deployed/promoted once:
+
+    with proxy_changes(service, promote=True) as changes:
+        changes.update({"error_status_auth_failed": 555})
+        changes.policies.append(rawobj.PolicyConfig("headers", {...}))
+        changes.add_backend(backend, "/v2")
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from threescale_api.resources import Service
+
+from testsuite import proxy_configs, resilient
+
+log = logging.getLogger(__name__)
+
+
+class PolicyChainChanges:
+    """Edits of policy chain, applied locally to the chain fetched once"""
+
+    def __init__(self):
+        self.operations: List[tuple] = []
+
+    def append(self, *policies: dict):
+        """Add policies to the end of the chain"""
+        self.operations.append(("append", policies))
+
+    def insert(self, index: int, *policies: dict):
+        """Insert policies at the position, like Policies.insert"""
+        self.operations.append(("insert", index, policies))
+
+    def remove(self, name: str):
+        """Remove all the policies of the name from the chain"""
+        self.operations.append(("remove", name))
+
+    def apply_to(self, chain: List[dict]) -> List[dict]:
+        """New chain with all the edits applied in their order"""
+        chain = list(chain)
+        for operation in self.operations:
+            if operation[0] == "append":
+                chain.extend(operation[1])
+            elif operation[0] == "insert":
+                _, index, policies = operation
+                chain[index:index] = policies
+            else:
+                chain = [i for i in chain if i["name"] != operation[1]]
+        return chain
+
+    def __bool__(self):
+        return bool(self.operations)
+
+    def __len__(self):
+        return len(self.operations)
+
+
+# pylint: disable=too-many-instance-attributes
+class ProxyChangeSet:
+    """
+    Accumulated changes of proxy attributes, policy chain and backend usages of one product
+
+    Args:
+        :param service: Product to change
+        :param deploy: Deploy the configuration to staging after the changes
+        :param promote: Promote the deployed configuration to production
+        :param version: Configuration version to promote, the latest one if not set
+    """
+
+    # calls avoided by all the change sets, for reporting
+    total_avoided_calls = 0
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, service: Service, deploy: bool = True, promote: bool = False, version: Optional[int] = None):
+        self.service = service
+        self.deploy = deploy
+        self.promote = promote
+        self.version = version
+        self.params: Dict = {}
+        self.policies = PolicyChainChanges()
+        self.new_usages: List[dict] = []
+        self.deleted_usages: List = []
+        self.updates = 0
+        self.promoted_version: Optional[int] = None
+        self.calls = 0
+        self.avoided_calls = 0
+
+    def update(self, params: dict):
+        """Change proxy attributes, later values win"""
+        self.params.update(params)
+        self.updates += 1
+
+    def add_backend(self, backend, path: str = "/"):
+        """Use the backend at the path"""
+        self.new_usages.append({"path": path, "backend_api_id": backend["id"]})
+
+    def remove_backend_usage(self, usage):
+        """Stop using backend, usage is one of service.backend_usages.list()"""
+        self.deleted_usages.append(usage)
+
+    def __bool__(self):
+        return bool(self.params or self.policies or self.new_usages or self.deleted_usages)
+
+    def _naive_calls(self) -> int:
+        """Calls made if every change was applied and deployed/promoted on its own"""
+        changes = self.updates + len(self.policies) + len(self.new_usages) + len(self.deleted_usages)
+        # policies.append/insert list the chain before the update, promote needs proxy and the latest version
+        calls = changes + len(self.policies)
+        promote = 2 if self.version is not None else 3
+        return calls + max(changes, 1) * (int(self.deploy) + promote * int(self.promote))
+
+    def apply(self):
+        """Apply all the changes in the minimal number of calls, promote is done even without changes"""
+        if not self and not self.promote:
+            return
+        calls = len(self.deleted_usages) + len(self.new_usages)
+        for usage in self.deleted_usages:
+            usage.delete()
+        for usage in self.new_usages:
+            self.service.backend_usages.create(usage)
+        if self.params:
+            resilient.proxy_update(self.service, params=self.params)
+            calls += 1
+        proxy = None
+        if self.policies or self.promote:
+            proxy = self.service.proxy.list()
+            calls += 1
+        if self.policies:
+            chain = proxy.policies.list().entity
+            chain["policies_config"] = self.policies.apply_to(chain["policies_config"])
+            chain["service_id"] = proxy["service_id"]
+            proxy.policies.update(params=chain)
+            calls += 2
+        if self.deploy:
+            self.service.proxy.deploy()
+            calls += 1
+        if self.promote:
+            self.promoted_version = self.version
+            if self.promoted_version is None:
+                self.promoted_version = proxy_configs.latest_version(self.service)
+                calls += 1
+            proxy.promote(version=self.promoted_version)
+            calls += 1
+        self.calls = calls
+        self.avoided_calls = max(0, self._naive_calls() - calls)
+        ProxyChangeSet.total_avoided_calls += self.avoided_calls
+        log.debug(
+            "Applied proxy changes of service %s in %d calls, %d avoided",
+            self.service.entity_id,
+            calls,
+            self.avoided_calls,
+        )
+
+
+@contextmanager
+def proxy_changes(service: Service, deploy: bool = True, promote: bool = False, version: Optional[int] = None):
+    """
+    Collect proxy changes in the block and apply them at its end, nothing is applied if the block fails
+
+    @param [Service] Product to change
+    @param [Bool] Deploy the configuration to staging
+    @param [Bool] Promote the configuration to production
+    @param [Int] Configuration version to promote, the latest one if not set
+    """
+    changes = ProxyChangeSet(service, deploy, promote, version)
+    yield changes
+    changes.apply()
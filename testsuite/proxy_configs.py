@@ -0,0 +1,187 @@
+"""
+Cache of proxy configuration versions
+
+Published configuration versions are immutable, so every (service, environment,
+version) is fetched from 3scale at most once. Which version is the latest is
+checked by a cheap probe: on staging (sandbox), where every deploy creates the
+next version, the version following the known latest one is requested and a
+small 404 response means there is nothing new. Production versions are the
+promoted staging versions and aren't consecutive, `latest` is requested there.
+
+    version = proxy_configs.latest_version(service)
+    content = proxy_configs.latest(service, "production")["content"]
+
+Configs are returned as plain dicts of `proxy_config` (version, environment,
+content, ...) and must not be modified.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from threescale_api.errors import ApiClientError
+from threescale_api.resources import Proxy
+
+log = logging.getLogger(__name__)
+
+
+# pylint: disable=too-few-public-methods
+class _MissingFilter(logging.Filter):
+    """Drops error logs of 404 responses of the rest client in the thread that probes"""
+
+    def __init__(self):
+        super().__init__()
+        self.thread = threading.get_ident()
+
+    def filter(self, record):
+        return record.thread != self.thread or not record.getMessage().startswith("[RES] Response(404)")
+
+
+@contextmanager
+def _quiet_missing():
+    """404 is expected answer of the probe, don't let the rest client log it as an error"""
+    client_log = logging.getLogger("threescale_api.client")
+    missing_filter = _MissingFilter()
+    client_log.addFilter(missing_filter)
+    try:
+        yield
+    finally:
+        client_log.removeFilter(missing_filter)
+
+
+def _base(owner) -> Tuple[str, Any]:
+    """Url of configs and rest client of service or its proxy"""
+    service = owner.service if isinstance(owner, Proxy) else owner
+    return f"{service.url}/proxy/configs", service.client.rest
+
+
+class ProxyConfigCache:
+    """Immutable proxy config versions keyed by (configs url, environment, version)"""
+
+    def __init__(self):
+        self._configs: Dict[Tuple[str, str, int], dict] = {}
+        self._latest: Dict[Tuple[str, str], int] = {}
+        self._listed: Dict[Tuple[str, str], List[int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+
+    def _store(self, url: str, env: str, config: dict) -> dict:
+        with self._lock:
+            self._configs[(url, env, config["version"])] = config
+            if config["version"] > self._latest.get((url, env), 0):
+                self._latest[(url, env)] = config["version"]
+        return config
+
+    def _get(self, rest, url: str, missing_ok: bool = False) -> dict:
+        """Parsed response, empty for missing resource if it is ok"""
+        self.fetches += 1
+        log.debug("Fetching proxy config(s) %s", url)
+        with _quiet_missing() if missing_ok else nullcontext():
+            response = rest.get(url=url, throws=False)
+        if missing_ok and response.status_code == 404:
+            return {}
+        if not response.ok:
+            raise ApiClientError(response.status_code, response.reason, response.content)
+        return response.json()
+
+    def _fetch_latest(self, owner, env: str) -> dict:
+        url, rest = _base(owner)
+        return self._store(url, env, self._get(rest, f"{url}/{env}/latest")["proxy_config"])
+
+    def latest_version(self, owner, env: str = "sandbox") -> int:
+        """
+        Number of the latest config version of the environment
+
+        @param [Service] Service or its proxy
+        @param [String] Environment, sandbox (staging) or production
+        @return [Int] The latest version, ApiClientError is raised if there is none
+        """
+        url, rest = _base(owner)
+        known = self._latest.get((url, env))
+        if known is None or env != "sandbox":
+            return self._fetch_latest(owner, env)["version"]
+        following = self._get(rest, f"{url}/{env}/{known + 1}", missing_ok=True)
+        if not following:
+            self.hits += 1
+            return known
+        self._store(url, env, following["proxy_config"])
+        # more deploys since the last probe, let 3scale tell which one is the last
+        return self._fetch_latest(owner, env)["version"]
+
+    def version(self, owner, version: int, env: str = "sandbox") -> dict:
+        """
+        Config of the version, fetched only the first time
+
+        @param [Service] Service or its proxy
+        @param [Int] Config version
+        @param [String] Environment, sandbox (staging) or production
+        @return [Dict] proxy_config of the version
+        """
+        url, rest = _base(owner)
+        config = self._configs.get((url, env, version))
+        if config is not None:
+            self.hits += 1
+            return config
+        return self._store(url, env, self._get(rest, f"{url}/{env}/{version}")["proxy_config"])
+
+    def latest(self, owner, env: str = "sandbox") -> dict:
+        """
+        The latest config of the environment, fetched only if it is new
+
+        @param [Service] Service or its proxy
+        @param [String] Environment, sandbox (staging) or production
+        @return [Dict] proxy_config of the latest version
+        """
+        return self.version(owner, self.latest_version(owner, env), env)
+
+    def list(self, owner, env: str = "sandbox") -> List[dict]:
+        """
+        All the configs of the environment in the order listed by 3scale, listed again only if there is new version
+
+        @param [Service] Service or its proxy
+        @param [String] Environment, sandbox (staging) or production
+        @return [List] proxy_config of every version
+        """
+        url, rest = _base(owner)
+        listed = self._listed.get((url, env))
+        if not listed or max(listed) != self.latest_version(owner, env):
+            response = self._get(rest, f"{url}/{env}")
+            configs = [self._store(url, env, i["proxy_config"]) for i in response["proxy_configs"]]
+            with self._lock:
+                self._listed[(url, env)] = listed = [i["version"] for i in configs]
+        else:
+            self.hits += 1
+        return [self._configs[(url, env, i)] for i in listed]
+
+
+_CACHE = ProxyConfigCache()
+
+
+def latest_version(owner, env: str = "sandbox") -> int:
+    """Number of the latest config version of service (or its proxy) in the environment"""
+    return _CACHE.latest_version(owner, env)
+
+
+def version(owner, config_version: int, env: str = "sandbox") -> dict:
+    """Config of the version of service (or its proxy), cached"""
+    return _CACHE.version(owner, config_version, env)
+
+
+def latest(owner, env: str = "sandbox") -> dict:
+    """The latest config of service (or its proxy) in the environment, cached"""
+    return _CACHE.latest(owner, env)
+
+
+def configs(owner, env: str = "sandbox") -> List[dict]:
+    """All the configs of service (or its proxy) in the environment, cached"""
+    return _CACHE.list(owner, env)
+
+
+def latest_or_none(owner, env: str = "sandbox") -> Optional[dict]:
+    """The latest config, None if there is no config in the environment yet"""
+    try:
+        return latest(owner, env)
+    except ApiClientError:
+        return None
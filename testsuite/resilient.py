@@ -2,11 +2,15 @@
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, List, NamedTuple
 
 import backoff
 
 from threescale_api.errors import ApiClientError
 
+from testsuite import pagination
+
 log = logging.getLogger(__name__)
 
 
@@ -26,17 +30,74 @@ def analytics_list_by_backend(threescale, backend_id, metric_name, key, threshol
     return value
 
 
+class AnalyticsExpectation(NamedTuple):
+    """Expected minimal analytics value of the metric
+
+    kind is one of 'service', 'backend' or 'application', entity is service id,
+    backend id or application object respectively"""
+
+    kind: str
+    entity: Any
+    metric_name: str
+    threshold: int = 0
+    key: str = "total"
+
+    def read(self, threescale):
+        """Current value from analytics"""
+        lister = getattr(threescale.analytics, f"list_by_{self.kind}")
+        return lister(self.entity, metric_name=self.metric_name)[self.key]
+
+
+def analytics_wait(
+    threescale, expectations: Iterable[AnalyticsExpectation], timeout=60, interval=0.5, max_interval=5
+) -> List[int]:
+    """
+    Poll analytics of all expectations concurrently until every value reaches its threshold
+
+    Unsatisfied expectations are polled again after interval that grows up to
+    max_interval, it is shortened back whenever any value moved as that means
+    backend workers are just flushing the stats.
+    @return: Values in the order of expectations
+    @raise AssertionError: Listing expectations not satisfied within timeout
+    """
+    expectations = list(expectations)
+    values: List[Any] = [None] * len(expectations)
+    pending = set(range(len(expectations)))
+    deadline = time.monotonic() + timeout
+    delay = interval
+
+    with ThreadPoolExecutor(max_workers=min(8, len(expectations) or 1)) as pool:
+        while pending:
+            current = dict(zip(pending, pool.map(lambda i: expectations[i].read(threescale), pending)))
+            moved = any(values[i] is not None and current[i] != values[i] for i in current)
+            for i, value in current.items():
+                values[i] = value
+                if value >= expectations[i].threshold:
+                    pending.discard(i)
+            if not pending:
+                break
+            if time.monotonic() + delay > deadline:
+                stalled = ", ".join(f"{expectations[i]} (last value: {values[i]})" for i in sorted(pending))
+                raise AssertionError(f"Analytics didn't reach expected values in {timeout}s: {stalled}")
+            log.debug("Waiting %.1fs for analytics of %d metric(s)", delay, len(pending))
+            time.sleep(delay)
+            delay = interval if moved else min(delay * 1.6, max_interval)
+
+    return values
+
+
 @backoff.on_predicate(backoff.fibo, lambda x: x is None, max_tries=7, jitter=None)
 def resource_read_by_name(object_instance, name: str):
     """
     Method add backoff function to read_by_name function of specified resource
     e.g. threescale. Should be used mainly in UI tests due to slower execution
-    in UI vs API.
-    @param object_instance: instance of the object e.g. threescale, threescale.backends
+    in UI vs API. Collection is iterated by pages requested concurrently and
+    ids of known names are cached, see testsuite.pagination.
+    @param object_instance: instance of the object e.g. threescale.services, threescale.backends
     @param name: Name of the specific resource to search for
     @return: Desired resource object
     """
-    return object_instance.read_by_name(name)
+    return pagination.read_by_name(object_instance, name)
 
 
 @backoff.on_exception(backoff.fibo, ApiClientError, max_tries=8, jitter=None)
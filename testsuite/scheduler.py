@@ -0,0 +1,179 @@
+"""
+Scheduling of request bursts into aligned rate-limit windows
+
+Rate limit tests have to send their requests within single limit window
+(e.g. between 15th and 45th second of a minute) otherwise the limits are
+reset in the middle of the test. Instead of each test sleeping on its own the
+scheduler waits once for the window and then runs all the submitted bursts
+concurrently within it.
+
+Time is taken from `Clock` so the waiting can be shared and simulated.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+log = logging.getLogger(__name__)
+
+
+# pylint: disable=no-self-use
+class Clock:
+    """Wall clock in UTC"""
+
+    def now(self) -> datetime:
+        """Current time"""
+        return datetime.now(timezone.utc)
+
+    def sleep(self, seconds: float):
+        """Wait given number of seconds"""
+        time.sleep(seconds)
+
+
+class MinuteWindow(NamedTuple):
+    """Part of every minute between min_sec and max_sec second"""
+
+    min_sec: int = 15
+    max_sec: int = 45
+
+    def delay(self, now: datetime) -> float:
+        """Seconds to wait until the window starts, 0 if already inside"""
+        seconds = now.second
+        if seconds < self.min_sec or seconds > self.max_sec:
+            return (60 - seconds + self.min_sec) % 60
+        return 0
+
+    def remaining(self, now: datetime) -> float:
+        """Seconds left until the window ends"""
+        return self.max_sec - now.second - now.microsecond / 1e6
+
+
+class HourWindow(NamedTuple):
+    """Part of every hour between min_min and max_min minute"""
+
+    max_min: int
+    min_min: int = 0
+
+    def delay(self, now: datetime) -> float:
+        """Seconds to wait until the window starts, 0 if already inside"""
+        minutes = now.minute
+        if minutes < self.min_min or minutes > self.max_min:
+            return ((60 - minutes + self.min_min) % 60) * 60 + 10
+        return 0
+
+    def remaining(self, now: datetime) -> float:
+        """Seconds left until the window ends"""
+        return (self.max_min - now.minute) * 60 + 60 - now.second
+
+
+Window = Union[MinuteWindow, HourWindow]
+
+
+# pylint: disable=too-few-public-methods
+class Deferred:
+    """Result of a burst submitted to the scheduler, burst is run on first access"""
+
+    def __init__(self, scheduler: "WindowScheduler", window: Window):
+        self._scheduler = scheduler
+        self._window = window
+        self._future: Optional[Future] = None
+
+    def result(self):
+        """Run all pending bursts of the window (if not done yet) and return result of this one"""
+        if self._future is None:
+            self._scheduler.flush(self._window)
+        return self._future.result()  # type: ignore[union-attr]
+
+
+class WindowScheduler:
+    """Waits for aligned windows once and runs bursts of requests concurrently within them
+
+    Args:
+        :param clock: Source of time, wall clock by default
+        :param max_workers: Maximum number of bursts running concurrently
+    """
+
+    def __init__(self, clock: Optional[Clock] = None, max_workers: int = 8):
+        self.clock = clock or Clock()
+        self.max_workers = max_workers
+        self.waited = 0.0
+        self._lock = threading.RLock()
+        self._pending: Dict[Window, List[tuple]] = {}
+
+    def _sleep(self, seconds: float):
+        if seconds > 0:
+            log.debug("Waiting %.1fs for rate limit window", seconds)
+            self.waited += seconds
+            self.clock.sleep(seconds)
+
+    def align(self, *windows: Window, duration: float = 0):
+        """Wait until all the windows are open with at least `duration` seconds left
+
+        Concurrent callers share the waiting, the ones coming later find the window already open.
+        """
+        windows = windows or (MinuteWindow(),)
+        with self._lock:
+            for _ in range(10):
+                now = self.clock.now()
+                delay = max(i.delay(now) for i in windows)
+                if delay == 0 and min(i.remaining(now) for i in windows) < duration:
+                    # not enough time left, skip to the next occurrence of the window
+                    delay = min(i.remaining(now) for i in windows) + 1
+                if delay == 0:
+                    return
+                self._sleep(delay)
+            raise RuntimeError(f"Unable to align rate limit windows {windows}")
+
+    def next_minute(self, window: MinuteWindow = MinuteWindow()):
+        """Wait for the start of the next minute when limits are reset, then for the window if needed"""
+        with self._lock:
+            now = self.clock.now()
+            self._sleep(60 - now.second)
+            if window.min_sec < now.second < window.max_sec:
+                self.align(window)
+
+    def run(self, bursts: Iterable[Callable], *windows: Window, duration: float = 0) -> list:
+        """Run all the bursts concurrently within one aligned window, results are in the order of bursts"""
+        bursts = list(bursts)
+        with self._lock:
+            self.align(*windows, duration=duration)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(bursts) or 1)) as pool:
+                futures = [pool.submit(i) for i in bursts]
+            return [i.result() for i in futures]
+
+    def submit(self, burst: Callable, window: Window = MinuteWindow(), duration: float = 0) -> Deferred:
+        """Postpone the burst until result of any burst for the same window is needed
+
+        This allows to group bursts of several fixtures/tests into single window,
+        the window is aligned to have the longest `duration` of the bursts left.
+        """
+        deferred = Deferred(self, window)
+        with self._lock:
+            self._pending.setdefault(window, []).append((deferred, burst, duration))
+        return deferred
+
+    def flush(self, window: Window = MinuteWindow()):
+        """Run all pending bursts for the window"""
+        with self._lock:
+            pending = self._pending.pop(window, [])
+            if not pending:
+                return
+            try:
+                self.align(window, duration=max(i[2] for i in pending))
+            except Exception as error:
+                # every burst of the window fails with the error, not just the one that triggered the flush
+                for deferred, *_ in pending:
+                    # pylint: disable=protected-access
+                    deferred._future = Future()
+                    deferred._future.set_exception(error)
+                raise
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                for deferred, burst, _ in pending:
+                    # pylint: disable=protected-access
+                    deferred._future = pool.submit(burst)
+
+
+DEFAULT_SCHEDULER = WindowScheduler()
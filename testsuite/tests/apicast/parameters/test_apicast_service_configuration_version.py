@@ -8,7 +8,7 @@ import pytest
 
 
 from testsuite.capabilities import Capability
-from testsuite import rawobj
+from testsuite import proxy_configs, rawobj
 
 pytestmark = [
     pytest.mark.required_capabilities(Capability.STANDARD_GATEWAY, Capability.CUSTOM_ENVIRONMENT),
@@ -19,16 +19,17 @@ pytestmark = [
 
 @pytest.fixture(scope="module")
 def service(service, staging_gateway):
-    """Forces apicast to work only with version 1 of this service's configuration.
+    """Forces apicast to work only with the initial version of this service's configuration.
 
     Sets service configuration version environment"""
 
+    version = proxy_configs.latest_version(service)
     proxy = service.proxy.list()
     # update proxy credentials so that we can have a version 2 of it
     proxy.update(rawobj.Proxy(credentials_location="authorization"))
     proxy.deploy()
 
-    staging_gateway.environ[f"APICAST_SERVICE_{service.entity_id}_CONFIGURATION_VERSION"] = 1
+    staging_gateway.environ[f"APICAST_SERVICE_{service.entity_id}_CONFIGURATION_VERSION"] = version
 
     return service
 
@@ -8,7 +8,7 @@ import json
 import pytest
 
 from testsuite.capabilities import Capability
-from testsuite import rawobj
+from testsuite import proxy_configs, rawobj
 from testsuite.gateways.apicast.template import TemplateApicast
 from testsuite.utils import blame
 
@@ -38,8 +38,7 @@ def get_apicast_config(service):
         }
     }
     """
-    proxy = service.proxy.list()
-    latest_config_version = proxy.configs.list(env="sandbox")[0]["proxy_config"]
+    latest_config_version = proxy_configs.latest(service)
 
     # make sure we're working with version 1
     assert latest_config_version["version"] == 1
@@ -2,6 +2,8 @@
 
 import pytest
 
+from testsuite.proxy_changes import proxy_changes
+
 
 @pytest.fixture(scope="module")
 def policy_settings():
@@ -15,6 +17,7 @@ def service(service, policy_settings):
     if policy_settings is not None:
         if not isinstance(policy_settings, list):
             policy_settings = [policy_settings]
-        service.proxy.list().policies.append(*policy_settings)
+        with proxy_changes(service, deploy=False) as changes:
+            changes.policies.append(*policy_settings)
 
     return service
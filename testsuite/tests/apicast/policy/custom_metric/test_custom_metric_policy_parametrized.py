@@ -97,12 +97,15 @@ def test_custom_policy(application, threescale, config, client):
         response = client.get(endpoint, params=params)
         assert response.status_code == status_code
 
-        hits_after = []
-        for i, metric in enumerate(metrics):
-            threshold = hits_before[i] + increments[i]
-            hits_after.append(
-                resilient.analytics_list_by_service(threescale, application["service_id"], metric, "total", threshold)
-            )
+        hits_after = resilient.analytics_wait(
+            threescale,
+            [
+                resilient.AnalyticsExpectation(
+                    "service", application["service_id"], metric, hits_before[i] + increments[i]
+                )
+                for i, metric in enumerate(metrics)
+            ],
+        )
 
         for i, increment in enumerate(increments):
             assert hits_after[i] - hits_before[i] == increment
@@ -10,8 +10,9 @@ import pytest
 import threescale_api
 
 from packaging.version import Version
+from testsuite.proxy_changes import ProxyChangeSet
 from testsuite.utils import blame
-from testsuite import TESTED_VERSION, rawobj
+from testsuite import TESTED_VERSION, proxy_configs, rawobj
 
 pytestmark = pytest.mark.skipif(TESTED_VERSION < Version("2.16.2"), reason="Threescale version must be at least 2.16.2")
 
@@ -36,10 +37,10 @@ def prod_client(production_gateway, application, request, testconfig):
 
     def _prod_client(app=application, promote: bool = True, version: int = -1, redeploy: bool = True):
         if promote:
-            if version == -1:
-                version = app.service.proxy.list().configs.latest()["version"]
             try:
-                app.service.proxy.list().promote(version=version)
+                ProxyChangeSet(
+                    app.service, deploy=False, promote=True, version=None if version == -1 else version
+                ).apply()
             except threescale_api.errors.ApiClientError as err:
                 warnings.warn(str(err))
                 redeploy = False
@@ -81,7 +82,7 @@ def custom_id(request):
 @pytest.fixture()
 def service_config_version(service):
     """get version of latest change"""
-    return service.proxy.list().configs.latest()["version"]
+    return proxy_configs.latest_version(service)
 
 
 @pytest.mark.parametrize("provide_fapi_id", [False, True], ids=["no_fapi_id", "fapi_id"])
@@ -4,7 +4,7 @@ Conftest for keycloak policy
 
 import pytest_cases
 
-from testsuite import rawobj
+from testsuite import proxy_configs, rawobj
 from testsuite.rhsso.rhsso import OIDCClientAuthHook
 from testsuite.utils import randomize, blame
 
@@ -99,7 +99,7 @@ def prod_client(application, production_gateway):
     Prepares application and service for production use and creates new production client
     :return Api client for application
     """
-    version = application.service.proxy.list().configs.latest()["version"]
+    version = proxy_configs.latest_version(application.service)
     application.service.proxy.list().promote(version=version)
     production_gateway.reload()
 
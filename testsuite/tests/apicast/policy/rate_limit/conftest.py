@@ -8,6 +8,7 @@ import pytest_cases
 import threescale_api.errors
 
 from testsuite import rawobj
+from testsuite.proxy_changes import ProxyChangeSet
 from testsuite.utils import blame
 
 
@@ -62,10 +63,10 @@ def prod_client(production_gateway, application, request, testconfig):
 
     def _prod_client(app=application, promote: bool = True, version: int = -1, redeploy: bool = True):
         if promote:
-            if version == -1:
-                version = app.service.proxy.list().configs.latest()["version"]
             try:
-                app.service.proxy.list().promote(version=version)
+                ProxyChangeSet(
+                    app.service, deploy=False, promote=True, version=None if version == -1 else version
+                ).apply()
             except threescale_api.errors.ApiClientError as err:
                 warnings.warn(str(err))
 
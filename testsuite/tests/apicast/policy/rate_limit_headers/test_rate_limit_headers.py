@@ -6,12 +6,12 @@ Tests that:
  - the combination of backend and service metrics should make no problem
 """
 
+from functools import partial
+
 from packaging.version import Version  # noqa # pylint: disable=unused-import
 import pytest
-import pytest_cases
-from pytest_cases import fixture_ref
 
-from testsuite.utils import blame, wait_interval
+from testsuite.utils import blame
 from testsuite import rawobj
 from testsuite import TESTED_VERSION  # noqa # pylint: disable=unused-import
 
@@ -23,10 +23,15 @@ pytestmark = [
 ]
 
 
-@pytest_cases.fixture
-def service(custom_service, service_proxy_settings, request, lifecycle_hooks, backends_mapping):
+PLANS = ["service", "backend"]
+
+# seconds backend has to process directly reported usage, the burst must fit into the window with it
+REPORT_MAX_TIME = 5
+
+
+def _service(custom_service, service_proxy_settings, backends_mapping, request, lifecycle_hooks):
     """
-    Function-scoped service with the rate limit headers policy
+    Service with the rate limit headers policy
     The caching policy is added, so the reported numbers will be 100% accurate
     """
 
@@ -41,12 +46,12 @@ def service(custom_service, service_proxy_settings, request, lifecycle_hooks, ba
     return svc
 
 
-@pytest_cases.fixture
-def app_plan_backend(service, custom_app_plan, threescale, request):
+def _app_plan_backend(service, custom_app_plan, threescale, request):
     """
     Creates a mapped metric on a backend and on a service, so the default 'hits', that are
     interconnected are not used.
     Creates an app plan with a limits on those metric, one 'minute' and the other 'hour' scoped.
+    Returns the plan and the backend metric increased by '/anything'
     """
     backend = threescale.backends.read(service.backend_usages.list()[0]["backend_id"])
     backend_metric = backend.metrics.list()[0]
@@ -61,17 +66,17 @@ def app_plan_backend(service, custom_app_plan, threescale, request):
     plan.limits(backend_metric).create({"metric_id": backend_metric["id"], "period": "minute", "value": 10})
     plan.limits(service_metric).create({"metric_id": service_metric["id"], "period": "minute", "value": 5})
 
-    return plan
+    return plan, backend_metric
 
 
-@pytest_cases.fixture
-def app_plan_service(service, custom_app_plan, request):
+def _app_plan_service(service, custom_app_plan, request):
     """
     Creates metrics and mapping rules for those metrics.
     The second mapping rule is a subset of the first one. When the second (foo) metric is increased,
     so is the first metric
 
     Creates an app plan with two limits on the created metrics.
+    Returns the plan and the anything metric
     """
     metric_anything = service.metrics.create(rawobj.Metric("anything"))
     metric_anything_foo = service.metrics.create(rawobj.Metric("foo"))
@@ -85,37 +90,94 @@ def app_plan_service(service, custom_app_plan, request):
     plan.limits(metric_anything).create({"metric_id": metric_anything["id"], "period": "minute", "value": 10})
     plan.limits(metric_anything_foo).create({"metric_id": metric_anything_foo["id"], "period": "minute", "value": 5})
 
-    return plan
+    return plan, metric_anything
 
 
-@pytest_cases.fixture
-@pytest_cases.parametrize("app_plan", [fixture_ref(app_plan_service), fixture_ref(app_plan_backend)])
-def application(app_plan, custom_application, request, lifecycle_hooks):
-    """
-    Creates an application with a application plan defined in the specified fixture
-    """
-    application = custom_application(rawobj.Application(blame(request, "limited_app"), app_plan), hooks=lifecycle_hooks)
+def _headers_burst(client, *_):
+    """Three requests increasing the anything metric"""
+    return [client.get("/anything") for _ in range(3)]
 
-    return application
 
-
-@pytest_cases.fixture
-def client(application):
-    """Fixture plus api client"""
-    return application.api_client()
+def _mapping_rules_burst(client, application, metric, backend_listener):
+    """
+    Request increasing both metrics, seven hits of just the anything metric reported directly to backend
+    and again request increasing both metrics
+    """
+    first = client.get("/anything/foo")
+    assert backend_listener.report_one(
+        application, {metric["system_name"]: 7}, max_time=REPORT_MAX_TIME
+    ), f"Reported usage not processed by backend within {REPORT_MAX_TIME}s"
+    return first, client.get("/anything/foo")
+
+
+BURSTS = {"headers": _headers_burst, "mapping_rules": _mapping_rules_burst}
+
+# seconds of the window needed by the bursts
+DURATIONS = {"headers": 0, "mapping_rules": REPORT_MAX_TIME + 5}
+
+
+# pylint: disable=too-many-arguments
+@pytest.fixture(scope="module")
+def applications(
+    custom_service,
+    service_proxy_settings,
+    backends_mapping,
+    custom_app_plan,
+    custom_application,
+    threescale,
+    request,
+    lifecycle_hooks,
+):
+    """
+    Applications and their anything metric by (burst, plan), every test has its own application,
+    so the limits are not shared
+    'service' plan limits two service metrics, 'backend' plan limits backend and service metric
+    """
+    plans = {
+        "service": _app_plan_service(
+            _service(custom_service, service_proxy_settings, backends_mapping, request, lifecycle_hooks),
+            custom_app_plan,
+            request,
+        ),
+        "backend": _app_plan_backend(
+            _service(custom_service, service_proxy_settings, backends_mapping, request, lifecycle_hooks),
+            custom_app_plan,
+            threescale,
+            request,
+        ),
+    }
+    return {
+        (burst, name): (
+            custom_application(rawobj.Application(blame(request, "limited_app"), plan), hooks=lifecycle_hooks),
+            metric,
+        )
+        for burst in BURSTS
+        for name, (plan, metric) in plans.items()
+    }
+
+
+@pytest.fixture(scope="module")
+def responses(applications, window_scheduler, backend_listener):
+    """
+    Requests of all the tests submitted to be sent together within one rate limit window,
+    the window is waited for once instead of once per test
+    """
+    return {
+        key: window_scheduler.submit(
+            partial(BURSTS[key[0]], application.api_client(), application, metric, backend_listener),
+            duration=DURATIONS[key[0]],
+        )
+        for key, (application, metric) in applications.items()
+    }
 
 
-def test_rate_limit_headers(client):
+@pytest.mark.parametrize("plan", PLANS)
+def test_rate_limit_headers(responses, plan):
     """
     - Sends three requests to the api.
     - Asserts that the information about limits from RateLimit headers is correct
     """
-
-    # prevents refreshing limits in the middle of the test
-    wait_interval()
-
-    for i in range(3):
-        response = client.get("/anything")
+    for i, response in enumerate(responses[("headers", plan)].result()):
         assert response.status_code == 200
         assert "RateLimit-Limit" in response.headers
         assert "RateLimit-Remaining" in response.headers
@@ -126,12 +188,13 @@ def test_rate_limit_headers(client):
         assert int(response.headers["RateLimit-Reset"]) <= 60
 
 
-def test_rate_limit_multiple_mapping_rules(client):
+@pytest.mark.parametrize("plan", PLANS)
+def test_rate_limit_multiple_mapping_rules(responses, plan):
     """
     - Sends a request increasing both the foo and the anything metric
     - Asserts that the RateLimits for the foo metric (the more constrained one) are sent
 
-    - Sends a number (7) of requests increasing just the anything metric,
+    - Reports a number (7) of hits of just the anything metric directly to backend,
       decreasing the number of remaining requests
     - The anything metric has now less remaining hits than the foo metric
 
@@ -139,22 +202,14 @@ def test_rate_limit_multiple_mapping_rules(client):
     - Asserts that the RateLimits for the anything metric (currently the more constrained) one are sent
 
     """
-
-    wait_interval()
-
-    response = client.get("/anything/foo")
+    response, last = responses[("mapping_rules", plan)].result()
 
     assert response.status_code == 200
     assert int(response.headers["RateLimit-Limit"]) == 5
     assert int(response.headers["RateLimit-Remaining"]) == 4
     assert int(response.headers["RateLimit-Reset"]) <= 60
 
-    for _ in range(7):
-        assert client.get("/anything").status_code == 200
-
-    response = client.get("/anything/foo")
-
-    assert response.status_code == 200
-    assert int(response.headers["RateLimit-Limit"]) == 10
-    assert int(response.headers["RateLimit-Remaining"]) == 1  # 10 - 1 - 7 - 1
-    assert int(response.headers["RateLimit-Reset"]) <= 60
+    assert last.status_code == 200
+    assert int(last.headers["RateLimit-Limit"]) == 10
+    assert int(last.headers["RateLimit-Remaining"]) == 1  # 10 - 1 - 7 - 1
+    assert int(last.headers["RateLimit-Reset"]) <= 60
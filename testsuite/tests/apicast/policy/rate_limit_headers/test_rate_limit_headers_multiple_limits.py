@@ -5,7 +5,8 @@ the currently more constrained limit are sent.
 
 from packaging.version import Version  # noqa # pylint: disable=unused-import
 import pytest
-from testsuite.utils import blame, wait_interval, wait_until_next_minute, wait_interval_hour
+from testsuite.utils import blame
+from testsuite.scheduler import HourWindow, MinuteWindow
 from testsuite import rawobj
 from testsuite import TESTED_VERSION  # noqa # pylint: disable=unused-import
 
@@ -32,7 +33,7 @@ def app_plan(service, custom_app_plan, request):
 
 
 @pytest.mark.nopersistence  # Test checks changes during test run hence is incompatible with persistence plugin
-def test_multiple_limits(api_client):
+def test_multiple_limits(api_client, window_scheduler):
     """
     - sends five requests
     - asserts that the RateLimits are correctly reported
@@ -42,10 +43,9 @@ def test_multiple_limits(api_client):
     """
     client = api_client()
 
-    wait_interval()
     # prevents refreshing the hour limits in the middle of the test, and asserts the reamining seconds in the
     # hour limit will be greater then 60
-    wait_interval_hour(max_min=57)
+    window_scheduler.align(MinuteWindow(), HourWindow(max_min=57))
 
     for i in range(5):
         response = client.get("/anything")
@@ -57,7 +57,7 @@ def test_multiple_limits(api_client):
         )
         assert int(response.headers["RateLimit-Remaining"]) == 5 - i - 1
 
-    wait_until_next_minute()
+    window_scheduler.next_minute()
 
     response = client.get("/anything")
     assert int(response.headers["RateLimit-Limit"]) == 7
@@ -5,7 +5,7 @@ Tests that the combination with the batcher policy works as supposed
 import time
 from packaging.version import Version  # noqa # pylint: disable=unused-import
 import pytest
-from testsuite.utils import blame, wait_interval
+from testsuite.utils import blame
 from testsuite import rawobj
 from testsuite import TESTED_VERSION  # noqa # pylint: disable=unused-import
 
@@ -37,7 +37,7 @@ def app_plan(service, custom_app_plan, request):
     return plan
 
 
-def test_multiple_limits(api_client):
+def test_multiple_limits(api_client, window_scheduler):
     """
     - sends a number (5) of requests
     - waits for the batcher policy to report the analytics
@@ -47,7 +47,8 @@ def test_multiple_limits(api_client):
     batcher policy is not aimed to be 100% accurate)
     """
     client = api_client()
-    wait_interval()
+    # the requests and the wait for the batcher have to fit into one minute
+    window_scheduler.align(duration=5)
 
     for _ in range(5):
         assert client.get("/anything").status_code == 200
@@ -5,6 +5,7 @@ import pytest
 from packaging.version import Version  # noqa # pylint: disable=unused-import
 
 from testsuite import rawobj, TESTED_VERSION  # noqa # pylint: disable=unused-import
+from testsuite.policy_chain import PolicyChainBuilder
 
 
 @pytest.fixture()
@@ -20,5 +21,9 @@ def test_long_policy_chain(policy, service):
     Test creates a policy chain with size greater than 65,535 bytes 7 * header policy with 10000 characters
     """
     proxy = service.proxy.list()
+    chain = PolicyChainBuilder(chain=proxy.policies.list()["policies_config"])
+    chain.append(*[policy] * 7)
+    assert chain.size() > 65535
+
     for _ in range(7):
         proxy.policies.append(policy)
@@ -9,42 +9,43 @@ import pytest
 from testsuite import rawobj
 from testsuite import resilient
 from testsuite.echoed_request import EchoedRequest
+from testsuite.proxy_changes import proxy_changes
 
 
 @pytest.fixture(scope="module")
 def service(service, private_base_url):
     """Add url_rewriting policy, configure metrics/mapping"""
     proxy = service.proxy.list()
-    proxy.policies.insert(
-        0,
-        rawobj.PolicyConfig(
-            "upstream",
-            {
-                "rules": [
-                    {"url": private_base_url("echo_api"), "regex": "v1"},
-                    {"url": private_base_url(), "regex": "v2"},
-                ]
-            },
-        ),
-    )
-    proxy.policies.append(
-        rawobj.PolicyConfig(
-            "url_rewriting",
-            {
-                "commands": [
-                    {"op": "sub", "regex": "httpbin/v1", "replace": "rewrite"},
-                    {"op": "sub", "regex": "httpbin/v2", "replace": "get"},
-                ]
-            },
+    # policies are applied and proxy is deployed once at the end, including the added mapping
+    with proxy_changes(service) as changes:
+        changes.policies.insert(
+            0,
+            rawobj.PolicyConfig(
+                "upstream",
+                {
+                    "rules": [
+                        {"url": private_base_url("echo_api"), "regex": "v1"},
+                        {"url": private_base_url(), "regex": "v2"},
+                    ]
+                },
+            ),
+        )
+        changes.policies.append(
+            rawobj.PolicyConfig(
+                "url_rewriting",
+                {
+                    "commands": [
+                        {"op": "sub", "regex": "httpbin/v1", "replace": "rewrite"},
+                        {"op": "sub", "regex": "httpbin/v2", "replace": "get"},
+                    ]
+                },
+            )
         )
-    )
 
-    metric = service.metrics.create({"name": "get_metric", "friendly_name": "get_metrics", "unit": "hit"})
+        metric = service.metrics.create({"name": "get_metric", "friendly_name": "get_metrics", "unit": "hit"})
 
-    proxy.mapping_rules.create({"http_method": "GET", "pattern": "/", "metric_id": metric["id"], "delta": 1})
+        proxy.mapping_rules.create({"http_method": "GET", "pattern": "/", "metric_id": metric["id"], "delta": 1})
 
-    # proxy needs to be updated to apply added mapping
-    proxy.deploy()
     return service
 
 
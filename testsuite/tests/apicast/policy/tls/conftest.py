@@ -5,7 +5,8 @@ import pytest
 
 from testsuite.certificates import Certificate, CertificateManager
 from testsuite.certificates.cfssl.cli import CFSSLProviderCLI
-from testsuite.certificates.stores import InMemoryCertificateStore
+from testsuite.certificates.local import LocalProvider
+from testsuite.certificates.stores import DiskCertificateStore, InMemoryCertificateStore
 from testsuite.gateways import gateway
 from testsuite.gateways.apicast.tls import TLSApicast
 from testsuite.openshift.objects import SecretKinds
@@ -22,8 +23,12 @@ def require_openshift(testconfig):
 @pytest.fixture(scope="session")
 def manager(testconfig):
     """Certificate Manager"""
-    provider = CFSSLProviderCLI(binary=testconfig["cfssl"]["binary"])
-    store = InMemoryCertificateStore()
+    if weakget(testconfig)["cfssl"]["provider"] % "cli" == "local":
+        provider = LocalProvider(weakget(testconfig)["cfssl"]["key_algorithm"] % "ecdsa")
+    else:
+        provider = CFSSLProviderCLI(binary=testconfig["cfssl"]["binary"])
+    cache_dir = weakget(testconfig)["cfssl"]["cache_dir"] % None
+    store = DiskCertificateStore(cache_dir) if cache_dir else InMemoryCertificateStore()
     return CertificateManager(provider, provider, store)
 
 
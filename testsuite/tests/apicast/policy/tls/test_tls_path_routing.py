@@ -10,6 +10,7 @@ from testsuite import rawobj, TESTED_VERSION, APICAST_OPERATOR_VERSION  # noqa #
 from testsuite.config import settings
 from testsuite.capabilities import Capability
 from testsuite.echoed_request import EchoedRequest
+from testsuite.proxy_changes import proxy_changes
 from testsuite.tests.apicast.policy.tls import embedded
 from testsuite.utils import blame
 
@@ -73,8 +74,8 @@ def service(service, service_mapping, tls_policy, logging_policy):
     """Delete mapping rules and add new one from/to default service."""
     proxy = service.proxy.list()
     metric = service.metrics.list()[0]
-    proxy.policies.append(tls_policy)
-    proxy.policies.append(logging_policy)
+    with proxy_changes(service, deploy=False) as changes:
+        changes.policies.append(tls_policy, logging_policy)
     delete_all_mapping_rules(proxy)
 
     proxy.mapping_rules.create(rawobj.Mapping(metric, service_mapping))
@@ -113,8 +114,8 @@ def service2(request, custom_service, lifecycle_hooks, service2_mapping, tls_pol
     """Create second service and mapping rule."""
     service2 = custom_service({"name": blame(request, "svc")}, backends=backends_mapping2, hooks=lifecycle_hooks)
 
-    service2.proxy.list().policies.append(tls_policy)
-    service2.proxy.list().policies.append(logging_policy)
+    with proxy_changes(service2, deploy=False) as changes:
+        changes.policies.append(tls_policy, logging_policy)
 
     metric = service2.metrics.list()[0]
     proxy = service2.proxy.list()
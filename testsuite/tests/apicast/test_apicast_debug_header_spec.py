@@ -4,6 +4,8 @@ Rewrite: ./spec/functional_specs/apicast_debug_header_spec.rb
 
 import pytest
 
+from testsuite import proxy_configs
+
 
 @pytest.mark.issue("https://issues.redhat.com/browse/THREESCALE-1849")
 def test_make_request(api_client, service, application):
@@ -16,7 +18,7 @@ def test_make_request(api_client, service, application):
     - 'X-3scale-service-name' - What is the service name
     """
     user_key = application.authobj().credentials["user_key"]
-    debug_header = service.proxy.list().configs.latest()["content"]["backend_authentication_value"]
+    debug_header = proxy_configs.latest(service)["content"]["backend_authentication_value"]
 
     response = api_client().get("/get", headers={"X-3scale-Debug": debug_header})
 
@@ -1,15 +1,27 @@
 """Test for apicast logs shows permission denied in a tmp file"""
 
+import math
 import re
+from datetime import datetime, timezone
 
 import pytest
 from packaging.version import Version  # noqa # pylint: disable=unused-import
 
-from testsuite import rawobj, TESTED_VERSION  # noqa # pylint: disable=unused-import
+from testsuite import apicast_logs, rawobj, TESTED_VERSION  # noqa # pylint: disable=unused-import
+from testsuite.capabilities import Capability
+from testsuite.proxy_changes import proxy_changes
 
 pytestmark = [pytest.mark.skipif("TESTED_VERSION < Version('2.14-dev')")]
 
 
+@pytest.fixture(scope="module")
+def service(service):
+    """Service with json access logs with request timing"""
+    with proxy_changes(service, deploy=False) as changes:
+        changes.policies.append(apicast_logs.timing_logging_policy())
+    return service
+
+
 @pytest.mark.issue("https://issues.redhat.com/browse/THREESCALE-7942")
 def test_apicast_logs_tmp_file(staging_gateway):
     """
@@ -28,3 +40,23 @@ def test_apicast_logs_nginx_warn(staging_gateway):
         "1024 or variables_hash_bucket_size: 64; ignoring variables_hash_bucket_size"
     )
     assert log not in staging_gateway.get_logs()
+
+
+@pytest.mark.required_capabilities(Capability.LOGS)
+def test_apicast_logs_timing(api_client, service, staging_gateway):
+    """
+    Test that json access logs configured by the logging policy are parsed into
+    access records with request timing of every request of the service
+    """
+    client = api_client()
+    since = datetime.now(timezone.utc)
+    for _ in range(3):
+        assert client.get("/anything").status_code == 200
+
+    access = apicast_logs.parse(staging_gateway.get_logs(since_time=since)).access
+    records = [i for i in access if i.service_id == service.entity_id and i.path == "/anything"]
+
+    assert len(records) == 3
+    for record in records:
+        assert (record.method, record.status) == ("GET", 200)
+        assert not math.isnan(record.request_time)
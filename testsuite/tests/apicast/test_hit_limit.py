@@ -19,7 +19,8 @@ import time
 import backoff
 import pytest
 from testsuite import rawobj
-from testsuite.utils import blame, wait_interval, wait_until_next_minute
+from testsuite.scheduler import MinuteWindow
+from testsuite.utils import blame
 
 pytestmark = [pytest.mark.nopersistence]
 
@@ -97,23 +98,27 @@ def assert_limit_works(client, limit):
         time.sleep(0.125)
 
 
-def test_limit_exceeded(silver_client, gold_client):
+def assert_unlimited(client, count):
+    """Assert that all the requests send via the client are accepted"""
+    for i in range(count):
+        assert client.get("/").status_code == 200, f"Response of the request " f"number {i} should be 200"
+        # wait for 0.125 as the original ruby tests waits after making request
+        time.sleep(0.125)
+
+
+def test_limit_exceeded(silver_client, gold_client, window_scheduler):
     """
     Unlimited number of requests sent via the gold app should be accepted and return 200
     Eleven requests via silver app should be accepted, the next one should be denied
     In the next minute, the eleven requests should be again accepted, further ones
     denied
     """
-    for i in range(15):
-        assert gold_client.get("/").status_code == 200, f"Response of the request " f"number {i} should be 200"
-        # wait for 0.125 as the original ruby tests waits after making request
-        time.sleep(0.125)
+    window_scheduler.run(
+        [lambda: assert_unlimited(gold_client, 15), lambda: assert_limit_works(silver_client, limit=10)],
+        MinuteWindow(),
+    )
 
-    wait_interval()
-
-    assert_limit_works(silver_client, limit=10)
-
-    wait_until_next_minute()
+    window_scheduler.next_minute()
 
     assert_limit_works(silver_client, limit=10)
 
@@ -132,7 +137,7 @@ def make_requests(api_client):
     return api_client.get("/")
 
 
-def test_retry_after(silver_client):
+def test_retry_after(silver_client, application_silver, backend_listener):
     """
     The response for denied request should contain the 'retry-after' header
     After waiting the time from the 'retry-after' header, the following requests
@@ -142,6 +147,10 @@ def test_retry_after(silver_client):
     # wait for the beginning of next minute
     time.sleep(61 - datetime.now(timezone.utc).second)
 
+    # the limit is used up directly in backend, only the denied request goes through the gateway
+    metric = application_silver.service.metrics.list()[0]
+    backend_listener.report_one(application_silver, {metric["system_name"]: 10})
+
     response = make_requests(silver_client)
 
     assert response.status_code == 429
@@ -31,13 +31,13 @@ def application(application):
 
 
 @pytest.fixture(scope="module")
-def exceed_limit(api_client):
+def exceed_limit(application, backend_listener):
     """
     Apicast allows more request to pass than is the actual limit, hence we need to exceed limit of /anything/exceeded
-    endpoint to ensure that test will pass as expected. Extraction of this functionality to a separate fixture is due
-    to the persistence plugin
+    endpoint to ensure that test will pass as expected. The usage is reported directly to backend, extraction of this
+    functionality to a separate fixture is due to the persistence plugin
     """
-    assert api_client().get("/anything/exceeded").status_code == 200
+    backend_listener.report_one(application, {"limit_exceeded": 1})
 
     return True
 
@@ -24,16 +24,30 @@ from weakget import weakget
 # pylint: disable=unused-import
 import testsuite.capabilities.providers  # noqa
 from testsuite.tools import Tools
-from testsuite import TESTED_VERSION, rawobj, HTTP2, gateways, configuration, resilient
+from testsuite import (
+    TESTED_VERSION,
+    rawobj,
+    HTTP2,
+    gateways,
+    configuration,
+    resilient,
+    balancing,
+    persistence,
+    pagination,
+)
+from testsuite.backend_listener import BackendListener
 from testsuite.capabilities import Capability, CapabilityRegistry
 from testsuite.config import settings
 from testsuite.httpx import HttpxHook
 from testsuite.mockserver import Mockserver
+from testsuite.proxy_changes import ProxyChangeSet
 from testsuite.openshift.client import OpenShiftClient
 from testsuite.prometheus import PrometheusClient
 from testsuite.rhsso import RHSSOServiceConfiguration, RHSSO
+from testsuite.scheduler import DEFAULT_SCHEDULER
 from testsuite.toolbox import toolbox
 from testsuite.utils import blame, blame_desc, warn_and_skip
+from testsuite.webhook_receiver import WebhookReceiver
 from testsuite.mailhog import MailhogClient
 
 if weakget(settings)["reporting"]["print_app_logs"] % True:
@@ -94,9 +108,29 @@ def pytest_addoption(parser):
         default=False,
         help="Skip tests incompatible with persistence " "plugin (default: False)",
     )
+    parser.addoption(
+        "--persistence-store",
+        action="store",
+        default=None,
+        metavar="DIR",
+        help="Store values of fixtures into the directory (default: None)",
+    )
+    parser.addoption(
+        "--persistence-load",
+        action="store",
+        default=None,
+        metavar="DIR",
+        help="Use values of fixtures stored in the directory instead of setting them up (default: None)",
+    )
     parser.addoption("--images", action="store_true", default=False, help="Run also image check tests (default: False)")
     parser.addoption("--tool-check", action="store_true", default=False, help="Run also tool availability check tests")
     parser.addoption("--sso-only", action="store_true", default=False, help="Run only tests that uses RHSSO/RHBK")
+    parser.addoption(
+        "--balance",
+        action="store_true",
+        default=False,
+        help="Run test modules ordered by their duration in previous runs, longest first (default: False)",
+    )
 
 
 def pytest_configure(config: pytest.Config) -> None:
@@ -112,6 +146,29 @@ def pytest_configure(config: pytest.Config) -> None:
     if (sandbag or sandbag_only) and drop_sandbag:
         raise pytest.UsageError("--sandbag/--sandbag-only and --drop-sandbag are mutually exclusive")
 
+    store = config.getoption("--persistence-store")
+    load = config.getoption("--persistence-load")
+    if store and load:
+        raise pytest.UsageError("--persistence-store and --persistence-load are mutually exclusive")
+    if store:
+        config.pluginmanager.register(persistence.PersistenceStore(store), "persistence-store")
+    if load:
+        config.pluginmanager.register(persistence.PersistenceLoad(load), "persistence-load")
+
+    # xdist would reorder files by number of tests and so override the order by duration
+    if config.getoption("--balance") and hasattr(config.option, "loadscopereorder"):
+        config.option.loadscopereorder = False
+
+    # durations are recorded by xdist controller (or the only process without xdist)
+    if getattr(config, "cache", None) is not None and not hasattr(config, "workerinput"):
+        config.pluginmanager.register(balancing.DurationRecorder(config.cache), "duration-recorder")
+
+
+def pytest_sessionfinish(session):  # pylint: disable=unused-argument
+    """Report API calls saved by applying proxy changes at once"""
+    if ProxyChangeSet.total_avoided_calls:
+        logging.getLogger(__name__).info("Proxy change sets avoided %d API calls", ProxyChangeSet.total_avoided_calls)
+
 
 # there are many branches as there are many options to influence test selection
 # pylint: disable=too-many-branches
@@ -231,6 +288,8 @@ def pytest_collection_modifyitems(session, config, items):
         selected.append(item)
 
     items[:] = selected
+    if config.option.balance and getattr(config, "cache", None) is not None:
+        balancing.order(items, config.cache.get(balancing.CACHE_KEY, {}))
 
     config.hook.pytest_deselected(items=deselected)
 
@@ -419,9 +478,7 @@ def prod_client(production_gateway, application, request):
 
     def _prod_client(app=application, promote: bool = True, version: int = -1, redeploy: bool = True):
         if promote:
-            if version == -1:
-                version = app.service.proxy.list().configs.latest()["version"]
-            app.service.proxy.list().promote(version=version)
+            ProxyChangeSet(app.service, deploy=False, promote=True, version=None if version == -1 else version).apply()
         if redeploy:
             production_gateway.reload()
 
@@ -461,6 +518,10 @@ def threescale(testconfig, request):
             token=token["value"],
             url=admin.url,
         )
+        # developer portal of the tenant, UI tests of parallel workers are isolated then
+        devel_url = tenant.entity["signup"]["account"].get("base_url")
+        if devel_url:
+            testconfig["threescale"].setdefault("devel", {})["url"] = devel_url
 
         return admin
 
@@ -517,8 +578,14 @@ def custom_account(threescale, request, testconfig):
 
     def _custom_account(params, autoclean=True, threescale_client=threescale):
         acc = resilient.accounts_create(threescale_client, params=params)
+        pagination.NAMES.remember(acc)
         if autoclean and not testconfig["skip_cleanup"]:
-            request.addfinalizer(acc.delete)
+
+            def finalizer():
+                pagination.NAMES.forget(acc)
+                acc.delete()
+
+            request.addfinalizer(finalizer)
         return acc
 
     return _custom_account
@@ -756,6 +823,20 @@ def lifecycle_hooks(request, testconfig):
     return []
 
 
+@pytest.fixture(scope="session")
+def backend_listener(testconfig):
+    """Client reporting usage directly to backend-listener"""
+    route = testconfig["threescale"]["backend_internal_api"]["route"]["spec"]
+    return BackendListener(f'{route["port"]["targetPort"]}://{route["host"]}', verify=testconfig["ssl_verify"])
+
+
+@pytest.fixture(scope="session")
+def window_scheduler():
+    """Shared scheduler of request bursts into aligned rate-limit windows"""
+    yield DEFAULT_SCHEDULER
+    logging.getLogger(__name__).info("Waited %.1fs in total for rate limit windows", DEFAULT_SCHEDULER.waited)
+
+
 @pytest.fixture(scope="session")
 def httpx():
     """Httpx fixture that returns lifecycle hook for httpx"""
@@ -968,6 +1049,7 @@ def custom_service(threescale, request, testconfig, logger):
                 params["description"] = blame_desc(request, params.get("description"))
 
             svc = threescale_client.services.create(params=params)
+            pagination.NAMES.remember(svc)
 
             self._autoclean = autoclean
             if not testconfig["skip_cleanup"]:
@@ -979,6 +1061,7 @@ def custom_service(threescale, request, testconfig, logger):
                         except Exception:  # pylint: disable=broad-except
                             pass
 
+                    pagination.NAMES.forget(svc)
                     svc.delete()
 
                 with self._lock:
@@ -1041,6 +1124,7 @@ def custom_backend(threescale, request, testconfig, private_base_url):
             hook(params)
 
         backend = threescale_client.backends.create(params=params)
+        pagination.NAMES.remember(backend)
 
         if autoclean and not testconfig["skip_cleanup"]:
 
@@ -1050,6 +1134,7 @@ def custom_backend(threescale, request, testconfig, private_base_url):
                         hook(backend)
                     except Exception:  # pylint: disable=broad-except
                         pass
+                pagination.NAMES.forget(backend)
                 _backend_delete(backend)
 
             request.addfinalizer(finalizer)
@@ -1062,11 +1147,31 @@ def custom_backend(threescale, request, testconfig, private_base_url):
     return _custom_backend
 
 
+@pytest.fixture(scope="session")
+def webhook_receiver(testconfig):
+    """
+    In-process receiver of webhooks, None unless enabled in the config
+
+    It can be used only if 3scale is able to reach the machine running the tests.
+    """
+    options = weakget(testconfig)["fixtures"]["requestbin"]["local"] % {}
+    if not options.get("enabled", False):
+        yield None
+        return
+
+    with WebhookReceiver(
+        host=options.get("host", "0.0.0.0"), port=int(options.get("port", 0)), public_url=options.get("public_url")
+    ) as receiver:
+        yield receiver
+
+
 @pytest.fixture(scope="module")
-def requestbin(testconfig, tools):
+def requestbin(testconfig, tools, webhook_receiver):
     """
     Returns an instance of RequestBin.
     """
+    if webhook_receiver is not None:
+        return webhook_receiver.bin()
     return Mockserver(tools["mockserver"], testconfig["ssl_verify"])
 
 
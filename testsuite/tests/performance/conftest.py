@@ -14,7 +14,7 @@ from hyperfoil import HyperfoilClient
 
 from testsuite.perf_utils import HyperfoilUtils
 
-from testsuite import rawobj
+from testsuite import proxy_configs, rawobj
 from testsuite.utils import randomize, blame
 
 
@@ -133,7 +133,7 @@ async def services(
 def promoted_services(services, production_gateway):
     """Promotes service and reloads production gateway"""
     for svc in services:
-        version = svc.proxy.list().configs.latest()["version"]
+        version = proxy_configs.latest_version(svc)
         svc.proxy.list().promote(version=version)
     production_gateway.reload()
     return services
@@ -2,15 +2,13 @@
 Performance test for managed services with multiple 3scale entities (products, backends,...)
 """
 
-import asyncio
 import os
-from concurrent.futures.thread import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 import backoff
 import pytest
 
-from testsuite import rawobj
+from testsuite import mapping_rules, rawobj
 from testsuite.rhsso.rhsso import OIDCClientAuthHook
 
 MAX_RUN_TIME = 210 * 60
@@ -65,13 +63,14 @@ def number_of_agents():
 @pytest.fixture(scope="module")
 def create_mapping_rules():
     """
-    Returns function that will be run for each backend usage
+    Returns function that builds mapping rules of backend for its metric
     """
 
-    def _create(i, be_usage):
-        metric = be_usage.backend.metrics.list()[0]
-        be_usage.backend.mapping_rules.create(rawobj.Mapping(metric, f"/anything/{i}"))
-        be_usage.backend.mapping_rules.create(rawobj.Mapping(metric, f"/anything/{i}", "POST"))
+    def _create(i, backend, metric):
+        return [
+            (backend, rawobj.Mapping(metric, f"/anything/{i}")),
+            (backend, rawobj.Mapping(metric, f"/anything/{i}", "POST")),
+        ]
 
     return _create
 
@@ -80,23 +79,18 @@ def create_mapping_rules():
 def services(services, create_mapping_rules):
     """
     Removes default mapping rule of each product.
-    For each backend creates 10 mapping rules
+    For each backend creates 10 mapping rules, each product is deployed once
     """
-    loop = asyncio.get_event_loop()
+    rules = []
     for svc in services:
         proxy = svc.proxy.list()
         proxy.mapping_rules.delete(proxy.mapping_rules.list()[0]["id"])
-    with ThreadPoolExecutor() as pool:
-        for svc in services:
-            proxy = svc.proxy.list()
-            futures = []
-            for be_usage in svc.backend_usages.list():
-                futures += [
-                    loop.run_in_executor(pool, create_mapping_rules, i, be_usage)
-                    for i in range(NUMBER_OF_MAPPING_RULES_PER_BACKEND)
-                ]
-            loop.run_until_complete(asyncio.gather(*futures))
-            proxy.update()
+        for be_usage in svc.backend_usages.list():
+            backend = be_usage.backend
+            metric = backend.metrics.list()[0]
+            for i in range(NUMBER_OF_MAPPING_RULES_PER_BACKEND):
+                rules += create_mapping_rules(i, backend, metric)
+    mapping_rules.create(rules, products=services)
     return services
 
 
@@ -5,13 +5,12 @@ Run the test and assert results.
 This test shows usage how to write test where 3scale product is secured with user key.
 """
 
-import asyncio
 import os
 
 import backoff
 import pytest
 
-from testsuite import rawobj
+from testsuite import mapping_rules, rawobj
 from testsuite.perf_utils import HyperfoilUtils
 
 # Maximal runtime of test (need to cover all performance stages)
@@ -41,33 +40,34 @@ def number_of_apps():
 @pytest.fixture(scope="module")
 def create_mapping_rules():
     """
-    Returns function that will be run for each backend usage
+    Returns function that builds mapping rules of backend for its metric
     """
 
-    def _create(i, be_usage):
-        metric = be_usage.backend.metrics.list()[0]
-        be_usage.backend.mapping_rules.create(rawobj.Mapping(metric, f"/anything/{i}"))
-        be_usage.backend.mapping_rules.create(rawobj.Mapping(metric, f"/anything/{i}", "POST"))
+    def _create(i, backend, metric):
+        return [
+            (backend, rawobj.Mapping(metric, f"/anything/{i}")),
+            (backend, rawobj.Mapping(metric, f"/anything/{i}", "POST")),
+        ]
 
     return _create
 
 
 @pytest.fixture(scope="module")
-async def services(services, create_mapping_rules, event_loop):
+def services(services, create_mapping_rules):
     """
     Removes default mapping rule of each product.
-    For each backend creates 20 mapping rules
+    For each backend creates 20 mapping rules, each product is deployed once
     """
+    rules = []
     for svc in services:
         proxy = svc.proxy.list()
         proxy.mapping_rules.delete(proxy.mapping_rules.list()[0]["id"])
-    for svc in services:
-        proxy = svc.proxy.list()
-        futures = []
         for be_usage in svc.backend_usages.list():
-            futures += [event_loop.run_in_executor(None, create_mapping_rules, i, be_usage) for i in range(10)]
-        await asyncio.gather(*futures)
-        proxy.deploy()
+            backend = be_usage.backend
+            metric = backend.metrics.list()[0]
+            for i in range(10):
+                rules += create_mapping_rules(i, backend, metric)
+    mapping_rules.create(rules, products=services)
     return services
 
 
@@ -49,13 +49,16 @@ def test_hits_service(application, api_client, app2):
     for _ in range(requests_app2):
         assert client2.get("/get").status_code == 200
 
-    metrics_service = resilient.analytics_list_by_service(
-        app2.threescale_client, app2["service_id"], "hits", "total", requests_app + requests_app2
+    metrics_service, metrics_app, metrics_app2 = resilient.analytics_wait(
+        app2.threescale_client,
+        [
+            resilient.AnalyticsExpectation(
+                "service", app2["service_id"], "hits", prev_service_hits + requests_app + requests_app2
+            ),
+            resilient.AnalyticsExpectation("application", application, "hits", prev_app_hits + requests_app),
+            resilient.AnalyticsExpectation("application", app2, "hits", prev_app2_hits + requests_app2),
+        ],
     )
     assert metrics_service == prev_service_hits + requests_app + requests_app2
-
-    metrics_app = analytics.list_by_application(application, metric_name="hits")["total"]
     assert metrics_app == prev_app_hits + requests_app
-
-    metrics_app2 = analytics.list_by_application(app2, metric_name="hits")["total"]
     assert metrics_app2 == prev_app2_hits + requests_app2
@@ -64,13 +64,13 @@ def test_analytics(application, api_client, backend):
     for _ in range(num_requests):
         assert client.get("/anything/get").status_code == 200
 
-    analytics = application.threescale_client.analytics
-    hits_backed = resilient.analytics_list_by_backend(
+    (hits_backed,) = resilient.analytics_wait(
         application.threescale_client,
-        backend.entity_id,
-        backend_metric.entity_name,
-        "total",
-        prev_hits_backed + num_requests,
+        [
+            resilient.AnalyticsExpectation(
+                "backend", backend.entity_id, backend_metric.entity_name, prev_hits_backed + num_requests
+            )
+        ],
     )
 
     assert hits_backed == prev_hits_backed + num_requests
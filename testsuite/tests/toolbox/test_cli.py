@@ -76,7 +76,7 @@ def test_cli_cmd_list_help():
     for cmd in TOOLBOX_COMMANDS + [""]:
         batch_cmds += [" help " + cmd, cmd + " --help", cmd + " -h"]
 
-    ret_val = toolbox.run_cmd(batch_cmds)
+    ret_val = toolbox.run_cmd(batch_cmds, parallel=True)
     for ret in ret_val:
         assert not ret["stderr"]
 
@@ -88,7 +88,7 @@ def test_cli_cmd_list_help():
 
 def test_cli_subcmd_list():
     """Check list of subcommands of commands."""
-    ret_val = toolbox.run_cmd(TOOLBOX_SUBCOMMANDS.keys())
+    ret_val = toolbox.run_cmd(TOOLBOX_SUBCOMMANDS.keys(), parallel=True)
     for ret in ret_val:
         assert not ret["stderr"]
         out = ret["stdout"]
@@ -109,7 +109,7 @@ def test_cli_subcmd_list_help():
             batch_cmds.append(" ".join([" help", cmd, subcmd]))
             for help_cmd in [" --help", " -h"]:
                 batch_cmds.append(" ".join([cmd, subcmd, help_cmd]))
-    ret_val = toolbox.run_cmd(batch_cmds)
+    ret_val = toolbox.run_cmd(batch_cmds, parallel=True)
     for ret in ret_val:
         assert not ret["stderr"]
 
@@ -126,7 +126,7 @@ def test_cli_subcmd_list_help():
 def test_cli():
     """Check 'version' parameter."""
     batch_cmds = ["-v", "--version"]
-    ret_val = toolbox.run_cmd(batch_cmds)
+    ret_val = toolbox.run_cmd(batch_cmds, parallel=True)
 
     for ret in ret_val:
         assert not ret["stderr"]
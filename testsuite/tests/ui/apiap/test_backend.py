@@ -2,7 +2,7 @@
 
 import pytest
 
-from testsuite import resilient
+from testsuite import pagination, resilient
 from testsuite.ui.views.admin.backend.backend import BackendEditView
 from testsuite.utils import blame
 
@@ -57,7 +57,7 @@ def test_delete_backend(navigator, threescale, custom_backend):
     backend = custom_backend(autoclean=False)
     edit = navigator.navigate(BackendEditView, backend=backend)
     edit.delete()
-    backend = threescale.backends.read_by_name(backend.entity_name)
+    backend = pagination.read_by_name(threescale.backends, backend.entity_name)
 
     assert backend is None
 
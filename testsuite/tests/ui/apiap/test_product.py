@@ -7,7 +7,7 @@ from testsuite.ui.views.admin.product.application import ApplicationPlanDetailVi
 from testsuite.ui.views.admin.product.integration.settings import ProductSettingsView
 from testsuite.ui.views.admin.product.integration.configuration import ProductConfigurationView
 from testsuite.ui.views.admin.product.integration.backends import ProductBackendsView, ProductAddBackendView
-from testsuite import rawobj, resilient
+from testsuite import pagination, rawobj, resilient
 from testsuite.utils import blame
 
 pytestmark = pytest.mark.usefixtures("login")
@@ -77,7 +77,7 @@ def test_delete_product(navigator, threescale, product):
     """
     edit = navigator.navigate(ProductEditView, product=product)
     edit.delete()
-    product = threescale.services.read_by_name(product.entity_name)
+    product = pagination.read_by_name(threescale.services, product.entity_name)
 
     assert product is None
 
@@ -152,7 +152,7 @@ def test_remove_backend_from_product(service, navigator, threescale):
     backends = navigator.navigate(ProductBackendsView, product=service)
     backend = threescale.backends.read(service.backend_usages.list()[0]["backend_id"])
     backends.remove_backend(backend)
-    service = threescale.services.read_by_name(service.entity_name)
+    service = pagination.read_by_name(threescale.services, service.entity_name)
 
     assert len(service.backend_usages.list()) == 0
 
@@ -20,7 +20,7 @@ from PIL import Image
 from testsuite import rawobj, resilient
 from testsuite.auth0 import auth0_token
 from testsuite.config import settings
-from testsuite.ui.browser import ThreeScaleBrowser
+from testsuite.ui.browser import SessionPool, ThreeScaleBrowser
 from testsuite.ui.navigation import Navigator
 from testsuite.ui.views.admin.foundation import DashboardView
 from testsuite.ui.views.admin.audience.account import AccountNewView, AccountsView
@@ -33,39 +33,60 @@ from testsuite.ui.views.admin.product.product import ProductNewView
 from testsuite.ui.views.devel.login import LoginView as DeveloperLoginView
 from testsuite.ui.views.master.audience.tenant import TenantNewView, TenantDetailView
 from testsuite.ui.views.master.login import MasterLoginView
-from testsuite.ui.webdriver import ThreescaleWebdriver
-from testsuite.utils import blame, get_results_dir_path
+from testsuite.ui.webdriver import ThreescaleWebdriver, worker_remote_url
+from testsuite.utils import blame, get_results_dir_path, xdist_worker
 
 LOGGER = logging.getLogger(__name__)
 
 
 @pytest.fixture(scope="session")
 def webdriver():
-    """Creates instance of Web Driver with configuration"""
+    """Creates instance of Web Driver with configuration, each xdist worker gets its own remote selenium if more set"""
     return ThreescaleWebdriver(
         source=settings["fixtures"]["ui"]["browser"]["source"],
         driver=settings["fixtures"]["ui"]["browser"]["webdriver"],
         ssl_verify=settings["ssl_verify"],
         headless=settings["fixtures"]["ui"]["browser"]["headless"],
-        remote_url=settings["fixtures"]["ui"]["browser"]["remote_url"],
+        remote_url=worker_remote_url(settings["fixtures"]["ui"]["browser"]["remote_url"], xdist_worker()),
         binary_path=settings["fixtures"]["ui"]["browser"]["binary_path"],
         disable_http2=settings["fixtures"]["ui"]["browser"]["disable_http2"],
     )
 
 
+@pytest.fixture(scope="session")
+def browser_pool(webdriver, request):
+    """
+    Pool of live browser sessions reused by test modules of this worker, None if disabled in settings
+    Args:
+        :param webdriver: Selenium driver configuration
+        :param request: Finalizer for session cleanup
+        :return: SessionPool instance or None
+    """
+    if not settings["fixtures"]["ui"]["browser"].get("reuse_sessions", False):
+        return None
+    pool = SessionPool(
+        webdriver,
+        origins=[settings["threescale"][i]["url"] for i in ("admin", "master", "devel")],
+        max_age=settings["fixtures"]["ui"]["browser"].get("auth_snapshot_max_age", 1800),
+    )
+    request.addfinalizer(pool.close)
+    return pool
+
+
 @pytest.fixture(scope="module")
-def browser(webdriver, request, metadata):
+def browser(webdriver, browser_pool, request, metadata):
     """
     Browser representation based on UI settings
     Args:
         :param webdriver: Selenium driver configuration
+        :param browser_pool: Pool of browser sessions, new session is started per module without it
         :param request: Finalizer for session cleanup
         :param metadata: Test session metadata
         :return browser: Browser instance
     """
-    browser = ThreeScaleBrowser(webdriver=webdriver)
-    request.addfinalizer(webdriver.finalize)
-    caps = webdriver.webdriver.webdriver.caps
+    browser = ThreeScaleBrowser(webdriver=webdriver, pool=browser_pool)
+    request.addfinalizer(browser.finalize)
+    caps = browser.selenium.caps
     metadata["Browser"] = f"{caps['browserName']} {caps['browserVersion']}"
     return browser
 
@@ -102,6 +123,9 @@ def custom_admin_login(navigator, browser):
         url = settings["threescale"]["admin"]["url"]
         name = name or settings["threescale"]["admin"]["username"]
         password = password or settings["threescale"]["admin"]["password"]
+        role = f"admin:{name}"
+        if not fresh:
+            browser.restore_auth(role)
         page = navigator.open(LoginView, url=url, wait_displayed=False)
 
         if fresh:
@@ -109,6 +133,7 @@ def custom_admin_login(navigator, browser):
             browser.selenium.refresh()
         if page.is_displayed:
             page.do_login(name, password)
+            browser.save_auth(role)
 
     return _login
 
@@ -124,19 +149,22 @@ def login(custom_admin_login):
 
 
 @pytest.fixture(scope="module")
-def master_login(navigator):
+def master_login(navigator, browser):
     """
     Login to the Master portal with default admin credentials
     :param navigator: Navigator Instance
+    :param browser: Browser instance
     :return: Login with default credentials
     """
     url = settings["threescale"]["master"]["url"]
     name = settings["threescale"]["master"]["username"]
     password = settings["threescale"]["master"]["password"]
+    browser.restore_auth("master")
     page = navigator.open(MasterLoginView, url=url)
 
     if page.is_displayed:
         page.do_login(name, password)
+        browser.save_auth("master")
 
 
 @pytest.fixture(scope="module")
@@ -153,14 +181,18 @@ def custom_devel_login(navigator, provider_account, account_password, browser):
         url = settings["threescale"]["devel"]["url"]
         name = name or account["org_name"]
         password = password or account_password
+        role = f"devel:{name}"
         if fresh:
             browser.selenium.delete_all_cookies()
             browser.selenium.refresh()
+        else:
+            browser.restore_auth(role)
         page = navigator.open(
             DeveloperLoginView, url=url, wait_displayed=False, access_code=provider_account["site_access_code"]
         )
         if page.is_displayed:
             page.do_login(name, password)
+            browser.save_auth(role)
 
     return _login
 
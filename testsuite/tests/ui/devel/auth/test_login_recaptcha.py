@@ -3,7 +3,7 @@
 import pytest
 from packaging.version import Version  # noqa # pylint: disable=unused-import
 
-from testsuite import settings, rawobj, TESTED_VERSION  # noqa # pylint: disable=unused-import
+from testsuite import pagination, settings, rawobj, TESTED_VERSION  # noqa # pylint: disable=unused-import
 from testsuite.ui.views.admin.audience.developer_portal import BotProtection
 from testsuite.ui.views.devel.login import BasicSignUpView, LoginView, ForgotPasswordView
 from testsuite.utils import blame, warn_and_skip
@@ -29,7 +29,7 @@ def ui_devel_account(request, testconfig, threescale):
     yield user_name
 
     if not testconfig["skip_cleanup"]:
-        usr = threescale.accounts.read_by_name(user_name)
+        usr = pagination.read_by_name(threescale.accounts, user_name)
         if usr:
             request.addfinalizer(usr.delete)
 
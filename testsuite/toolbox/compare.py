@@ -0,0 +1,202 @@
+"""
+Entity trees of 3scale objects for Toolbox copy/import verification
+
+A tree is fetched once with concurrent requests, children of every entity are
+indexed by their identity attributes (e.g. metric `friendly_name`) so matching
+is linear, and all the differences are collected into `Diff` instead of failing
+on the first assertion. Trees are compared as snapshots, see
+`testsuite.toolbox.snapshot`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from testsuite.toolbox import constants
+
+MISSING = "<missing>"
+
+
+class Node(NamedTuple):
+    """Fetched entity with its children grouped by kind, e.g. {"metrics": [...]}"""
+
+    entity: dict
+    children: Dict[str, List["Node"]]
+    identity: Tuple = ()
+
+
+class Spec(NamedTuple):
+    """How to compare entities of one kind
+
+    `strict` kinds are compared including missing/extra entities even if
+    comparison of lengths is not requested.
+    """
+
+    id_attrs: Tuple[str, ...]
+    ignored: frozenset
+    strict: bool = False
+
+
+SPECS = {
+    "service": Spec((), frozenset(constants.SERVICE_CMP_ATTRS)),
+    "backend": Spec((), frozenset(constants.BACKEND_CMP_ATTRS), strict=True),
+    "metrics": Spec(("friendly_name",), frozenset(constants.METRIC_CMP_ATTRS)),
+    "methods": Spec(("system_name",), frozenset(constants.METRIC_METHOD_CMP_ATTRS)),
+    "mapping_rules": Spec(("pattern",), frozenset(constants.MAPPING_CMP_ATTRS)),
+    "app_plans": Spec(("system_name",), frozenset(constants.APP_PLANS_CMP_ATTRS)),
+    "limits": Spec(("period",), frozenset(constants.LIMITS_CMP_ATTR), strict=True),
+    "pricing_rules": Spec(("min", "max"), frozenset(constants.PRICING_RULES_CMP_ATTRS), strict=True),
+    "active_docs": Spec(("system_name",), frozenset(constants.ACTIVEDOCS_CMP_ATTRS)),
+    "backend_usages": Spec(("path",), frozenset(constants.BACKEND_USAGES_CMP_ATTRS), strict=True),
+}
+
+
+class Difference(NamedTuple):
+    """Single difference, `attr` is None for entity missing in one of the trees"""
+
+    path: str
+    attr: Optional[str]
+    first: Any
+    second: Any
+
+    def __str__(self):
+        if self.attr is None:
+            return f"{self.path}: {self.first} != {self.second}"
+        return f"{self.path}.{self.attr}: {self.first!r} != {self.second!r}"
+
+
+class Diff:
+    """All the differences found between two trees"""
+
+    def __init__(self):
+        self.differences: List[Difference] = []
+
+    def add(self, path: str, attr: Optional[str], first, second):
+        """Record a difference"""
+        self.differences.append(Difference(path, attr, first, second))
+
+    def __bool__(self):
+        return bool(self.differences)
+
+    def __len__(self):
+        return len(self.differences)
+
+    def __iter__(self):
+        return iter(self.differences)
+
+    def __str__(self):
+        return "\n".join(str(i) for i in self.differences) or "no differences"
+
+    def paths(self) -> List[str]:
+        """Paths of all differing entities"""
+        return sorted({i.path for i in self.differences})
+
+
+def gather(pool: ThreadPoolExecutor, calls) -> list:
+    """Run the calls concurrently, results are in the order of calls"""
+    futures = [pool.submit(func, *args) for func, *args in calls]
+    return [i.result() for i in futures]
+
+
+def _metric_nodes(pool: ThreadPoolExecutor, metrics) -> List[Node]:
+    """Metrics with their methods, methods of all metrics are listed concurrently"""
+    methods = gather(pool, [(i.methods.list,) for i in metrics])
+    return [
+        Node(metric.entity, {"methods": [Node(i.entity, {}) for i in metric_methods]})
+        for metric, metric_methods in zip(metrics, methods)
+    ]
+
+
+def _plan_nodes(pool: ThreadPoolExecutor, plans, metrics) -> List[Node]:
+    """Application plans with limits and pricing rules, identified by friendly name of the metric
+
+    Limits are listed once per plan, pricing rules once per plan and metric, all of them concurrently.
+    Limits and pricing rules of metrics not belonging to the service (backend metrics) are skipped.
+    """
+    names = {i["id"]: i["friendly_name"] for i in metrics}
+    limits = [pool.submit(i.limits().list_per_app_plan) for i in plans]
+    pricing = [[pool.submit(plan.pricing_rules(i).list) for i in metrics] for plan in plans]
+
+    nodes = []
+    for plan, plan_limits, plan_pricing in zip(plans, limits, pricing):
+        limit_nodes = [
+            Node(i.entity, {}, (names[i["metric_id"]],)) for i in plan_limits.result() if i["metric_id"] in names
+        ]
+        pricing_nodes = [
+            Node(rule.entity, {}, (metric["friendly_name"],))
+            for metric, future in zip(metrics, plan_pricing)
+            for rule in future.result()
+        ]
+        nodes.append(Node(plan.entity, {"limits": limit_nodes, "pricing_rules": pricing_nodes}))
+    return nodes
+
+
+def fetch_backend(backend, pool: ThreadPoolExecutor) -> Node:
+    """Backend with metrics, methods and mapping rules"""
+    metrics, mapping_rules = gather(pool, [(backend.metrics.list,), (backend.mapping_rules.list,)])
+    return Node(
+        backend.entity,
+        {
+            "metrics": _metric_nodes(pool, metrics),
+            "mapping_rules": [Node(i.entity, {}) for i in mapping_rules],
+        },
+    )
+
+
+def fetch_service(service, pool: ThreadPoolExecutor) -> Node:
+    """Service/product with all its subobjects relevant for comparison
+
+    Every list is fetched exactly once, independent requests run concurrently in the pool.
+    """
+    metrics, mapping_rules, plans, active_docs, usages = gather(
+        pool,
+        [
+            (service.metrics.list,),
+            (service.mapping_rules.list,),
+            (service.app_plans.list,),
+            (service.active_docs.list,),
+            (service.backend_usages.list,),
+        ],
+    )
+    backends = gather(pool, [(service.threescale_client.backends.read, i["backend_id"]) for i in usages])
+    backend_nodes = [fetch_backend(i, pool) for i in backends]
+
+    return Node(
+        service.entity,
+        {
+            "metrics": _metric_nodes(pool, metrics),
+            "mapping_rules": [Node(i.entity, {}) for i in mapping_rules],
+            "app_plans": _plan_nodes(pool, plans, metrics),
+            "active_docs": [Node(i.entity, {}) for i in active_docs],
+            "backend_usages": [Node(i.entity, {"backend": [j]}) for i, j in zip(usages, backend_nodes)],
+        },
+    )
+
+
+def index(nodes: List[Node], id_attrs: Tuple[str, ...]) -> Dict[Tuple, Node]:
+    """Index nodes by identity, duplicates get their order appended to stay unique"""
+    result: Dict[Tuple, Node] = {}
+    seen: Dict[Tuple, int] = {}
+    for node in nodes:
+        key = node.identity + tuple(node.entity.get(i) for i in id_attrs)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        result[key + (count,) if count else key] = node
+    return result
+
+
+def label(key: Tuple) -> str:
+    """Human readable identity"""
+    return ",".join(str(i) for i in key)
+
+
+def child_path(path: str, kind: str, key: Tuple) -> str:
+    """Path of the child used in differences, e.g. service/metrics[hits]"""
+    return f"{path}/{kind}[{label(key)}]" if key else f"{path}/{kind}"
+
+
+def compare_entities(ent1: dict, ent2: dict, ignored, path: str, diff: Diff):
+    """Compare attributes of two entities except the ignored ones"""
+    for attr in sorted((ent1.keys() | ent2.keys()) - ignored):
+        first, second = ent1.get(attr, MISSING), ent2.get(attr, MISSING)
+        if first != second:
+            diff.add(path, attr, first, second)
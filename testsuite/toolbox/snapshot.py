@@ -0,0 +1,217 @@
+"""
+Snapshots of 3scale product state
+
+Snapshot is taken in one concurrent sweep (see `testsuite.toolbox.compare`)
+and normalized: attributes which always differ between copies (ids,
+timestamps, ...) are dropped and children are indexed by their identity.
+Every subtree carries digest of its content, so two snapshots are compared by
+digests first and only differing subtrees are walked.
+"""
+
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Collection, Dict, Iterable, Optional, Set, Tuple
+
+from testsuite import proxy_configs
+from testsuite.toolbox import compare, constants
+from testsuite.toolbox.compare import Diff, Node, Spec
+
+log = logging.getLogger(__name__)
+
+SPECS = {
+    **compare.SPECS,
+    "proxy": Spec((), frozenset(constants.PROXY_CMP_ATTRS)),
+    "policies_registry": Spec(("name", "version"), frozenset(), strict=True),
+    "policies": Spec((), frozenset(), strict=True),
+    "proxy_configs": Spec(("environment",), frozenset(constants.PROXY_CONFIG_CONTENT_CMP_ATTRS), strict=True),
+    "config_proxy": Spec((), frozenset(constants.PROXY_CONFIG_CONTENT_PROXY_CMP_ATTRS), strict=True),
+    "policy_chain": Spec((), frozenset(), strict=True),
+    "proxy_rules": Spec((), frozenset(constants.PROXY_RULES_CMP_ATTRS), strict=True),
+}
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class Snapshot:
+    """Normalized, hashable state of an entity and its subtree
+
+    Args:
+        :param kind: Kind of the entity, key of SPECS
+        :param entity: Attributes of the entity without the ignored ones
+        :param children: Children by kind, indexed by identity
+    """
+
+    def __init__(self, kind: str, entity: dict, children: Dict[str, Dict[Tuple, "Snapshot"]]):
+        self.kind = kind
+        self.entity = entity
+        self.children = children
+        content = {
+            "entity": entity,
+            "children": {k: sorted((compare.label(i), j.digest) for i, j in v.items()) for k, v in children.items()},
+        }
+        self.digest: str = hashlib.sha256(_canonical(content).encode()).hexdigest()
+
+    def __eq__(self, other):
+        return isinstance(other, Snapshot) and self.digest == other.digest
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f"Snapshot({self.kind}, {self.digest[:12]})"
+
+    def subtree(self, *path: Tuple[str, Tuple]) -> "Snapshot":
+        """Snapshot of descendant given by (kind, identity) pairs"""
+        result = self
+        for kind, key in path:
+            result = result.children[kind][key]
+        return result
+
+    @classmethod
+    def from_node(cls, node: Node, kind: str) -> "Snapshot":
+        """Normalize fetched tree"""
+        ignored = SPECS[kind].ignored
+        entity = {k: v for k, v in node.entity.items() if k not in ignored}
+        children = {
+            child_kind: {
+                key: cls.from_node(child, child_kind)
+                for key, child in compare.index(nodes, SPECS[child_kind].id_attrs).items()
+            }
+            for child_kind, nodes in node.children.items()
+        }
+        return cls(kind, entity, children)
+
+
+def _positions(items: Iterable[dict]) -> list:
+    """Nodes identified by position in the list, for ordered lists like policy chain"""
+    return [Node(item, {}, (i,)) for i, item in enumerate(items)]
+
+
+def _config_node(proxy, env: str) -> Optional[Node]:
+    """Latest proxy config of the environment, None if it was never deployed/promoted there"""
+    config = proxy_configs.latest_or_none(proxy, env)
+    if config is None:
+        return None
+    content = config["content"]
+    config_proxy = content["proxy"]
+    return Node(
+        {"environment": env, **content},
+        {
+            "config_proxy": [
+                Node(
+                    config_proxy,
+                    {
+                        "policy_chain": _positions(config_proxy.get("policy_chain") or []),
+                        "proxy_rules": _positions(config_proxy.get("proxy_rules") or []),
+                    },
+                )
+            ]
+        },
+    )
+
+
+def fetch_proxy(service, pool: ThreadPoolExecutor, envs: Collection[str] = ("sandbox", "production")) -> Node:
+    """Proxy with its policies, policy registry of the tenant and the latest configs of the environments"""
+    proxy = service.proxy.list()
+    policies, registry, *configs = compare.gather(
+        pool,
+        [(proxy.policies.list,), (proxy.policies_registry.list,), *((_config_node, proxy, i) for i in envs)],
+    )
+    return Node(
+        proxy.entity,
+        {
+            "policies": _positions(policies["policies_config"]),
+            "policies_registry": [Node(i.entity, {}) for i in registry],
+            "proxy_configs": [i for i in configs if i is not None],
+        },
+    )
+
+
+def _fetch_product(service, pool: ThreadPoolExecutor, envs: Collection[str]) -> Node:
+    # proxy subtree waits for its own requests, it must not block a worker of the shared pool
+    with ThreadPoolExecutor(max_workers=1) as proxy_thread:
+        proxy = proxy_thread.submit(fetch_proxy, service, pool, envs)
+        node = compare.fetch_service(service, pool)
+        return Node(node.entity, {**node.children, "proxy": [proxy.result()]})
+
+
+def take(service, envs: Collection[str] = ("sandbox", "production"), pool: Optional[ThreadPoolExecutor] = None):
+    """
+    Snapshot of service/product with proxy, its configs and all the subobjects
+
+    @param [Object] Service/product
+    @param [List] Environments of which the latest proxy configs are captured
+    @param [ThreadPoolExecutor] Pool for the requests, new one is created if not given
+    """
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=8) as own_pool:
+            return take(service, envs, own_pool)
+    return Snapshot.from_node(_fetch_product(service, pool, envs), "service")
+
+
+def take_backend(backend, pool: Optional[ThreadPoolExecutor] = None) -> Snapshot:
+    """Snapshot of backend with metrics, methods and mapping rules"""
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=8) as own_pool:
+            return take_backend(backend, own_pool)
+    return Snapshot.from_node(compare.fetch_backend(backend, pool), "backend")
+
+
+def take_both(svc1, svc2, envs: Collection[str] = ("sandbox", "production"), max_workers: int = 8):
+    """Snapshots of two products taken concurrently"""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool, ThreadPoolExecutor(max_workers=2) as roots:
+        first = roots.submit(take, svc1, envs, pool)
+        second = roots.submit(take, svc2, envs, pool)
+        return first.result(), second.result()
+
+
+# pylint: disable=too-many-arguments
+def diff(
+    snap1: Snapshot,
+    snap2: Snapshot,
+    cmp_length: bool = True,
+    ignore: Optional[Dict[str, Set[str]]] = None,
+    skip: Collection = (),
+    path: str = "",
+    result: Optional[Diff] = None,
+) -> Diff:
+    """
+    Differences of two snapshots, subtrees with equal digests are not walked
+
+    @param [Snapshot] First snapshot
+    @param [Snapshot] Second snapshot
+    @param [Bool] Should be missing/extra entities reported (always for strict kinds)
+    @param [Dict] Additional ignored attributes per kind
+    @param [List] Kinds or (kind, identity) pairs which are not compared at all
+    """
+    result = Diff() if result is None else result
+    path = path or snap1.kind
+    if snap1.digest == snap2.digest:
+        return result
+    extra = (ignore or {}).get(snap1.kind, set())
+    if snap1.entity != snap2.entity:
+        compare.compare_entities(snap1.entity, snap2.entity, extra, path, result)
+
+    for kind in sorted(snap1.children.keys() | snap2.children.keys()):
+        if kind in skip:
+            continue
+        children1 = snap1.children.get(kind, {})
+        children2 = snap2.children.get(kind, {})
+        report_missing = cmp_length or SPECS[kind].strict
+        for key in sorted(children1.keys() | children2.keys(), key=compare.label):
+            if (kind, key) in skip:
+                continue
+            child_path = compare.child_path(path, kind, key)
+            if key not in children2 or key not in children1:
+                if report_missing:
+                    present = key in children1
+                    result.add(
+                        child_path, None, *(("present", compare.MISSING) if present else (compare.MISSING, "present"))
+                    )
+                continue
+            diff(children1[key], children2[key], cmp_length, ignore, skip, child_path, result)
+    return result
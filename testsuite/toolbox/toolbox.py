@@ -1,14 +1,34 @@
 """Toolbox utils"""
 
+import atexit
 import logging
 import os
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO, StringIO
 
-import jsondiff
 import paramiko
-from testsuite.toolbox import constants
+from testsuite.toolbox import snapshot
 from testsuite.config import settings
+from testsuite.utils import generate_tail
+
+
+def _container_args():
+    """Options of podman/docker run shared by all the ways toolbox container is started"""
+    ret = "--privileged=true "
+    ret += f"--mount type=bind,src={settings['toolbox']['podman_cert_dir']},"
+    ret += f"target={settings['toolbox']['podman_cert_dir']} "
+    ret += f"-e SSL_CERT_FILE={settings['toolbox']['podman_cert_dir']}/"
+    ret += f"{settings['toolbox']['podman_cert_name']} "
+    return ret
+
+
+def _is_exec_mode():
+    """Toolbox commands are executed in long-lived container"""
+    toolbox = settings["toolbox"]
+    return toolbox["cmd"] in ("podman", "docker") and toolbox.get("container_mode", "run") == "exec"
 
 
 def get_toolbox_cmd(cmd_in):
@@ -20,17 +40,85 @@ def get_toolbox_cmd(cmd_in):
         return f"3scale {cmd_in}"
     if settings["toolbox"]["cmd"] == "gem":
         return f"scl enable {settings['toolbox']['ruby_version']} '3scale {cmd_in}'"
+    if _is_exec_mode():
+        return _CONTAINER.exec_cmd(cmd_in)
     if settings["toolbox"]["cmd"] == "podman" or settings["toolbox"]["cmd"] == "docker":
-        ret = f"{settings['toolbox']['cmd']} run --interactive --rm --privileged=true "
-        ret += f"--mount type=bind,src={settings['toolbox']['podman_cert_dir']},"
-        ret += f"target={settings['toolbox']['podman_cert_dir']} "
-        ret += f"-e SSL_CERT_FILE={settings['toolbox']['podman_cert_dir']}/"
-        ret += f"{settings['toolbox']['podman_cert_name']} {settings['toolbox']['podman_image']} "
+        ret = f"{settings['toolbox']['cmd']} run --interactive --rm {_container_args()}"
+        ret += f"{settings['toolbox']['podman_image']} "
         ret += f"3scale {cmd_in}"
         return ret
     raise ValueError(f"Unsupported toolbox command: {settings['toolbox']['cmd']}")
 
 
+class ToolboxContainer:
+    """
+    Long-lived toolbox container, commands are executed in it by exec
+
+    This saves container create/start/teardown of `run --rm` for every
+    command. The container is started on first use, health is checked
+    periodically and it is removed at exit. Every xdist worker has its own
+    container.
+    """
+
+    HEALTH_CHECK_INTERVAL = 60
+
+    def __init__(self):
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        self.name = f"3scale-toolbox-{worker}-{generate_tail()}"
+        self._checked = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        """podman or docker"""
+        return settings["toolbox"]["cmd"]
+
+    def exec_cmd(self, cmd_in):
+        """Command running 3scale toolbox in the container"""
+        return f"{self.engine} exec --interactive {self.name} 3scale {cmd_in}"
+
+    @staticmethod
+    def _run(client, command):
+        """Run container management command, returns (exit status, stdout)"""
+        _, stdout, _ = client.exec_command(command)
+        output = "".join(stdout.readlines()).strip()
+        return stdout.channel.recv_exit_status(), output
+
+    def ensure(self, client):
+        """Start the container if it is not running"""
+        with self._lock:
+            if self._checked is not None and time.monotonic() - self._checked < self.HEALTH_CHECK_INTERVAL:
+                return
+            inspect = f"{self.engine} container inspect -f '{{{{.State.Running}}}}' {self.name}"
+            status, running = self._run(client, inspect)
+            if status != 0 or running != "true":
+                if status == 0:
+                    self._run(client, f"{self.engine} rm -f {self.name}")
+                start = time.monotonic()
+                status, output = self._run(
+                    client,
+                    f"{self.engine} run --detach --name {self.name} {_container_args()}"
+                    f"--entrypoint sleep {settings['toolbox']['podman_image']} infinity",
+                )
+                assert status == 0, f"Unable to start toolbox container: {output}"
+                logging.debug("Toolbox container %s started in %.2fs", self.name, time.monotonic() - start)
+            self._checked = time.monotonic()
+
+    def invalidate(self):
+        """Force health check before next command"""
+        self._checked = None
+
+    def remove(self, client):
+        """Remove the container if it was started"""
+        with self._lock:
+            if self._checked is not None:
+                self._run(client, f"{self.engine} rm -f --time 0 {self.name}")
+                self._checked = None
+
+
+_CONTAINER = ToolboxContainer()
+
+
 class LocalChannel:
     """paramiko interface to local command execution, implementation of Channel"""
 
@@ -91,41 +179,117 @@ def ssh_client():
     return client
 
 
-def run_cmd(cmd_input, scale_cmd=True):
+class SSHPool:
+    """
+    Persistent ssh connection reused by all toolbox commands of the process
+
+    Every pytest-xdist worker is separate process, therefore it has its own
+    pool. Commands are executed over separate channels multiplexed over single
+    transport and single sftp session is reused for file uploads. Connection
+    is re-established when it drops.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._sftp = None
+        self._lock = threading.RLock()
+
+    def client(self):
+        """Connected client, connects if needed"""
+        with self._lock:
+            if isinstance(self._client, paramiko.client.SSHClient):
+                transport = self._client.get_transport()
+                if transport is None or not transport.is_active():
+                    self.close()
+            if self._client is None:
+                start = time.monotonic()
+                self._client = ssh_client()
+                logging.debug("Toolbox ssh connection established in %.2fs", time.monotonic() - start)
+            return self._client
+
+    def sftp(self):
+        """Shared sftp session"""
+        with self._lock:
+            client = self.client()
+            channel = getattr(self._sftp, "sock", None)
+            if self._sftp is None or (channel is not None and channel.closed):
+                self._sftp = client.open_sftp()
+            return self._sftp
+
+    def close(self):
+        """Close sftp session and the connection"""
+        with self._lock:
+            if self._sftp is not None and self._sftp is not self._client:
+                self._sftp.close()
+            if self._client is not None:
+                self._client.close()
+            self._sftp = None
+            self._client = None
+
+
+_POOL = SSHPool()
+atexit.register(_POOL.close)
+
+
+def _remove_container():
+    """Remove long-lived toolbox container (if any) before the connection is closed"""
+    if _is_exec_mode():
+        _CONTAINER.remove(_POOL.client())
+
+
+atexit.register(_remove_container)
+
+
+def _exec(client, command, scale_cmd=True):
+    """Execute single command, returns dict with stdout and stderr, raises AssertionError on failure"""
+    logging.debug("Run Toolbox command: '%s'", command)
+    if scale_cmd:
+        command = get_toolbox_cmd(command)
+
+    start = time.monotonic()
+    _, stdout, stderr = client.exec_command(command)
+
+    stderrstr = os.linesep.join(stderr.readlines())
+    stdoutstr = os.linesep.join(stdout.readlines())
+    try:
+        errno = stdout.channel.recv_exit_status()
+        assert errno == 0
+    except AssertionError as exc:
+        error = f"Errno: {str(errno)}, stderr: {stderrstr}, stdout: {stdoutstr}"
+        logging.error(error)
+        if scale_cmd and _is_exec_mode():
+            _CONTAINER.invalidate()
+        raise exc
+
+    logging.debug("Toolbox command '%s' finished in %.2fs", command, time.monotonic() - start)
+    logging.debug("Output of Toolbox command: stdout: %s; stderr: %s", stdoutstr, stderrstr)
+    return {"stdout": stdoutstr, "stderr": stderrstr}
+
+
+def run_cmd(cmd_input, scale_cmd=True, parallel=False):
     """
     Execute command on remote machine
 
-    @param [String] Command to execute
+    @param [String] Command to execute or list of commands
+    @param [Bool] Run list of commands concurrently over separate channels,
+        use only for commands independent on each other
     @return Returns hash with STDOUT and STDERR
     """
-    client = ssh_client()
+    client = _POOL.client()
     if isinstance(cmd_input, str):
         cmd_in = [cmd_input]
     else:
-        cmd_in = cmd_input
-
-    ret_value = []
-    for command in cmd_in:
-        logging.debug("Run Toolbox command: '%s'", command)
-        if scale_cmd:
-            command = get_toolbox_cmd(command)
-
-        _, stdout, stderr = client.exec_command(command)
-
-        stderrstr = os.linesep.join(stderr.readlines())
-        stdoutstr = os.linesep.join(stdout.readlines())
-        try:
-            errno = stdout.channel.recv_exit_status()
-            assert errno == 0
-        except AssertionError as exc:
-            error = f"Errno: {str(errno)}, stderr: {stderrstr}, stdout: {stdoutstr}"
-            logging.error(error)
-            raise exc
+        cmd_in = list(cmd_input)
 
-        ret_value.append({"stdout": stdoutstr, "stderr": stderrstr})
+    if scale_cmd and _is_exec_mode():
+        _CONTAINER.ensure(client)
 
-        logging.debug("Output of Toolbox command: stdout: %s; stderr: %s", stdoutstr, stderrstr)
-    client.close()
+    if parallel and len(cmd_in) > 1:
+        max_channels = int(settings.get("toolbox", {}).get("ssh_max_channels", 8))
+        with ThreadPoolExecutor(max_workers=min(max_channels, len(cmd_in))) as pool:
+            ret_value = list(pool.map(lambda command: _exec(client, command, scale_cmd), cmd_in))
+    else:
+        ret_value = [_exec(client, command, scale_cmd) for command in cmd_in]
 
     if isinstance(cmd_input, str):
         return ret_value[0]
@@ -139,13 +303,7 @@ def copy_string_to_remote_file(input_string, remote_file):
     @param [String] Input string
     @param [String] Name of remote file
     """
-    client = ssh_client()
-
-    sftp = client.open_sftp()
-    sftp.putfo(BytesIO(input_string.encode()), remote_file)
-
-    sftp.close()
-    client.close()
+    _POOL.sftp().putfo(BytesIO(input_string.encode()), remote_file)
 
 
 def cmp_ents(ent1, ent2, attrlist):
@@ -183,18 +341,27 @@ def find_and_cmp(list1, list2, cmp_function, id_attr=None, cmp_length=True):
     id_attr = id_attr or ["system_name"]
     if cmp_length:
         assert len(list1) == len(list2)
+    index = {}
+    for ent2 in list2:
+        index.setdefault(tuple(ent2.entity[r] for r in id_attr), []).append(ent2)
     queue = []
     for ent1 in list1:
-        for ent2 in list2:
-            if all(ent1.entity[r] == ent2.entity[r] for r in id_attr):
-                queue.append((ent1, ent2))
-                list2.remove(ent2)
-                break
+        matches = index.get(tuple(ent1.entity[r] for r in id_attr))
+        if matches:
+            queue.append((ent1, matches.pop(0)))
     for ent1, ent2 in queue:
         assert len(ent1.keys()) == len(ent2.keys())
         cmp_function(ent1, ent2)
 
 
+# proxy rules and policies are compared via proxy config only,
+# first policy of product chain is inserted by system for backend routing
+_PROXY_DIFF_OPTIONS = {
+    "service": {"ignore": {"config_proxy": {"api_backend"}}, "skip": {"policies", "policy_chain", "proxy_rules"}},
+    "product": {"skip": {"policies", ("policy_chain", (0,)), "proxy_rules"}},
+}
+
+
 def cmp_services(svc1, svc2, product_service, cmp_length=True):
     """
     Compare two services/products.
@@ -203,112 +370,12 @@ def cmp_services(svc1, svc2, product_service, cmp_length=True):
     @param [Object] Second service
     @param [String] Comparing service or product?
     """
-    assert len(svc1.entity.keys()) == len(svc2.entity.keys())
-    cmp_ents(svc1.entity, svc2.entity, set(svc1.entity.keys()) - constants.SERVICE_CMP_ATTRS)
-
-    cmp_proxies(svc1.proxy.list(), svc2.proxy.list(), product_service)
-    cmp_metrics(svc1, svc2, cmp_length)
-    cmp_mappings(svc1, svc2, cmp_length)
-    cmp_app_plans(svc1, svc2, cmp_length)
-    cmp_active_docs(svc1, svc2, cmp_length)
-    cmp_backend_usages(svc1, svc2, cmp_length)
-
-
-def cmp_app_plans(svc1, svc2, cmp_length=True):
-    """
-    Compare application plans of two services/products.
-
-    @param [Object] First service
-    @param [Object] Second service
-    @param [Bool] Should we compare lists' length
-    """
-    app_plan1 = svc1.app_plans.list()
-    app_plan2 = svc2.app_plans.list()
-
-    def _cmp_func(ap1, ap2):
-        cmp_ents(ap1.entity, ap2.entity, set(ap1.entity.keys()) - constants.APP_PLANS_CMP_ATTRS)
-        cmp_pricing_rules(ap1, ap2)
-        cmp_limits(ap1, ap2)
-
-    find_and_cmp(app_plan1, app_plan2, _cmp_func, cmp_length=cmp_length)
-
-
-def cmp_limits(ap1, ap2, cmp_length=True):
-    """
-    Compare limits of two application plans.
-
-    @param [Object] First list of app. plan
-    @param [Object] Second list of app. plan
-    @param [Bool] Should we compare lists' length
-    """
-
-    def _cmp_func(metr1, metr2):
-        find_and_cmp(
-            ap1.limits(metr1).list(),
-            ap2.limits(metr2).list(),
-            lambda lim1, lim2: cmp_ents(lim1.entity, lim2.entity, set(lim1.entity.keys()) - constants.LIMITS_CMP_ATTR),
-            ["period"],
-        )
-
-    find_and_cmp(ap1.service.metrics.list(), ap2.service.metrics.list(), _cmp_func, ["friendly_name"], cmp_length)
-
-
-def cmp_pricing_rules(ap1, ap2, cmp_length=True):
-    """
-    Compare pricing rules of two application plans.
-
-    @param [Object] First list of app. plan
-    @param [Object] Second list of app. plan
-    @param [Bool] Should we compare lists' length
-    """
-
-    def _cmp_func(metr1, metr2):
-        find_and_cmp(
-            ap1.pricing_rules(metr1).list(),
-            ap2.pricing_rules(metr2).list(),
-            lambda pric1, pric2: cmp_ents(
-                pric1.entity, pric2.entity, set(pric1.entity.keys()) - constants.PRICING_RULES_CMP_ATTRS
-            ),
-            ["min", "max"],
-        )
-
-    find_and_cmp(ap1.service.metrics.list(), ap2.service.metrics.list(), _cmp_func, ["friendly_name"], cmp_length)
-
-
-def cmp_proxies(proxy1, proxy2, product_service):
-    """
-    Compare two proxies.
-
-    @param [Object] First proxy
-    @param [Object] Second proxy
-    """
-    assert len(proxy1.entity.keys()) == len(proxy2.entity.keys())
-    cmp_ents(proxy1.entity, proxy2.entity, set(proxy1.entity.keys()) - constants.PROXY_CMP_ATTRS)
-    # this cannot be used for copying via CRDs(toolbox product export/import) and it seems from code it is not used
-    # assert not jsondiff.diff(proxy1.entity['policies_config'], proxy2.entity['policies_config'])
-    assert not jsondiff.diff(proxy1.policies_registry.list(), proxy2.policies_registry.list())
-
     # do not check 'production' because proxies are not promoted in src and dst
-    for env in ["sandbox"]:
-        last_config1 = proxy1.configs.latest(env)["content"]
-        last_config2 = proxy2.configs.latest(env)["content"]
-        assert len(last_config1.keys()) == len(last_config2.keys())
-        cmp_ents(last_config1, last_config2, set(last_config1.keys()) - constants.PROXY_CONFIG_CONTENT_CMP_ATTRS)
-
-        last_proxy1 = last_config1["proxy"]
-        last_proxy2 = last_config2["proxy"]
-        assert len(last_proxy1.keys()) == len(last_proxy2.keys())
-        cmp_attrs = set(last_proxy1.keys()) - constants.PROXY_CONFIG_CONTENT_PROXY_CMP_ATTRS
-        if product_service == "service":
-            cmp_attrs.remove("api_backend")
-        cmp_ents(last_proxy1, last_proxy2, cmp_attrs)
-
-        # first item is policy inserted by system for backend routing
-        if product_service == "product":
-            assert not jsondiff.diff(last_proxy1["policy_chain"][1:], last_proxy2["policy_chain"][1:])
-        for rule1, rule2 in zip(last_proxy1["proxy_rules"], last_proxy1["proxy_rules"]):
-            assert len(rule1.keys()) == len(rule2.keys())
-            cmp_ents(rule1, rule2, set(rule1.keys()) - constants.PROXY_RULES_CMP_ATTRS)
+    snap1, snap2 = snapshot.take_both(svc1, svc2, envs=["sandbox"])
+    diff = snapshot.diff(snap1, snap2, cmp_length, **_PROXY_DIFF_OPTIONS[product_service])
+    if diff:
+        logging.error("services %s and %s differ:\n%s", svc1["id"], svc2["id"], diff)
+    assert not diff, f"{len(diff)} difference(s) in {diff.paths()}"
 
 
 def cmp_backends(back1, back2, cmp_length=True):
@@ -319,101 +386,12 @@ def cmp_backends(back1, back2, cmp_length=True):
     @param [Object] Second backend
     @param [Bool] Should we compare lists' length
     """
-    assert len(back1.entity.keys()) == len(back2.entity.keys())
-    cmp_ents(back1.entity, back2.entity, set(back1.entity.keys()) - constants.BACKEND_CMP_ATTRS)
-    cmp_metrics(back1, back2, cmp_length)
-    cmp_mappings(back1, back2, cmp_length)
-
-
-def cmp_metrics(ent1, ent2, cmp_length=True):
-    """
-    Compare metrics of two entities.
-
-    @param [Object] First entity
-    @param [Object] Second entity
-    @param [Bool] Should we compare lists' length
-    """
-    metrs1 = ent1.metrics.list()
-    metrs2 = ent2.metrics.list()
-
-    def _cmp_func(metr1, metr2):
-        cmp_ents(metr1.entity, metr2.entity, set(metr1.keys()) - constants.METRIC_CMP_ATTRS)
-        cmp_methods(metr1, metr2, cmp_length)
-
-    find_and_cmp(metrs1, metrs2, _cmp_func, ["friendly_name"], cmp_length)
-
-
-def cmp_methods(metr1, metr2, cmp_length=True):
-    """
-    Compare methods of two metrics.
-
-    @param [Object] First metric
-    @param [Object] Second metric
-    @param [Bool] Should we compare lists' length
-    """
-    methods1 = metr1.methods.list()
-    methods2 = metr2.methods.list()
-
-    def _cmp_func(meth1, meth2):
-        cmp_ents(meth1.entity, meth2.entity, set(meth1.keys()) - constants.METRIC_METHOD_CMP_ATTRS)
-
-    find_and_cmp(methods1, methods2, _cmp_func, cmp_length=cmp_length)
-
-
-def cmp_mappings(ent1, ent2, cmp_length=True):
-    """
-    Compare mappings of two entities.
-
-    @param [Object] First entity
-    @param [Object] Second entity
-    @param [Bool] Should we compare lists' length
-    """
-    maps1 = ent1.mapping_rules.list()
-    maps2 = ent2.mapping_rules.list()
-
-    def _cmp_func(map1, map2):
-        cmp_ents(map1.entity, map2.entity, set(map1.keys()) - constants.MAPPING_CMP_ATTRS)
-
-    find_and_cmp(maps1, maps2, _cmp_func, ["pattern"], cmp_length)
-
-
-def cmp_active_docs(svc1, svc2, cmp_length=True):
-    """
-    Compare active docs of two services.
-
-    @param [Object] First service
-    @param [Object] Second service
-    @param [Bool] Should we compare lists' length
-    """
-    acs1 = svc1.active_docs.list()
-    acs2 = svc2.active_docs.list()
-
-    def _cmp_func(adc1, adc2):
-        cmp_ents(adc1.entity, adc2.entity, set(adc1.keys()) - constants.ACTIVEDOCS_CMP_ATTRS)
-
-    find_and_cmp(acs1, acs2, _cmp_func, cmp_length=cmp_length)
-
-
-def cmp_backend_usages(svc1, svc2, cmp_length=True):
-    """
-    Compare backend usages and their subobjects of two services.
-
-    @param [Object] First service
-    @param [Object] Second service
-    @param [Bool] Should we compare lists' length
-    """
-    buses1 = svc1.backend_usages.list()
-    buses2 = svc2.backend_usages.list()
-
-    def _cmp_func(bus1, bus2):
-        cmp_ents(bus1.entity, bus2.entity, set(bus1.keys()) - constants.BACKEND_USAGES_CMP_ATTRS)
-        assert bus1["service_id"] == svc1["id"]
-        assert bus2["service_id"] == svc2["id"]
-        back1 = svc1.threescale_client.backends.read(bus1["backend_id"])
-        back2 = svc2.threescale_client.backends.read(bus2["backend_id"])
-        cmp_backends(back1, back2, cmp_length)
-
-    find_and_cmp(buses1, buses2, _cmp_func, ["path"])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        snap1, snap2 = pool.map(snapshot.take_backend, [back1, back2])
+    diff = snapshot.diff(snap1, snap2, cmp_length)
+    if diff:
+        logging.error("backends %s and %s differ:\n%s", back1["id"], back2["id"], diff)
+    assert not diff, f"{len(diff)} difference(s) in {diff.paths()}"
 
 
 def check_object(obj_ent, not_check_list, vals):
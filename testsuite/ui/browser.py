@@ -1,18 +1,177 @@
 """Plug-in for Widgetastic browser with 3scale specific environment settings"""
 
+import logging
+import threading
+import time
 from contextlib import contextmanager
-from time import sleep
+from typing import Dict, Iterable, List, NamedTuple, Optional
 from urllib import parse
 import backoff
 
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from wait_for import TimedOutError
 from widgetastic.browser import Browser, DefaultPlugin
 
+LOGGER = logging.getLogger(__name__)
+
+
+def _origin(url: str) -> str:
+    """scheme://host:port part of the url"""
+    parsed = parse.urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class AuthSnapshot(NamedTuple):
+    """Authenticated state of one origin: its cookies and local storage"""
+
+    origin: str
+    cookies: List[dict]
+    local_storage: Dict[str, str]
+    created: float
+
+
+class SessionPool:
+    """
+    Pool of live browser sessions of one pytest worker
+
+    Starting a browser takes seconds, so sessions are kept alive between test modules.
+    Released sessions are reset (cookies, local storage and extra windows of the known origins)
+    and health-checked when acquired again, broken sessions are replaced by new ones.
+
+    Authenticated state of logged-in users is captured as `AuthSnapshot` per role
+    (e.g. master, admin, developer) and restored into any session instead of filling
+    the login form again.
+
+    Args:
+        :param webdriver: :class:`ThreescaleWebdriver` instance which starts the sessions
+        :param origins: Origins (portals) whose state is cleared when a session is released
+        :param max_age: Seconds after which snapshots are not restored anymore
+    """
+
+    # Cheapest page of the origin which allows to set its cookies
+    BLANK_PATH = "/robots.txt"
+
+    def __init__(self, webdriver, origins: Iterable[str] = (), max_age: float = 1800):
+        self.webdriver = webdriver
+        self.origins = {_origin(i) for i in origins if i}
+        self.max_age = max_age
+        self.snapshots: Dict[str, AuthSnapshot] = {}
+        self._idle: List = []
+        self._busy: List = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def healthy(session) -> bool:
+        """True if the browser session still responds"""
+        try:
+            return session.execute_script("return 1") == 1 and bool(session.window_handles)
+        except WebDriverException:
+            return False
+
+    def acquire(self):
+        """Healthy session, idle one is reused if possible"""
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                session = self.webdriver.start_session()
+                break
+            if self.healthy(session):
+                break
+            LOGGER.info('Replacing broken Browser session: "%s"', session.session_id)
+            self.webdriver.finalize(session)
+        with self._lock:
+            self._busy.append(session)
+        return session
+
+    def discard(self, session):
+        """Quit the session, it is not returned to the pool"""
+        with self._lock:
+            if session in self._busy:
+                self._busy.remove(session)
+        self.webdriver.finalize(session)
+
+    def release(self, session):
+        """Reset the session and return it to the pool, broken session is discarded"""
+        try:
+            self._reset(session)
+        except WebDriverException:
+            self.discard(session)
+            return
+        with self._lock:
+            self._busy.remove(session)
+            self._idle.append(session)
+
+    def _reset(self, session):
+        handles = session.window_handles
+        for handle in handles[1:]:
+            session.switch_to.window(handle)
+            session.close()
+        session.switch_to.window(handles[0])
+        for origin in self.origins | {_origin(session.current_url)}:
+            if not origin.startswith("http"):
+                continue
+            self._open_origin(session, origin)
+            session.delete_all_cookies()
+            session.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        session.get("about:blank")
+
+    def _open_origin(self, session, origin: str):
+        if _origin(session.current_url) != origin:
+            session.get(origin + self.BLANK_PATH)
+
+    def save(self, role: str, session):
+        """Capture authenticated state of the current origin of the session"""
+        origin = _origin(session.current_url)
+        self.origins.add(origin)
+        self.snapshots[role] = AuthSnapshot(
+            origin=origin,
+            cookies=session.get_cookies(),
+            local_storage=session.execute_script("return Object.assign({}, window.localStorage);") or {},
+            created=time.time(),
+        )
+
+    def restore(self, role: str, session) -> bool:
+        """Restore captured state of the role into the session, False if there is no usable snapshot"""
+        snapshot = self.snapshots.get(role)
+        if snapshot is None:
+            return False
+        if time.time() - snapshot.created > self.max_age:
+            del self.snapshots[role]
+            return False
+        self._open_origin(session, snapshot.origin)
+        session.delete_all_cookies()
+        for cookie in snapshot.cookies:
+            session.add_cookie(cookie)
+        session.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }",
+            snapshot.local_storage,
+        )
+        return True
+
+    def forget(self, role: str):
+        """Drop snapshot of the role, e.g. when restored state turned out to be logged out"""
+        self.snapshots.pop(role, None)
+
+    def close(self):
+        """Quit all the sessions"""
+        with self._lock:
+            sessions = self._idle + self._busy
+            self._idle, self._busy = [], []
+        for session in sessions:
+            self.webdriver.finalize(session)
+
 
 # pylint: disable=abstract-method
 class ThreescaleBrowserPlugin(DefaultPlugin):
     """
     Plug-in for :class:`ThreeScaleBrowser` which make sure page is loaded completely and is safe for UI interacting.
+
+    Readiness is event driven: a tracker installed into the page counts pending fetch/XHR requests and
+    records time of the last DOM mutation, one asynchronous script then waits in the page until there are
+    no pending requests (including jQuery/Prototype ones), document is loaded and DOM is quiet.
+    Polling of `ENSURE_PAGE_SAFE` is used only if the asynchronous wait fails (e.g. page is unloaded
+    by navigation during the wait).
     """
 
     ENSURE_PAGE_SAFE = """
@@ -30,12 +189,69 @@ class ThreescaleBrowserPlugin(DefaultPlugin):
         }
         """
 
-    def ensure_page_safe(self, timeout="15s"):
+    WAIT_PAGE_READY = """
+        var done = arguments[arguments.length - 1];
+        var quiet = arguments[0], settle = arguments[1], deadline = Date.now() + arguments[2];
+        if (!window.__threescaleReadiness) {
+            var tracker = window.__threescaleReadiness = {pending: 0, lastMutation: Date.now()};
+            var finished = function() { tracker.pending = Math.max(0, tracker.pending - 1); };
+            if (window.fetch) {
+                var fetch = window.fetch;
+                window.fetch = function() {
+                    tracker.pending++;
+                    return fetch.apply(this, arguments).finally(finished);
+                };
+            }
+            var send = XMLHttpRequest.prototype.send;
+            XMLHttpRequest.prototype.send = function() {
+                tracker.pending++;
+                this.addEventListener("loadend", finished);
+                return send.apply(this, arguments);
+            };
+            new MutationObserver(function() { tracker.lastMutation = Date.now(); }).observe(
+                document, {childList: true, subtree: true, attributes: true, characterData: true});
+        }
+        var tracker = window.__threescaleReadiness, idleSince = null;
+        function check() {
+            var now = Date.now();
+            var idle = document.readyState == "complete" && tracker.pending < 1
+                && (typeof jQuery === "undefined" || jQuery.active < 1)
+                && (typeof Ajax === "undefined" || Ajax.activeRequestCount < 1);
+            idleSince = idle ? (idleSince || now) : null;
+            // DOM quiescence is awaited at most `settle` ms, pages with timers may mutate DOM forever
+            if (idle && (now - tracker.lastMutation >= quiet || now - idleSince >= settle)) {
+                done(true);
+            } else if (now > deadline) {
+                done(false);
+            } else {
+                setTimeout(check, 25);
+            }
+        }
+        check();
+        """
+
+    # milliseconds without DOM mutation considered as quiet page
+    QUIET = 100
+    # maximum of milliseconds to wait for quiet DOM once there are no requests
+    SETTLE = 1000
+
+    def ensure_page_safe(self, timeout=15):
         """
         Ensures page is fully loaded.
         Default timeout was 10s, this changes it to 15s.
         """
-        super().ensure_page_safe(timeout)
+        # geckodriver may return from click before the action takes effect, require longer quiet period
+        quiet = self.QUIET * 3 if self.browser.browser_type == "firefox" else self.QUIET
+        selenium = self.browser.selenium
+        try:
+            selenium.set_script_timeout(timeout + 5)
+            ready = selenium.execute_async_script(self.WAIT_PAGE_READY, quiet, self.SETTLE, timeout * 1000)
+        except WebDriverException as exception:
+            LOGGER.debug("Waiting for page readiness failed, polling: %s", exception.msg)
+            super().ensure_page_safe(timeout)
+            return
+        if not ready:
+            raise TimedOutError(f"Page was not ready in {timeout}s")
 
     def before_click(self, element, locator=None):
         """
@@ -44,44 +260,63 @@ class ThreescaleBrowserPlugin(DefaultPlugin):
         """
         self.ensure_page_safe()
 
-    # pylint: disable=unnecessary-pass
     def after_click(self, element, locator=None):
         """
-        Invoked after clicking on an element. Ensure page is fully loaded
-        before proceeding further.
+        Invoked after clicking on an element.
         """
         # plugin.ensure_page_safe() is invoked from browser click.
         # we should not invoke it a second time, this can conflict with
         # ignore_ajax=True usage from browser click
-        # we need to add sleep in case of using firefox after click action
-        # because gecodriver(firefox driver) execute actions in strange way
-        # TODO: explore possibilities to check JS running or stalness of
-        #  clickable element in click / after_click action
-        if self.browser.browser_type == "firefox":
-            sleep(1)
-        pass
 
 
 class ThreeScaleBrowser(Browser):
     """Wrapper around :class:`widgetastic.browser.Browser`"""
 
-    def __init__(self, webdriver, session=None, extra_objects=None):
+    def __init__(self, webdriver, session=None, extra_objects=None, pool: Optional[SessionPool] = None):
         """Pass webdriver instance, session and other extra objects (if any).
         :param webdriver: :class:`ThreescaleWebdriver` instance.
         :param session: :class:`threescale.session.Session` instance.
         :param extra_objects: any extra objects you want to include.
+        :param pool: :class:`SessionPool` to take the browser session from, new session is started if not set.
         """
         extra_objects = extra_objects or {}
         extra_objects.update({"session": session})
-        selenium = webdriver.start_session()
+        self.pool = pool
+        selenium = pool.acquire() if pool else webdriver.start_session()
         super().__init__(selenium, plugin_class=ThreescaleBrowserPlugin, extra_objects=extra_objects)
         self.window_handle = selenium.current_window_handle
         self.webdriver = webdriver
 
+    # pylint: disable=access-member-before-definition
     def restart_session(self):
         """Restarts browser. Existing webdriver is used"""
-        self.webdriver.finalize()
-        self.selenium = self.webdriver.start_session()
+        if self.pool:
+            self.pool.discard(self.selenium)
+            self.selenium = self.pool.acquire()
+        else:
+            self.webdriver.finalize(self.selenium)
+            self.selenium = self.webdriver.start_session()
+
+    def finalize(self):
+        """Return the session to the pool or quit it"""
+        if self.pool:
+            self.pool.release(self.selenium)
+        else:
+            self.webdriver.finalize(self.selenium)
+
+    def save_auth(self, role: str):
+        """Remember logged-in state of the current portal under the role, no-op without pool"""
+        if self.pool:
+            self.pool.save(role, self.selenium)
+
+    def restore_auth(self, role: str) -> bool:
+        """Restore logged-in state of the role, True if there was a state to restore"""
+        return self.pool is not None and self.pool.restore(role, self.selenium)
+
+    def forget_auth(self, role: str):
+        """Drop remembered logged-in state of the role"""
+        if self.pool:
+            self.pool.forget(role)
 
     def set_path(self, path):
         """Change path for the current browser.url"""
@@ -11,17 +11,52 @@ Navigation process consists of two parts:
     2. Perform of steps - Sequentially pops Views from mentioned queue and invoke methods that are decorated
         as steps for navigation.
 
+Sequence of View classes from desired View to the root is computed only once per class and constructor/step
+signatures are cached. When more than one step would be needed and desired View has its `path` resolved,
+it is opened directly by its URL and steps are performed only if that fails.
+
 Design of this navigation is based on: https://github.com/RedHatQE/navmazing
 """
 
+import functools
 import inspect
+import logging
+import time
 from collections import deque
-from typing import TypeVar, Type, Optional
+from typing import Dict, List, NamedTuple, Tuple, TypeVar, Type, Optional
 
 from widgetastic.widget import View
 
 CustomView = TypeVar("CustomView", bound=View)
 
+log = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _signature(function) -> inspect.Signature:
+    """Cached signature of function, functions (not bound methods) are used as keys"""
+    return inspect.signature(function)
+
+
+@functools.lru_cache(maxsize=None)
+def _step_names(cls) -> Tuple[str, ...]:
+    """Names of methods of the View class decorated with @step"""
+    return tuple(name for name, _ in inspect.getmembers(cls, lambda o: hasattr(o, "_class_name")))
+
+
+def _filter_kwargs(function, kwargs) -> dict:
+    parameters = _signature(function).parameters
+    return {key: value for key, value in kwargs.items() if key in parameters}
+
+
+class NavigationTiming(NamedTuple):
+    """Duration of one navigation, `mode` tells if the View was already displayed, opened directly or by steps"""
+
+    view: str
+    mode: str
+    steps: int
+    seconds: float
+
 
 def step(cls, **kwargs):
     """
@@ -52,6 +87,9 @@ def step(cls, **kwargs):
 class Navigator:
     """Responsible for Views navigation"""
 
+    # Backtraces (View classes from the View to the root) shared by all navigators
+    _backtraces: Dict[type, Tuple[type, ...]] = {}
+
     def __init__(self, browser):
         """
         Initializes Navigator with Browser instance.
@@ -60,25 +98,52 @@ class Navigator:
         """
         self.page_chain = deque()
         self.browser = browser
+        self.timings: List[NavigationTiming] = []
 
-    def navigate(self, cls: Type[CustomView], **kwargs) -> CustomView:
+    def navigate(self, cls: Type[CustomView], direct: bool = True, **kwargs) -> CustomView:
         """
         Perform navigation to specific View. If required by particular steps, args and kwargs
         should be specified. They are later passed to avery step method and mapped to
         correct View parameters.
         Args:
             :param cls: Class of desired View
+            :param direct: Allow to open the View by its path instead of performing several steps
             :return: Instance of the current View
         """
+        start = time.perf_counter()
         self.page_chain.clear()
         self._backtrace(cls, **kwargs)
-        return self._perform_steps(**kwargs)
+        steps = len(self.page_chain) - 1
+        mode = "displayed" if steps == 0 else "steps"
+        page = None
+        if steps > 1 and direct:
+            page = self._open_directly(self.page_chain[0], **kwargs)
+            mode = "direct" if page else mode
+        if page is None:
+            page = self._perform_steps(**kwargs)
+        timing = NavigationTiming(cls.__name__, mode, steps, time.perf_counter() - start)
+        self.timings.append(timing)
+        log.debug("Navigation to %s (%s, %d steps) took %.3fs", timing.view, mode, steps, timing.seconds)
+        return page
 
     def new_page(self, cls, **kwargs):
         """Creates a new instance of class with necessary arguments."""
-        signature = inspect.signature(cls.__init__)
-        filtered_kwargs = {key: value for key, value in kwargs.items() if key in signature.parameters}
-        return cls(self.browser, **filtered_kwargs)
+        return cls(self.browser, **_filter_kwargs(cls.__init__, kwargs))
+
+    def _open_directly(self, page, **kwargs):
+        """Open the page by its path, None if the path is not usable or the page is not displayed then"""
+        path = getattr(page, "path", "")
+        if not path or "{" in path:
+            return None
+        self.browser.set_path(path)
+        page.post_navigate(**kwargs)
+        if not page.is_displayed:
+            log.debug("Direct navigation to %s failed, performing steps", page.__class__.__name__)
+            self.browser.selenium.back()
+            self.page_chain.clear()
+            self._backtrace(page.__class__, **kwargs)
+            return None
+        return page
 
     def open(
         self, cls: Type[CustomView] = None, url: str = None, exact: bool = None, wait_displayed: bool = True, **kwargs
@@ -107,24 +172,34 @@ class Navigator:
 
     def _backtrace(self, cls, **kwargs):
         """
-        Recursively constructs logical path from the currently displayed page to the navigated element.
-        This path is saved in queue `page_chain`
+        Constructs logical path from the currently displayed page to the navigated element.
+        This path is saved in queue `page_chain`. Only Views up to the first displayed one are created.
         Args:
-            :param page_cls: currently processed View class
+            :param cls: class of navigated View
         """
-        if cls is None:
-            raise ValueError(
-                f"An error occurred during backtracking of {self.page_chain.popleft()}. "
-                f"None prerequisite was found for {self.page_chain.pop()}"
-            )
-        page = self.new_page(cls, **kwargs)
-        self.page_chain.append(page)
-        if page.is_displayed:
-            if len(self.page_chain) == 1:
-                page.browser.refresh()
-                page.wait_displayed()
-            return
-        self._backtrace(page.prerequisite(), **kwargs)
+        for page_cls in self._prerequisites(cls, **kwargs):
+            page = self.new_page(page_cls, **kwargs)
+            self.page_chain.append(page)
+            if page.is_displayed:
+                if len(self.page_chain) == 1:
+                    page.browser.refresh()
+                    page.wait_displayed()
+                return
+        raise ValueError(
+            f"An error occurred during backtracking of {self.page_chain.popleft()}. "
+            f"None prerequisite was found for {self.page_chain.pop()}"
+        )
+
+    def _prerequisites(self, cls, **kwargs) -> Tuple[type, ...]:
+        """View classes from the class to the root View, computed once per class"""
+        if cls not in self._backtraces:
+            classes: List[type] = []
+            prerequisite = cls
+            while prerequisite is not None and prerequisite not in classes:
+                classes.append(prerequisite)
+                prerequisite = self.new_page(prerequisite, **kwargs).prerequisite()
+            self._backtraces[cls] = tuple(classes)
+        return self._backtraces[cls]
 
     # pylint: disable=protected-access
     def _perform_steps(self, **kwargs):
@@ -138,7 +213,7 @@ class Navigator:
         page = self.page_chain.pop()
         dest = self.page_chain[-1]
 
-        possible_steps = inspect.getmembers(page, lambda o: hasattr(o, "_class_name"))
+        possible_steps = [(name, getattr(page, name)) for name in _step_names(page.__class__)]
         if self._invoke_step(possible_steps, dest, **kwargs):
             dest.post_navigate(**kwargs)
             return self._perform_steps(**kwargs)
@@ -159,12 +234,10 @@ class Navigator:
         for _, method in possible_steps:
             key_word = method._class_name
             if key_word == destination.__class__.__name__:
-                signature = inspect.signature(method)
-                filtered_kwargs = {key: value for key, value in kwargs.items() if key in signature.parameters}
-                bound = signature.bind(**filtered_kwargs)
+                bound = _signature(method.__func__).bind(method.__self__, **_filter_kwargs(method.__func__, kwargs))
                 bound.apply_defaults()
                 try:
-                    method(*bound.args, **bound.kwargs)
+                    method.__func__(*bound.args, **bound.kwargs)
                 except Exception as exc:
                     raise NavigationStepException(method.__dict__, destination, method) from exc
                 return True
@@ -14,6 +14,20 @@ from webdriver_manager.firefox import GeckoDriverManager
 LOGGER = logging.getLogger(__name__)
 
 
+def worker_remote_url(remote_url, worker: int):
+    """
+    Remote selenium of the pytest-xdist worker.
+    :param remote_url: URL, list of URLs or comma separated URLs of selenium grids/standalone containers
+    :param worker: Number of the worker, workers are spread over the URLs round-robin
+    :return: URL for the worker
+    """
+    if isinstance(remote_url, str):
+        remote_url = [i.strip() for i in remote_url.split(",") if i.strip()]
+    if not remote_url:
+        return None
+    return remote_url[worker % len(remote_url)]
+
+
 class _Chrome:
     """Factory class for Chrome browser"""
 
@@ -161,14 +175,16 @@ class ThreescaleWebdriver:
         """
         self.session.set_window_size(1920, 1080)
 
-    def finalize(self):
+    def finalize(self, session=None):
         """
         Finalize handling of webdriver.
+        :param session: Browser session to quit, the last started one by default
         :raises: WebDriverError: If problem with browser happens finalization occurs.
         """
+        session = session or self.session
         try:
-            LOGGER.info('Quiting current Browser session: "%s"...', self.session.session_id)
-            self.session.quit()
+            LOGGER.info('Quiting Browser session: "%s"...', session.session_id)
+            session.quit()
         except WebDriverException as exception:
             LOGGER.info("Problem with browser finalization occurred")
             LOGGER.exception(exception)
@@ -1,7 +1,6 @@
 "testsuite helpers"
 
 import os
-from datetime import datetime, timezone
 import secrets
 import time
 import typing
@@ -13,6 +12,7 @@ from pathlib import Path
 import pytest
 
 from testsuite.config import settings
+from testsuite.scheduler import DEFAULT_SCHEDULER, HourWindow, MinuteWindow
 
 if typing.TYPE_CHECKING:
     from _pytest.fixtures import FixtureRequest
@@ -28,6 +28,15 @@ def randomize(name, tail=5):
     return "%s-%s" % (name, generate_tail(tail))
 
 
+def xdist_worker() -> int:
+    """Number of pytest-xdist worker, 0 without xdist"""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    try:
+        return int(worker.lstrip("gw"))
+    except ValueError:
+        return 0
+
+
 def _whoami():
     """Returns username"""
     if "tester" in settings:
@@ -104,10 +113,7 @@ def wait_interval(min_sec=15, max_sec=45):
     The requests has to be send between the 15th and 45th second of the minute
     When the time is outside of this interval, waits until the start of a next one
     """
-    seconds = datetime.now(timezone.utc).second
-    if seconds < min_sec or seconds > max_sec:
-        sleep_time = (60 - seconds + min_sec) % 60
-        time.sleep(sleep_time)
+    DEFAULT_SCHEDULER.align(MinuteWindow(min_sec, max_sec))
 
 
 def wait_until_next_minute(min_sec=15, max_sec=45):
@@ -115,10 +121,7 @@ def wait_until_next_minute(min_sec=15, max_sec=45):
     Waits until the start of the next minute when are the limits reseted,
     then waits until the start of the interval allowed to sent requests
     """
-    seconds = datetime.now(timezone.utc).second
-    time.sleep(60 - seconds)
-    if min_sec < seconds < max_sec:
-        wait_interval()
+    DEFAULT_SCHEDULER.next_minute(MinuteWindow(min_sec, max_sec))
 
 
 def wait_interval_hour(max_min, min_min=0):
@@ -126,10 +129,7 @@ def wait_interval_hour(max_min, min_min=0):
     Prevents sending the request in the beginning or at the end of an hour
     Prevents refreshing the limits during the test
     """
-    minutes = datetime.now(timezone.utc).minute
-    if minutes < min_min or minutes > max_min:
-        sleep_time = ((60 - minutes + min_min) % 60) * 60 + 10
-        time.sleep(sleep_time)
+    DEFAULT_SCHEDULER.align(HourWindow(max_min, min_min))
 
 
 def _warn_and_skip(message, action):
@@ -0,0 +1,272 @@
+"""
+In-process receiver of 3scale webhooks
+
+This is a drop-in replacement of RequestBinClient and Mockserver for webhook
+tests. Instead of an external service it runs small asyncio http server in a
+background thread of the test process. Therefore it can be used only if 3scale
+is able to reach the machine running the tests.
+
+Received webhooks are indexed by (path, action, entity id) and every waiting
+`get_webhook` call is woken up immediately when matching webhook arrives, there
+is no polling involved.
+"""
+
+import asyncio
+import logging
+import socket
+import threading
+import time
+import xml.etree.ElementTree as Et
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from testsuite.utils import generate_tail, xdist_worker
+
+log = logging.getLogger(__name__)
+
+_MAX_HEADER_SIZE = 64 * 1024
+
+
+class Webhook(NamedTuple):
+    """Single received webhook"""
+
+    path: str
+    action: str
+    type: str
+    entity_id: str
+    body: str
+    received: float
+
+
+def _xml_find(element, tag):
+    """Text of the tag or empty string if missing"""
+    result = element.find(tag)
+    if result is None or result.text is None:
+        return ""
+    return result.text
+
+
+def parse_webhook(path: str, body: str) -> Optional[Webhook]:
+    """Parse 3scale webhook xml, returns None for non-webhook content"""
+    if not body:
+        return None
+    try:
+        xml = Et.fromstring(body)
+    except Et.ParseError:
+        return None
+    webhook_type = _xml_find(xml, ".//type")
+    return Webhook(
+        path=path,
+        action=_xml_find(xml, ".//action"),
+        type=webhook_type,
+        entity_id=_xml_find(xml, f".//{webhook_type}/id") if webhook_type else "",
+        body=body,
+        received=time.time(),
+    )
+
+
+class WebhookBin:
+    """RequestBinClient interface on top of shared WebhookReceiver
+
+    Each bin has its own randomized path, so more bins can share one receiver
+    """
+
+    def __init__(self, receiver: "WebhookReceiver", timeout: float = 10):
+        self.receiver = receiver
+        self.timeout = timeout
+        self.path = f"/webhook/{generate_tail()}"
+        self.url = f"{receiver.public_url.rstrip('/')}{self.path}"
+
+    def get_webhook(self, action: str, entity_id: str, timeout: Optional[float] = None):
+        """
+        Reimplementation of interface from RequestBinClient
+        :return webhook for given action and entity_id or None if it didn't arrive in time
+        """
+        return self.receiver.wait_for(self.path, action, str(entity_id), self.timeout if timeout is None else timeout)
+
+    @property
+    def webhooks(self) -> List[Webhook]:
+        """All the webhooks received by this bin"""
+        return self.receiver.received(self.path)
+
+
+# pylint: disable=too-many-instance-attributes
+class WebhookReceiver:
+    """Asyncio http server collecting webhooks in background thread
+
+    Args:
+        :param host: Address to listen at
+        :param port: Port to listen at, 0 means random one; fixed port is
+            shifted by number of xdist worker to allow parallel execution
+        :param public_url: Base url under which 3scale reaches the receiver,
+            defaults to http://<hostname>:<port>
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 0, public_url: Optional[str] = None):
+        self.host = host
+        self.port = port + xdist_worker() if port else 0
+        self._public_url = public_url
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._webhooks: Dict[Tuple[str, str, str], List[Webhook]] = defaultdict(list)
+        self._by_path: Dict[str, List[Webhook]] = defaultdict(list)
+        self._waiters: Dict[Tuple[str, str, str], List[asyncio.Future]] = defaultdict(list)
+
+    @property
+    def public_url(self) -> str:
+        """Base url of the receiver as seen by 3scale"""
+        if self._public_url:
+            return self._public_url
+        return f"http://{socket.getfqdn()}:{self.port}"
+
+    def bin(self, timeout: float = 10) -> WebhookBin:
+        """New bin with unique url"""
+        return WebhookBin(self, timeout)
+
+    def start(self) -> "WebhookReceiver":
+        """Start the server in background thread, returns after it listens"""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        async def _start():
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+
+        def _run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(_start())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name="webhook-receiver", daemon=True)
+        self._thread.start()
+        if not started.wait(30):
+            raise RuntimeError(f"Webhook receiver didn't start on {self.host}:{self.port}")
+        log.info("Webhook receiver listening on %s:%s, public url %s", self.host, self.port, self.public_url)
+        return self
+
+    def stop(self):
+        """Stop the server and the background thread"""
+        if self._loop is None:
+            return
+
+        async def _stop():
+            self._server.close()
+            for waiters in self._waiters.values():
+                for waiter in waiters:
+                    waiter.cancel()
+            # open keep-alive connections are not closed by server.close()
+            connections = [i for i in asyncio.all_tasks() if i is not asyncio.current_task()]
+            for connection in connections:
+                connection.cancel()
+            await asyncio.gather(*connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(_stop(), self._loop).result(30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(30)
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def received(self, path: str) -> List[Webhook]:
+        """All the webhooks received on given path"""
+        return list(self._by_path.get(path, []))
+
+    def wait_for(self, path: str, action: str, entity_id: str, timeout: float) -> Optional[str]:
+        """Blocks until matching webhook arrives, returns its body or None on timeout"""
+        if self._loop is None:
+            raise RuntimeError("Webhook receiver is not running")
+        future = asyncio.run_coroutine_threadsafe(self._wait((path, action, entity_id), timeout), self._loop)
+        return future.result()
+
+    async def _wait(self, key, timeout):
+        """Wait for the webhook inside of the event loop"""
+        if self._webhooks.get(key):
+            return self._webhooks[key][-1].body
+        waiter = self._loop.create_future()
+        self._waiters[key].append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._waiters.pop(key, None)
+
+    def _store(self, webhook: Webhook):
+        """Index the webhook and wake up waiters"""
+        key = (webhook.path, webhook.action, webhook.entity_id)
+        self._webhooks[key].append(webhook)
+        self._by_path[webhook.path].append(webhook)
+        for waiter in self._waiters.pop(key, []):
+            if not waiter.done():
+                waiter.set_result(webhook.body)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve http/1.1 connection, keep-alive is supported"""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status = "404 Not Found"
+                if method == "POST" and path.startswith("/webhook/"):
+                    status = "200 OK"
+                    webhook = parse_webhook(path, body)
+                    if webhook is not None:
+                        log.debug("Received webhook %s %s/%s", path, webhook.action, webhook.entity_id)
+                        self._store(webhook)
+                connection = "keep-alive" if keep_alive else "close"
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: {connection}\r\n\r\n".encode())
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as err:
+            log.debug("Webhook receiver connection failed: %s", err)
+        except asyncio.CancelledError:
+            log.debug("Webhook receiver connection closed on shutdown")
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader):
+        """Read single http request, returns (method, path, body, keep_alive) or None on closed connection"""
+        head = await reader.readuntil(b"\r\n\r\n") if not reader.at_eof() else b""
+        if not head:
+            return None
+        if len(head) > _MAX_HEADER_SIZE:
+            raise ValueError("Request header too large")
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, version = request_line.split(" ", 2)
+        headers = {}
+        for line in filter(None, header_lines):
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        else:
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method, urlsplit(target).path, body.decode("utf-8", errors="replace"), keep_alive